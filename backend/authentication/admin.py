@@ -1,5 +1,5 @@
 from django.contrib import admin
-from authentication.models import User, Profile
+from authentication.models import AccountDeletion, User, Profile
 
 
 @admin.register(User)
@@ -9,3 +9,9 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Profile)
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ["user_id", "stage", "created_at", "updated_at", "finished_at"]
+    readonly_fields = ["user_id", "stage", "deleted", "finished_at"]
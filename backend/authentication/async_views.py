@@ -0,0 +1,35 @@
+from rest_framework import status
+from backend.async_api import JSONResponse, async_api_view
+from backend.batch import get_batch_data, parse_ids
+from backend.budgets import query_budget
+from .models import User, Profile
+from .serializers import ProfileDetailSerializer
+
+
+@async_api_view(["GET"])
+async def profile_detail(request, user_id):
+    profile = (
+        await Profile.objects.filter(user_id=user_id).select_related("user").afirst()
+    )
+    if profile is not None:
+        return JSONResponse(ProfileDetailSerializer(profile).data)
+
+    if not await User.objects.filter(id=user_id).aexists():
+        return JSONResponse(
+            {"error": "Usuário não encontrado"}, status=status.HTTP_404_NOT_FOUND
+        )
+    return JSONResponse(
+        {"error": "Perfil não encontrado"}, status=status.HTTP_404_NOT_FOUND
+    )
+
+
+@query_budget(2)
+@async_api_view(["GET"])
+async def user_batch(request):
+    user_ids = parse_ids(request)
+    profiles = Profile.objects.filter(user_id__in=user_ids).select_related("user")
+    found = {
+        profile.user_id: ProfileDetailSerializer(profile).data
+        async for profile in profiles
+    }
+    return JSONResponse(get_batch_data(user_ids, found))
@@ -0,0 +1,95 @@
+import hashlib
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+AVATAR_SIZES = (48, 96, 256)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+# Formats that keep transparency; the others get it flattened onto white.
+ALPHA_FORMATS = {"WEBP"}
+
+
+class AvatarTooLarge(ValueError):
+    pass
+
+
+def check_pixels(image):
+    # Only the header has been read at this point, so this is cheap and
+    # runs before any pixel data is decompressed.
+    if image.width * image.height > settings.AVATAR_MAX_PIXELS:
+        raise AvatarTooLarge(f"{image.width}x{image.height}")
+
+
+def variants_dir(profile_id):
+    return f"avatars/{profile_id}"
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def flatten(image):
+    if image.mode != "RGBA":
+        return image
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def render_variants(file):
+    with Image.open(file) as image:
+        check_pixels(image)
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if has_alpha(image) else "RGB")
+
+    rendered = {}
+    for size in AVATAR_SIZES:
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        flat = flatten(thumbnail)
+        for extension, (image_format, options) in AVATAR_FORMATS.items():
+            variant = thumbnail if image_format in ALPHA_FORMATS else flat
+            # A fresh save carries no EXIF/ICC/XMP, so metadata is dropped.
+            buffer = BytesIO()
+            variant.save(buffer, format=image_format, **options)
+            rendered[(size, extension)] = buffer.getvalue()
+    return rendered
+
+
+def save_variants(profile_id, rendered):
+    variants = {}
+    for (size, extension), content in rendered.items():
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        name = f"{variants_dir(profile_id)}/{digest}-{size}.{extension}"
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(content))
+        variants.setdefault(str(size), {})[extension] = name
+    return variants
+
+
+def variant_names(variants):
+    return {name for formats in variants.values() for name in formats.values()}
+
+
+def delete_stale_variants(profile_id, keep):
+    directory = variants_dir(profile_id)
+    if not default_storage.exists(directory):
+        return
+    _, files = default_storage.listdir(directory)
+    for filename in files:
+        name = f"{directory}/{filename}"
+        if name not in keep:
+            default_storage.delete(name)
+
+
+def variant_urls(variants):
+    return {
+        size: {
+            extension: default_storage.url(name) for extension, name in formats.items()
+        }
+        for size, formats in variants.items()
+    }
@@ -0,0 +1,86 @@
+from collections import Counter
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    OuterRef,
+    PositiveIntegerField,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from follows.models import Follow
+from posts.models import Post
+from .models import Profile
+
+
+def _count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def rebuild_profile_counters(profiles=None):
+    profiles = Profile.objects.all() if profiles is None else profiles
+    return profiles.update(
+        followers_count=_count_subquery(Follow, "following"),
+        following_count=_count_subquery(Follow, "follower"),
+        posts_count=_count_subquery(Post, "author"),
+    )
+
+
+def _when(field, pk, delta):
+    if delta >= 0:
+        return [When(user_id=pk, then=F(field) + delta)]
+    # Guarded rather than clamped afterwards: on MySQL the column is
+    # unsigned and going below zero is an error, not a negative number.
+    return [
+        When(user_id=pk, **{f"{field}__gte": -delta}, then=F(field) + delta),
+        When(user_id=pk, then=Value(0)),
+    ]
+
+
+def _adjust(deltas):
+    """Apply {field: {user_id: delta}} in one UPDATE.
+
+    A single statement locks every affected profile in index order, so two
+    users following each other at the same time cannot deadlock.
+    """
+    user_ids = {pk for per_user in deltas.values() for pk in per_user}
+    if not user_ids:
+        return
+    updates = {
+        field: Case(
+            *[
+                when
+                for pk, delta in per_user.items()
+                for when in _when(field, pk, delta)
+            ],
+            default=F(field),
+            output_field=PositiveIntegerField(),
+        )
+        for field, per_user in deltas.items()
+        if per_user
+    }
+    Profile.objects.filter(user_id__in=user_ids).update(**updates)
+
+
+def adjust_follow_counts(pairs, delta):
+    """Add `delta` to both ends of each (follower, following) pair."""
+    following, followers = Counter(), Counter()
+    for follower_id, following_id in pairs:
+        following[follower_id] += delta
+        followers[following_id] += delta
+    _adjust({"following_count": following, "followers_count": followers})
+
+
+def adjust_posts_count(user_id, delta):
+    _adjust({"posts_count": {user_id: delta}})
@@ -0,0 +1,54 @@
+"""
+Password verification on a bounded thread pool.
+
+PBKDF2 releases the GIL while it runs, so each login hashing inline
+burns a whole core for the duration of its request thread. Funnelling
+every check through a pool of LOGIN_HASH_WORKERS threads caps how many
+cores a login burst can take, leaving the rest of the worker free to
+serve other requests; extra logins queue instead of competing for CPU.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+_executor = None
+_executor_lock = threading.Lock()
+_dummy_hash = None
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.LOGIN_HASH_WORKERS,
+                thread_name_prefix="login-hash",
+            )
+    return _executor
+
+
+def _dummy_password():
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = make_password("pingme-dummy-password")
+    return _dummy_hash
+
+
+def check_password(user, password):
+    """user.check_password() run on the pool; `user` may be None."""
+    # Unknown or inactive accounts still pay for one hash, so the response
+    # time does not reveal which emails are registered.
+    encoded = user.password if user is not None else _dummy_password()
+    future = get_executor().submit(verify_password, password, encoded)
+    is_correct, must_update = future.result()
+    if user is None:
+        return False
+
+    if is_correct and must_update:
+        # Hash upgrades write to the database, so they stay on the request thread.
+        user.set_password(password)
+        user._password = None
+        user.save(update_fields=["password"])
+    return is_correct
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from authentication.tasks import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Remove tokens expirados da blacklist do simplejwt em lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.TOKEN_PRUNE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        total = prune_expired_tokens(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} tokens removidos"))
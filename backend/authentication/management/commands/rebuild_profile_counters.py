@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from authentication.counters import rebuild_profile_counters
+from authentication.models import Profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula followers_count, following_count e posts_count dos perfis "
+        "a partir das tabelas"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = Profile.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+
+        total = 0
+        for start in range(1, last_id + 1, batch_size):
+            total += rebuild_profile_counters(
+                Profile.objects.filter(id__gte=start, id__lt=start + batch_size)
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{total} perfis recalculados"))
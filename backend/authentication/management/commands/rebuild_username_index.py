@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from authentication.usernames import get_index
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de prefixos de username usado na busca de usuários"
+
+    def handle(self, *args, **options):
+        total = get_index().rebuild()
+        if total is None:
+            self.stdout.write(self.style.WARNING("Reconstrução já em andamento"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{total} usernames indexados"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from backend.celery import enqueue
+from authentication import tasks
+from authentication.models import AccountDeletion
+
+
+class Command(BaseCommand):
+    help = "Reenfileira exclusões de conta não concluídas e mostra o progresso"
+
+    def handle(self, *args, **options):
+        pending = AccountDeletion.objects.filter(finished_at__isnull=True)
+        for deletion in pending.order_by("created_at"):
+            removed = sum(deletion.deleted.values())
+            self.stdout.write(
+                f"usuário {deletion.user_id}: etapa {deletion.stage or '-'}, "
+                f"{removed} linhas removidas"
+            )
+            enqueue(tasks.delete_account, deletion.user_id)
+
+        self.stdout.write(self.style.SUCCESS(f"{pending.count()} exclusões pendentes"))
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef("user_id")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Profile = apps.get_model("authentication", "Profile")
+    Follow = apps.get_model("follows", "Follow")
+    Post = apps.get_model("posts", "Post")
+    Profile.objects.update(
+        followers_count=count_subquery(Follow, "following"),
+        following_count=count_subquery(Follow, "follower"),
+        posts_count=count_subquery(Post, "author"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0005_account_deletion"),
+        ("follows", "0002_composite_indexes"),
+        ("posts", "0004_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="following_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
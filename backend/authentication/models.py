@@ -38,11 +38,30 @@ class Profile(models.Model):
     last_name = models.CharField(max_length=50, blank=True)
     bio = models.TextField(blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True)
     status = models.IntegerField(
         default=0, help_text="0 = first login, 1 = profile updated"
     )
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    posts_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.username}'s profile"
+
+
+class AccountDeletion(models.Model):
+    """Progress of the background purge of a deactivated account."""
+
+    # Not a foreign key: the record outlives the user it describes.
+    user_id = models.BigIntegerField(unique=True)
+    stage = models.CharField(max_length=32, blank=True)
+    deleted = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Deletion of user {self.user_id} ({self.stage or 'pending'})"
@@ -0,0 +1,110 @@
+"""
+Batched purge of a deactivated account.
+
+`user.delete()` would let Django's collector load every dependent row and
+delete them in one transaction. Instead each stage below deletes at most
+`batch_size` rows per statement, in autocommit, with the children of the
+user's posts going before the posts so no single DELETE cascades into an
+unbounded number of rows. Stages only ever delete what is left, so a
+purge interrupted at any point picks up where it stopped when run again.
+"""
+
+from functools import partial
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from follows import graph
+from follows.models import Follow, FollowSuggestion
+from posts.cache import invalidate_post
+from posts.models import Comment, Like, Post, TimelineEntry
+from posts.tasks import schedule_counter_refresh
+from . import avatars
+from .counters import adjust_follow_counts
+from .models import Profile, User
+
+
+def _batches(queryset, batch_size):
+    while True:
+        ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return
+        yield queryset.model.objects.filter(pk__in=ids)
+
+
+def _delete_and_recount(batch):
+    # Likes and comments on other people's posts change their counters.
+    post_ids = set(batch.values_list("post_id", flat=True))
+    deleted = batch.delete()[0]
+    for post_id in post_ids:
+        schedule_counter_refresh(post_id)
+    return deleted
+
+
+def _delete_posts(batch):
+    post_ids = list(batch.values_list("id", flat=True))
+    deleted = batch.delete()[0]
+    for post_id in post_ids:
+        invalidate_post(post_id)
+    return deleted
+
+
+def _delete_follows(batch):
+    # Skips the post_delete signals on purpose: the timeline entries their
+    # prune task would remove are already gone by this stage, and a popular
+    # account would otherwise enqueue one task per follower. The cached
+    # follow graph is updated in one call instead.
+    pairs = list(batch.values_list("follower_id", "following_id"))
+    with transaction.atomic():
+        transaction.on_commit(partial(graph.record_unfollows, pairs))
+        adjust_follow_counts(pairs, -1)
+        return batch._raw_delete(batch.db)
+
+
+def _delete_profile(batch):
+    for profile in batch:
+        avatars.delete_stale_variants(profile.id, keep=set())
+        if profile.avatar:
+            default_storage.delete(profile.avatar.name)
+    return batch.delete()[0]
+
+
+def _delete(batch):
+    return batch.delete()[0]
+
+
+def stages(user_id):
+    return [
+        ("likes", Like.objects.filter(user_id=user_id), _delete_and_recount),
+        ("comments", Comment.objects.filter(author_id=user_id), _delete_and_recount),
+        ("post_likes", Like.objects.filter(post__author_id=user_id), _delete),
+        ("post_comments", Comment.objects.filter(post__author_id=user_id), _delete),
+        ("timeline", TimelineEntry.objects.filter(user_id=user_id), _delete),
+        ("post_timelines", TimelineEntry.objects.filter(author_id=user_id), _delete),
+        ("posts", Post.objects.filter(author_id=user_id), _delete_posts),
+        (
+            "suggestions",
+            FollowSuggestion.objects.filter(
+                Q(user_id=user_id) | Q(suggested_id=user_id)
+            ),
+            _delete,
+        ),
+        ("following", Follow.objects.filter(follower_id=user_id), _delete_follows),
+        ("followers", Follow.objects.filter(following_id=user_id), _delete_follows),
+        ("profile", Profile.objects.filter(user_id=user_id), _delete_profile),
+        ("user", User.objects.filter(id=user_id, is_active=False), _delete),
+    ]
+
+
+def purge_account(deletion, batch_size):
+    for name, queryset, delete in stages(deletion.user_id):
+        for batch in _batches(queryset, batch_size):
+            deleted = delete(batch)
+            deletion.stage = name
+            deletion.deleted[name] = deletion.deleted.get(name, 0) + deleted
+            deletion.save(update_fields=["stage", "deleted", "updated_at"])
+
+    deletion.stage = "done"
+    deletion.finished_at = timezone.now()
+    deletion.save(update_fields=["stage", "finished_at", "updated_at"])
+    return deletion
@@ -0,0 +1,85 @@
+"""
+Blacklisted refresh-token JTIs cached in the Django cache.
+
+Checking a refresh token reads one cache key per JTI: True means
+revoked (kept until the token expires), False means the blacklist was
+checked and the token was not in it (kept AUTH_REVOCATION_CACHE_TIMEOUT
+seconds). A missing key, whether never cached or evicted, is unknown
+and is answered from simplejwt's BlacklistedToken table, so eviction
+costs a query but never lets a revoked token through.
+
+With AUTH_REVOCATION_CACHE_ISSUED (the default when the cache is Redis),
+CachedRefreshToken.for_user also writes False for the new token until it
+expires, so refreshing never reaches the database unless the key is
+evicted.
+
+True entries are written by the BlacklistedToken post_save signal once
+the transaction commits, overwriting any False entry. False entries from
+checks are only added when the key is absent, so a check racing a logout
+cannot hide it. With LocMemCache every process has its own entries, and
+a logout served by another process is seen after at most
+AUTH_REVOCATION_CACHE_TIMEOUT.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+
+def cache_key(jti):
+    return f"auth:revoked:{jti}"
+
+
+def _set_until(jti, value, expires_at):
+    timeout = int((expires_at - aware_utcnow()).total_seconds()) + 1
+    if timeout > 0:
+        cache.set(cache_key(jti), value, timeout)
+
+
+def mark_revoked(jti, expires_at):
+    _set_until(jti, True, expires_at)
+
+
+def mark_issued(jti, expires_at):
+    if settings.AUTH_REVOCATION_CACHE_ISSUED:
+        _set_until(jti, False, expires_at)
+
+
+def is_revoked(jti):
+    key = cache_key(jti)
+    revoked = cache.get(key)
+    if revoked is not None:
+        return revoked
+
+    token = (
+        BlacklistedToken.objects.filter(token__jti=jti)
+        .values_list("token__expires_at", flat=True)
+        .first()
+    )
+    if token is not None:
+        mark_revoked(jti, token)
+        return True
+    cache.add(key, False, settings.AUTH_REVOCATION_CACHE_TIMEOUT)
+    return False
+
+
+class CachedRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check reads the cache first."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        mark_issued(
+            token[api_settings.JTI_CLAIM],
+            datetime_from_epoch(token["exp"]),
+        )
+        return token
+
+    def check_blacklist(self):
+        if is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
@@ -1,4 +1,6 @@
+from django.conf import settings
 from rest_framework import serializers
+from . import avatars, usernames
 from .models import User, Profile
 
 
@@ -18,35 +20,83 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = User.objects.create_user(**validated_data)
         Profile.objects.create(user=user)
+        usernames.record_username(user.id, new=user.username)
         return user
 
 
+class AvatarVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        return avatars.variant_urls(value)
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(required=False, allow_null=True)
+    avatar_variants = AvatarVariantsField()
     username = serializers.CharField(source="user.username", required=False)
 
     class Meta:
         model = Profile
-        fields = ["username", "first_name", "last_name", "bio", "avatar", "status"]
+        fields = [
+            "username",
+            "first_name",
+            "last_name",
+            "bio",
+            "avatar",
+            "avatar_variants",
+            "status",
+        ]
+
+    def validate_avatar(self, value):
+        if value is not None:
+            try:
+                avatars.check_pixels(value.image)
+            except avatars.AvatarTooLarge:
+                raise serializers.ValidationError(
+                    "Imagem muito grande. O limite é de "
+                    f"{settings.AVATAR_MAX_PIXELS} pixels."
+                )
+        return value
 
     def update(self, instance, validated_data):
         user_data = validated_data.pop('user', {})
+        update_fields = [*validated_data, "updated_at"]
+        if "avatar" in validated_data:
+            instance.avatar_variants = {}
+            update_fields.append("avatar_variants")
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Only the edited fields, so the counters maintained elsewhere with
+        # F() updates are never overwritten by this stale copy.
+        instance.save(update_fields=update_fields)
         if 'username' in user_data:
             user = instance.user
+            old_username = user.username
             user.username = user_data['username']
             user.save()
+            if user.username != old_username:
+                usernames.record_username(user.id, old_username, user.username)
 
         return instance
 
 
 class ProfileDetailSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(required=False, allow_null=True)
+    avatar_variants = AvatarVariantsField()
     user = UserSerializer(read_only=True)
 
     class Meta:
         model = Profile
-        fields = ["user", "first_name", "last_name", "bio", "avatar", "status"]
\ No newline at end of file
+        fields = [
+            "user",
+            "first_name",
+            "last_name",
+            "bio",
+            "avatar",
+            "avatar_variants",
+            "status",
+            "followers_count",
+            "following_count",
+            "posts_count",
+        ]
+        read_only_fields = ["followers_count", "following_count", "posts_count"]
\ No newline at end of file
@@ -0,0 +1,35 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from .counters import rebuild_profile_counters
+from .models import User, Profile
+from .revocation import mark_revoked
+from .user_cache import invalidate_user
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    invalidate_user(instance.id)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user(instance.id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            partial(mark_revoked, instance.token.jti, instance.token.expires_at)
+        )
+
+
+@receiver(post_save, sender=Profile)
+def profile_created(sender, instance, created, **kwargs):
+    # Profiles can be created long after the user (profile view), so they
+    # start from the real counts rather than zero.
+    if created:
+        rebuild_profile_counters(Profile.objects.filter(pk=instance.pk))
@@ -0,0 +1,83 @@
+import logging
+from celery import shared_task
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from PIL import Image
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from backend.celery import RETRY_POLICY
+from . import avatars, purge, usernames
+from .models import AccountDeletion, User, Profile
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(**RETRY_POLICY)
+def delete_account(user_id):
+    # Only accounts already deactivated by the view are removed, so a
+    # replayed task can never delete a reactivated user.
+    if User.objects.filter(id=user_id, is_active=True).exists():
+        return
+    deletion, _ = AccountDeletion.objects.get_or_create(user_id=user_id)
+    if deletion.finished_at is None:
+        purge.purge_account(deletion, settings.ACCOUNT_PURGE_BATCH_SIZE)
+
+
+@shared_task(**RETRY_POLICY)
+def process_avatar(profile_id, previous_name=None):
+    profile = Profile.objects.filter(id=profile_id).first()
+    if profile is None:
+        return
+
+    variants = {}
+    if profile.avatar:
+        try:
+            with profile.avatar.open("rb") as file:
+                rendered = avatars.render_variants(file)
+        except (avatars.AvatarTooLarge, Image.DecompressionBombError, OSError):
+            logger.warning("Avatar inválido no perfil %s", profile_id, exc_info=True)
+            rendered = {}
+        variants = avatars.save_variants(profile_id, rendered)
+
+    # A newer upload may have landed while we were rendering; its own task
+    # owns the variants then.
+    unchanged = Q(avatar=profile.avatar.name)
+    if not profile.avatar:
+        unchanged = Q(avatar="") | Q(avatar__isnull=True)
+    updated = Profile.objects.filter(unchanged, id=profile_id).update(
+        avatar_variants=variants
+    )
+    if updated:
+        avatars.delete_stale_variants(profile_id, avatars.variant_names(variants))
+
+    if previous_name and not Profile.objects.filter(avatar=previous_name).exists():
+        default_storage.delete(previous_name)
+
+
+@shared_task(**RETRY_POLICY)
+def prune_expired_tokens(batch_size=None):
+    # Small chunks keep each DELETE (and its BlacklistedToken cascade) short,
+    # so logins and logouts are never stuck behind one huge transaction.
+    batch_size = batch_size or settings.TOKEN_PRUNE_BATCH_SIZE
+    expired = OutstandingToken.objects.filter(expires_at__lte=aware_utcnow())
+
+    total = 0
+    while True:
+        ids = list(expired.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        total += len(ids)
+
+    logger.info("%s tokens expirados removidos", total)
+    return total
+
+
+@shared_task(**RETRY_POLICY)
+def rebuild_username_index():
+    total = usernames.get_index().rebuild()
+    if total is None:
+        logger.info("rebuild_username_index skipped: another rebuild is running")
+    else:
+        logger.info("rebuild_username_index indexed=%d", total)
@@ -8,6 +8,21 @@ from .models import Profile
 User = get_user_model()
 
 
+def image_upload(name, size=(10, 10), exif=False):
+    from io import BytesIO
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image
+
+    image = Image.new("RGB", size, "red")
+    metadata = image.getexif()
+    if exif:
+        metadata[0x010F] = "Camera"
+    buffer = BytesIO()
+    image_format = "JPEG" if name.endswith(".jpg") else "PNG"
+    image.save(buffer, format=image_format, exif=metadata)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -96,6 +111,122 @@ class TestUserLogin:
         response = api_client.post("/api/auth/login/", {})
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
+    def test_login_hashes_on_pool(self, api_client, user, monkeypatch):
+        import threading
+        from . import hashing
+
+        threads = []
+        verify_password = hashing.verify_password
+
+        def record(*args):
+            threads.append(threading.current_thread().name)
+            return verify_password(*args)
+
+        monkeypatch.setattr(hashing, "verify_password", record)
+        response = api_client.post(
+            "/api/auth/login/", {"email": user.email, "password": "testpass123"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert threads and threads[0].startswith("login-hash")
+
+    def test_login_unknown_email_still_hashes(self, api_client, monkeypatch):
+        from . import hashing
+
+        calls = []
+        monkeypatch.setattr(
+            hashing, "verify_password", lambda *args: calls.append(args) or (False, False)
+        )
+        response = api_client.post(
+            "/api/auth/login/", {"email": "wrong@example.com", "password": "wrongpass"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert len(calls) == 1
+
+    def test_login_throttled_per_email(self, api_client, user, settings, monkeypatch):
+        from . import hashing
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"login_ip": None, "login_email": "2/min"},
+        }
+        calls = []
+        monkeypatch.setattr(
+            hashing, "verify_password", lambda *args: calls.append(args) or (False, False)
+        )
+        data = {"email": user.email.upper(), "password": "wrongpass"}
+        for _ in range(2):
+            response = api_client.post("/api/auth/login/", data)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api_client.post("/api/auth/login/", data)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response["Retry-After"]) > 0
+        assert len(calls) == 2
+
+        other = {"email": "other@example.com", "password": "wrongpass"}
+        response = api_client.post("/api/auth/login/", other)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_throttled_per_ip(self, api_client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"login_ip": "2/min", "login_email": None},
+        }
+        for i in range(2):
+            response = api_client.post(
+                "/api/auth/login/", {"email": f"u{i}@example.com", "password": "x"}
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api_client.post(
+            "/api/auth/login/", {"email": "u3@example.com", "password": "x"}
+        )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_login_ip_ignores_spoofed_forwarded_for(self, api_client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"login_ip": "2/min", "login_email": None},
+        }
+        for i in range(3):
+            response = api_client.post(
+                "/api/auth/login/",
+                {"email": f"u{i}@example.com", "password": "x"},
+                HTTP_X_FORWARDED_FOR=f"10.0.0.{i}",
+            )
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+    def test_login_ip_behind_proxy(self, api_client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "NUM_PROXIES": 1,
+            "DEFAULT_THROTTLE_RATES": {"login_ip": "1/min", "login_email": None},
+        }
+        data = {"email": "wrong@example.com", "password": "x"}
+        for client_ip in ("10.0.0.1", "10.0.0.2"):
+            response = api_client.post(
+                "/api/auth/login/",
+                data,
+                HTTP_X_FORWARDED_FOR=f"1.2.3.4, {client_ip}",
+            )
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_bucket_refills(self, api_client, settings, monkeypatch):
+        from .throttling import TokenBucketThrottle
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"login_ip": "1/min", "login_email": None},
+        }
+        now = [1000.0]
+        monkeypatch.setattr(TokenBucketThrottle, "timer", lambda self: now[0])
+        data = {"email": "wrong@example.com", "password": "x"}
+
+        assert api_client.post("/api/auth/login/", data).status_code == 401
+        assert api_client.post("/api/auth/login/", data).status_code == 429
+        now[0] += 60
+        assert api_client.post("/api/auth/login/", data).status_code == 401
+
 
 @pytest.mark.django_db
 class TestTokenRefresh:
@@ -134,6 +265,135 @@ class TestLogout:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+@pytest.mark.django_db
+class TestTokenRevocation:
+    def test_refresh_after_logout_rejected_from_cache(
+        self,
+        api_client,
+        user,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        refresh = str(RefreshToken.for_user(user))
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/api/auth/logout/", {"refresh": refresh})
+
+        with django_assert_num_queries(0):
+            response = api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_refresh_skips_database_once_checked(
+        self, api_client, user, django_assert_num_queries
+    ):
+        refresh = str(RefreshToken.for_user(user))
+        api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+
+        with django_assert_num_queries(0):
+            response = api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_first_refresh_skips_database_with_shared_cache(
+        self, api_client, user, settings, django_assert_num_queries
+    ):
+        settings.AUTH_REVOCATION_CACHE_ISSUED = True
+        response = api_client.post(
+            "/api/auth/login/", {"email": user.email, "password": "testpass123"}
+        )
+        refresh = response.data["refresh"]
+
+        with django_assert_num_queries(0):
+            response = api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_logout_overrides_issued_entry(
+        self, api_client, user, settings, django_capture_on_commit_callbacks
+    ):
+        from .revocation import CachedRefreshToken
+
+        settings.AUTH_REVOCATION_CACHE_ISSUED = True
+        refresh = str(CachedRefreshToken.for_user(user))
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/api/auth/logout/", {"refresh": refresh})
+
+        response = api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_issued_entry_needs_shared_cache(self, user, settings):
+        from django.core.cache import cache
+        from .revocation import CachedRefreshToken, cache_key
+
+        settings.AUTH_REVOCATION_CACHE_ISSUED = False
+        refresh = CachedRefreshToken.for_user(user)
+        assert cache.get(cache_key(refresh["jti"])) is None
+
+    def test_logout_overrides_cached_check(
+        self, api_client, user, django_capture_on_commit_callbacks
+    ):
+        refresh = str(RefreshToken.for_user(user))
+        api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/api/auth/logout/", {"refresh": refresh})
+
+        response = api_client.post("/api/auth/token/refresh/", {"refresh": refresh})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_evicted_entry_falls_back_to_database(
+        self, api_client, user, django_capture_on_commit_callbacks
+    ):
+        from django.core.cache import cache
+        from .revocation import cache_key
+
+        refresh = RefreshToken.for_user(user)
+        with django_capture_on_commit_callbacks(execute=True):
+            refresh.blacklist()
+        cache.delete(cache_key(refresh["jti"]))
+
+        response = api_client.post(
+            "/api/auth/token/refresh/", {"refresh": str(refresh)}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert cache.get(cache_key(refresh["jti"])) is True
+
+    def test_cold_cache_reads_blacklist(self, api_client, user):
+        from django.core.cache import cache
+
+        refresh = RefreshToken.for_user(user)
+        refresh.blacklist()
+        cache.clear()
+
+        response = api_client.post(
+            "/api/auth/token/refresh/", {"refresh": str(refresh)}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_prune_expired_tokens(self, user):
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken,
+            OutstandingToken,
+        )
+
+        past = timezone.now() - timedelta(days=1)
+        expired = OutstandingToken.objects.bulk_create(
+            [
+                OutstandingToken(user=user, jti=f"old-{i}", token="x", expires_at=past)
+                for i in range(5)
+            ]
+        )
+        BlacklistedToken.objects.create(token=expired[0])
+        live = RefreshToken.for_user(user)
+        live.blacklist()
+
+        call_command("prune_expired_tokens", "--batch-size", "2")
+
+        assert list(OutstandingToken.objects.values_list("jti", flat=True)) == [
+            live["jti"]
+        ]
+        assert BlacklistedToken.objects.count() == 1
+
+
 @pytest.mark.django_db
 class TestProfile:
     def test_get_profile(self, authenticated_client, user):
@@ -162,6 +422,105 @@ class TestProfile:
         assert response.status_code == status.HTTP_200_OK
         assert response.data["first_name"] == "Maria"
 
+    def test_update_avatar_removes_replaced_file(
+        self, authenticated_client, user, settings, tmp_path
+    ):
+        settings.MEDIA_ROOT = tmp_path
+        for name in ("first.png", "second.png"):
+            response = authenticated_client.put(
+                "/api/auth/profile/update/",
+                {"avatar": image_upload(name)},
+                format="multipart",
+            )
+            assert response.status_code == status.HTTP_200_OK
+        profile = Profile.objects.get(user=user)
+        originals = [
+            path.name for path in (tmp_path / "avatars").iterdir() if path.is_file()
+        ]
+        assert originals == [profile.avatar.name.split("/")[-1]]
+        assert len(list((tmp_path / "avatars" / str(profile.id)).iterdir())) == 6
+
+    def test_update_avatar_creates_variants(
+        self, authenticated_client, user, settings, tmp_path
+    ):
+        from PIL import Image
+
+        settings.MEDIA_ROOT = tmp_path
+        response = authenticated_client.put(
+            "/api/auth/profile/update/",
+            {"avatar": image_upload("photo.jpg", size=(640, 480), exif=True)},
+            format="multipart",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        profile = Profile.objects.get(user=user)
+        assert set(profile.avatar_variants) == {"48", "96", "256"}
+        for size, formats in profile.avatar_variants.items():
+            for extension, name in formats.items():
+                assert name.endswith(f"-{size}.{extension}")
+                with Image.open(tmp_path / name) as image:
+                    assert image.size == (int(size), int(size))
+                    assert not image.getexif()
+
+        response = authenticated_client.get(f"/api/auth/profile/{user.id}/")
+        assert response.data["avatar_variants"]["96"]["webp"] == (
+            f"/media/{profile.avatar_variants['96']['webp']}"
+        )
+
+    def test_update_avatar_keeps_transparency(
+        self, authenticated_client, user, settings, tmp_path
+    ):
+        from io import BytesIO
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        settings.MEDIA_ROOT = tmp_path
+        buffer = BytesIO()
+        Image.new("RGBA", (64, 64), (0, 0, 0, 0)).save(buffer, format="PNG")
+        response = authenticated_client.put(
+            "/api/auth/profile/update/",
+            {"avatar": SimpleUploadedFile("logo.png", buffer.getvalue())},
+            format="multipart",
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        variants = Profile.objects.get(user=user).avatar_variants["48"]
+        with Image.open(tmp_path / variants["jpeg"]) as image:
+            assert image.convert("RGB").getpixel((24, 24)) == (255, 255, 255)
+        with Image.open(tmp_path / variants["webp"]) as image:
+            assert image.mode == "RGBA"
+            assert image.getpixel((24, 24))[3] == 0
+
+    def test_update_avatar_rejects_too_many_pixels(
+        self, authenticated_client, user, settings, tmp_path
+    ):
+        settings.MEDIA_ROOT = tmp_path
+        settings.AVATAR_MAX_PIXELS = 50 * 50
+        response = authenticated_client.put(
+            "/api/auth/profile/update/",
+            {"avatar": image_upload("huge.png", size=(51, 50))},
+            format="multipart",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "avatar" in response.data
+
+    def test_remove_avatar_deletes_variants(
+        self, authenticated_client, user, settings, tmp_path
+    ):
+        settings.MEDIA_ROOT = tmp_path
+        authenticated_client.put(
+            "/api/auth/profile/update/",
+            {"avatar": image_upload("photo.png")},
+            format="multipart",
+        )
+        response = authenticated_client.put(
+            "/api/auth/profile/update/", {"avatar": ""}, format="multipart"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["avatar_variants"] == {}
+        profile = Profile.objects.get(user=user)
+        assert list((tmp_path / "avatars" / str(profile.id)).iterdir()) == []
+
     def test_get_profile_detail(self, authenticated_client, user):
         response = authenticated_client.get(f"/api/auth/profile/{user.id}/")
         assert response.status_code == status.HTTP_200_OK
@@ -172,6 +531,170 @@ class TestProfile:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestUserCache:
+    def _user_queries(self, client, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return [
+            query
+            for query in context.captured_queries
+            if 'FROM "authentication_user"' in query["sql"]
+        ]
+
+    def test_second_request_skips_user_query(self, authenticated_client, user):
+        url = "/api/posts/my-posts/"
+        assert len(self._user_queries(authenticated_client, url)) == 1
+        assert self._user_queries(authenticated_client, url) == []
+
+    def test_shared_cache_is_used_across_processes(self, authenticated_client, user):
+        from .user_cache import clear_local
+
+        self._user_queries(authenticated_client, "/api/posts/my-posts/")
+        clear_local()
+        assert self._user_queries(authenticated_client, "/api/posts/my-posts/") == []
+
+    def test_change_password_invalidates(self, authenticated_client, user):
+        from django.core.cache import cache
+        from .user_cache import cache_key
+
+        authenticated_client.get("/api/auth/profile/")
+        authenticated_client.put(
+            "/api/auth/change-password/",
+            {"old_password": "testpass123", "new_password": "newpass12345"},
+        )
+        assert cache.get(cache_key(user.id)) is None
+        user.refresh_from_db()
+        assert user.check_password("newpass12345")
+        assert user.email == "test@example.com"
+
+    def test_username_change_invalidates(self, authenticated_client, user):
+        from .user_cache import get_user
+
+        authenticated_client.get("/api/auth/profile/")
+        authenticated_client.put("/api/auth/profile/update/", {"username": "renamed"})
+        assert get_user(user.id).username == "renamed"
+
+    def test_delete_account_invalidates(self, authenticated_client, user):
+        authenticated_client.get("/api/auth/profile/")
+        authenticated_client.delete("/api/auth/users/me/delete/")
+        response = authenticated_client.get("/api/auth/profile/")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestUserBatch:
+    def test_user_batch(self, authenticated_client, user, admin_user):
+        response = authenticated_client.get(
+            f"/api/auth/users/batch/?ids={admin_user.id},999,{user.id}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["user"]["id"] for item in response.data["results"]] == [
+            admin_user.id,
+            user.id,
+        ]
+        assert response.data["missing"] == [999]
+
+    def test_user_batch_requires_ids(self, authenticated_client):
+        response = authenticated_client.get("/api/auth/users/batch/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_user_batch_unauthorized(self, api_client):
+        response = api_client.get("/api/auth/users/batch/?ids=1")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestUserSearch:
+    def search(self, client, prefix, **params):
+        response = client.get("/api/auth/users/search/", {"prefix": prefix, **params})
+        assert response.status_code == status.HTTP_200_OK
+        return [item["username"] for item in response.data["results"]]
+
+    def test_search_by_prefix(self, authenticated_client, user):
+        for name in ["Maria", "mariana", "marcos", "joao"]:
+            User.objects.create_user(username=name, email=f"{name}@example.com")
+
+        assert self.search(authenticated_client, "mar") == ["marcos", "Maria", "mariana"]
+        assert self.search(authenticated_client, "MARI") == ["Maria", "mariana"]
+        assert self.search(authenticated_client, "mar", limit=1) == ["marcos"]
+        assert self.search(authenticated_client, "x") == []
+
+    def test_register_and_rename_update_index(self, api_client, authenticated_client):
+        assert self.search(authenticated_client, "nov") == []
+
+        api_client.post(
+            "/api/auth/register/",
+            {"username": "novato", "email": "novato@example.com", "password": "pass12345"},
+        )
+        assert self.search(authenticated_client, "nov") == ["novato"]
+
+        authenticated_client.put("/api/auth/profile/update/", {"username": "renomeado"})
+        assert self.search(authenticated_client, "test") == []
+        assert self.search(authenticated_client, "reno") == ["renomeado"]
+
+    def test_deleted_account_leaves_index(self, authenticated_client, admin_user):
+        assert self.search(authenticated_client, "adm") == ["admin"]
+
+        refresh = RefreshToken.for_user(admin_user)
+        admin_client = APIClient()
+        admin_client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        admin_client.delete("/api/auth/users/me/delete/")
+        assert self.search(authenticated_client, "adm") == []
+
+    def test_stale_local_index_reloads_off_the_request(
+        self, user, monkeypatch, django_assert_num_queries
+    ):
+        from .usernames import LocalUsernameIndex
+
+        reloads = []
+        monkeypatch.setattr(
+            LocalUsernameIndex, "_reload", lambda self: reloads.append(self)
+        )
+        index = LocalUsernameIndex(timeout=60)
+        index.search("test", 10)
+        User.objects.create_user(username="tester", email="tester@example.com")
+        index._expires = 0
+
+        with django_assert_num_queries(0):
+            assert len(index.search("test", 10)) == 1
+            index.search("test", 10)
+        assert reloads == [index]
+
+    def test_missing_index_falls_back_to_database(
+        self, authenticated_client, monkeypatch
+    ):
+        from . import usernames
+
+        class MissingIndex:
+            def search(self, prefix, limit):
+                return None
+
+            def clear(self):
+                pass
+
+        monkeypatch.setattr(usernames, "get_index", MissingIndex)
+        User.objects.create_user(username="Maria", email="maria@example.com")
+        User.objects.create_user(username="marcos", email="marcos@example.com")
+        User.objects.create_user(
+            username="mariana", email="mariana@example.com", is_active=False
+        )
+
+        assert self.search(authenticated_client, "MAR") == ["marcos", "Maria"]
+
+    def test_search_requires_prefix(self, authenticated_client):
+        response = authenticated_client.get("/api/auth/users/search/")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_unauthorized(self, api_client):
+        response = api_client.get("/api/auth/users/search/?prefix=a")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 @pytest.mark.django_db
 class TestChangePassword:
     def test_change_password_success(self, authenticated_client, user):
@@ -233,6 +756,24 @@ class TestDeleteAccount:
         assert response.status_code == status.HTTP_200_OK
         assert not User.objects.filter(id=user_id).exists()
 
+    def test_delete_account_blocks_login(self, api_client, user, user_data):
+        from .tasks import delete_account
+
+        User.objects.filter(id=user.id).update(is_active=False)
+        response = api_client.post(
+            "/api/auth/login/",
+            {"email": user_data["email"], "password": user_data["password"]},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        delete_account.apply(args=[user.id])
+        assert not User.objects.filter(id=user.id).exists()
+
+    def test_delete_account_task_keeps_active_users(self, user):
+        from .tasks import delete_account
+
+        delete_account.apply(args=[user.id])
+        assert User.objects.filter(id=user.id).exists()
+
     def test_delete_account_unauthorized(self, api_client):
         response = api_client.delete("/api/auth/users/me/delete/")
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,72 @@
+"""
+Token-bucket throttles for the login endpoint.
+
+DRF runs throttles before the view, so requests over the limit get a 429
+without ever reaching the password hasher. A bucket holds up to `N`
+tokens for a rate of `N/period` and refills continuously, which allows a
+short burst (a typo or two) while capping sustained credential stuffing.
+Both the per-IP and the per-email bucket must have a token to pass.
+
+The IP comes from DRF's get_ident(), which trusts X-Forwarded-For only as
+far as the NUM_PROXIES setting allows, so clients cannot pick a fresh
+bucket by sending their own header.
+"""
+
+import hashlib
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    # The read-modify-write on the cache is not atomic, so concurrent
+    # requests can overdraw a bucket by a few tokens; that's fine for
+    # slowing down an attack and saves a round trip per request.
+
+    def get_rate(self):
+        # Read the rates live so settings overrides apply without a restart.
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        refill = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated) * refill)
+
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill
+            return False
+
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email")
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Hashed so keys stay short and addresses are not stored in the cache.
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
@@ -1,5 +1,6 @@
 from django.urls import path
-from . import views
+from backend.async_api import read_view
+from . import async_views, views
 
 urlpatterns = [
     path("register/", views.register, name="register"),
@@ -8,8 +9,16 @@ urlpatterns = [
     path("token/refresh/", views.token_refresh, name="token_refresh"),
     path("profile/", views.profile, name="profile"),
     path("profile/update/", views.profile_update, name="profile_update"),
-    path("profile/<int:user_id>/", views.profile_detail, name="profile_detail"),
+    path(
+        "profile/<int:user_id>/",
+        read_view("profile_detail", views, async_views),
+        name="profile_detail",
+    ),
     path("change-password/", views.change_password, name="change_password"),
     path("users/", views.user_list, name="user_list"),
+    path(
+        "users/batch/", read_view("user_batch", views, async_views), name="user_batch"
+    ),
+    path("users/search/", views.user_search, name="user_search"),
     path("users/me/delete/", views.delete_account, name="delete_account"),
 ]
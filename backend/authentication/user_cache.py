@@ -0,0 +1,87 @@
+"""
+Cache of the minimal user record JWT authentication needs per request.
+
+Lookups hit a short-lived per-process dict first, then the shared Django
+cache (Redis in production), and only then the database. Users are
+rebuilt with the remaining fields deferred, so saving one only writes
+the fields that were loaded or changed.
+"""
+
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.base import DEFERRED
+from .models import User
+
+FIELDS = ("id", "username", "email", "is_active", "is_superuser")
+
+_local = {}
+_local_lock = threading.Lock()
+
+
+def cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _local_get(user_id):
+    entry = _local.get(str(user_id))
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _local_set(user_id, record):
+    with _local_lock:
+        if len(_local) >= settings.AUTH_USER_LOCAL_CACHE_SIZE:
+            _local.pop(next(iter(_local)))
+        _local[str(user_id)] = (
+            time.monotonic() + settings.AUTH_USER_LOCAL_CACHE_TIMEOUT,
+            record,
+        )
+
+
+def clear_local():
+    with _local_lock:
+        _local.clear()
+
+
+def to_user(record):
+    fields = User._meta.concrete_fields
+    values = [record.get(field.attname, DEFERRED) for field in fields]
+    return User.from_db("default", [field.attname for field in fields], values)
+
+
+def get_user(user_id):
+    record = _local_get(user_id)
+    if record is None:
+        record = cache.get(cache_key(user_id))
+        if record is None:
+            record = User.objects.filter(id=user_id).values(*FIELDS).first()
+            if record is None:
+                raise User.DoesNotExist
+            cache.set(cache_key(user_id), record, settings.AUTH_USER_CACHE_TIMEOUT)
+        _local_set(user_id, record)
+    return to_user(record)
+
+
+async def aget_user(user_id):
+    record = _local_get(user_id)
+    if record is None:
+        record = await cache.aget(cache_key(user_id))
+        if record is None:
+            record = await User.objects.filter(id=user_id).values(*FIELDS).afirst()
+            if record is None:
+                raise User.DoesNotExist
+            await cache.aset(
+                cache_key(user_id), record, settings.AUTH_USER_CACHE_TIMEOUT
+            )
+        _local_set(user_id, record)
+    return to_user(record)
+
+
+def invalidate_user(user_id):
+    # Other processes keep their copy for at most AUTH_USER_LOCAL_CACHE_TIMEOUT.
+    with _local_lock:
+        _local.pop(str(user_id), None)
+    cache.delete(cache_key(user_id))
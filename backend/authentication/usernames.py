@@ -0,0 +1,283 @@
+"""
+Username prefix index for mentions and typeahead.
+
+Every active user is one string, "<lowercase>\\0<username>\\0<id>", kept
+sorted, so a prefix is a contiguous range found by binary search: a
+Redis sorted set read with ZRANGEBYLEX when REDIS_URL is set, otherwise
+a per-process list searched with bisect. Register, username change and
+account deletion keep it current (record_username).
+
+Full builds stay off the typeahead path. The Redis index is rebuilt by
+the rebuild_username_index task (daily on Celery beat, or the command
+of the same name); while it does not exist, searches are answered from
+the User table and one rebuild is queued. The local list is built on
+first use and then reloaded in a background thread every
+USERNAME_INDEX_LOCAL_TIMEOUT seconds, which bounds the drift from
+writes served by other processes.
+"""
+
+import threading
+import time
+import uuid
+from bisect import bisect_left, insort
+from functools import lru_cache
+import redis
+from django.conf import settings
+from django.db import connections
+from django.db.models.functions import Lower
+from django.utils.module_loading import import_string
+from backend.celery import enqueue
+from .models import User
+
+SEPARATOR = "\0"
+MAX_LIMIT = 50
+
+
+def member(user_id, username):
+    return SEPARATOR.join([username.lower(), username, str(user_id)])
+
+
+def parse_member(value):
+    _, username, user_id = value.split(SEPARATOR)
+    return {"id": int(user_id), "username": username}
+
+
+def load(chunk_size=10_000):
+    rows = (
+        User.objects.filter(is_active=True)
+        .values_list("id", "username")
+        .iterator(chunk_size=chunk_size)
+    )
+    return (member(user_id, username) for user_id, username in rows)
+
+
+def search_database(prefix, limit):
+    """The index's answer read from the User table, for when it is not built."""
+    rows = (
+        User.objects.filter(is_active=True, username__istartswith=prefix)
+        .order_by(Lower("username"), "username")
+        .values_list("id", "username")[:limit]
+    )
+    return [member(user_id, username) for user_id, username in rows]
+
+
+class LocalUsernameIndex:
+    """Per-process sorted list searched with bisect (dev and tests)."""
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or settings.USERNAME_INDEX_LOCAL_TIMEOUT
+        self._members = None
+        self._expires = 0
+        self._reloading = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def _load(self):
+        members = sorted(load())
+        with self._lock:
+            self._members = members
+            self._expires = time.monotonic() + self.timeout
+        return members
+
+    def _reload(self):
+        try:
+            self._load()
+        finally:
+            self._reloading = False
+            connections.close_all()
+
+    def _ensure(self):
+        members = self._members
+        if members is None:
+            # Only the first search builds inline; concurrent ones wait for it.
+            with self._build_lock:
+                members = self._members
+                if members is None:
+                    members = self._load()
+        elif self._expires < time.monotonic():
+            with self._lock:
+                start = not self._reloading
+                self._reloading = True
+            if start:
+                threading.Thread(
+                    target=self._reload, name="username-index", daemon=True
+                ).start()
+        return members
+
+    def search(self, prefix, limit):
+        members = self._ensure()
+        start = bisect_left(members, prefix)
+        results = []
+        for value in members[start : start + limit]:
+            if not value.startswith(prefix):
+                break
+            results.append(value)
+        return results
+
+    def update(self, old, new):
+        with self._lock:
+            if self._members is None:
+                return
+            if old is not None:
+                position = bisect_left(self._members, old)
+                if position < len(self._members) and self._members[position] == old:
+                    del self._members[position]
+            if new is not None:
+                insort(self._members, new)
+
+    def rebuild(self):
+        return len(self._load())
+
+    def clear(self):
+        with self._lock:
+            self._members = None
+
+
+class RedisUsernameIndex:
+    """One sorted set in Redis, every member at score 0, read by lex range."""
+
+    KEY = "usernames:index"
+
+    # Sorts before every real member and marks the set as built, so an
+    # index with no users still exists in Redis.
+    LOADED = ""
+
+    # Only touch a built index; a missing one is rebuilt in full by
+    # rebuild_username_index. While a build runs (KEYS[2] names its set),
+    # the update is also logged for it, since the rows it has already read
+    # may be older than this change.
+    UPDATE_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        if ARGV[1] ~= '' then redis.call('ZREM', KEYS[1], ARGV[1]) end
+        if ARGV[2] ~= '' then redis.call('ZADD', KEYS[1], 0, ARGV[2]) end
+    end
+    local building = redis.call('GET', KEYS[2])
+    if building then
+        local log = building .. ':log'
+        redis.call('RPUSH', log, ARGV[1], ARGV[2])
+        redis.call('EXPIRE', log, ARGV[3])
+    end
+    """
+
+    # Replays the updates logged during the build onto the new set and
+    # swaps it in, in one step so no update falls between the two.
+    PUBLISH_SCRIPT = """
+    local log = redis.call('LRANGE', KEYS[2], 0, -1)
+    for i = 1, #log, 2 do
+        if log[i] ~= '' then redis.call('ZREM', KEYS[1], log[i]) end
+        if log[i + 1] ~= '' then redis.call('ZADD', KEYS[1], 0, log[i + 1]) end
+    end
+    redis.call('RENAME', KEYS[1], KEYS[3])
+    redis.call('PERSIST', KEYS[3])
+    redis.call('DEL', KEYS[2])
+    if redis.call('GET', KEYS[4]) == ARGV[1] then redis.call('DEL', KEYS[4]) end
+    return #log / 2
+    """
+
+    RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    # Upper bound on one build; the lock and the temporary key expire
+    # after it if the builder dies.
+    BUILD_TIMEOUT = 600
+    # How long a missing index waits before queueing another rebuild.
+    QUEUE_TIMEOUT = 60
+
+    def __init__(self, url=None):
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.update_script = self.client.register_script(self.UPDATE_SCRIPT)
+        self.release_script = self.client.register_script(self.RELEASE_SCRIPT)
+        self.publish_script = self.client.register_script(self.PUBLISH_SCRIPT)
+
+    def search(self, prefix, limit):
+        """Matching members, or None while the index is not built."""
+        prefix = prefix.encode()
+        with self.client.pipeline(transaction=False) as pipeline:
+            pipeline.exists(self.KEY)
+            pipeline.zrangebylex(
+                self.KEY, b"[" + prefix, b"[" + prefix + b"\xff", start=0, num=limit
+            )
+            exists, values = pipeline.execute()
+        if not exists:
+            self.queue_rebuild()
+            return None
+        return [value.decode() for value in values]
+
+    def queue_rebuild(self):
+        from .tasks import rebuild_username_index
+
+        if self.client.set(f"{self.KEY}:queued", 1, nx=True, ex=self.QUEUE_TIMEOUT):
+            enqueue(rebuild_username_index)
+
+    def update(self, old, new):
+        self.update_script(
+            keys=[self.KEY, f"{self.KEY}:building"],
+            args=[old or "", new or "", self.BUILD_TIMEOUT],
+        )
+
+    def rebuild(self, chunk_size=10_000):
+        """Build a new index and swap it in; None if a build is already running."""
+        lock, token = f"{self.KEY}:lock", uuid.uuid4().hex
+        if not self.client.set(lock, token, nx=True, ex=self.BUILD_TIMEOUT):
+            return None
+        # A key of its own, so even a build outliving its lock never
+        # shares (or deletes) another one's set, and swapped in by
+        # PUBLISH_SCRIPT, so searches never see a half-built index. It is
+        # published under KEY:building before reading any row, so every
+        # update made after the snapshot is logged and replayed.
+        building = f"{self.KEY}:building:{token}"
+        current = f"{self.KEY}:building"
+        try:
+            with self.client.pipeline() as pipeline:
+                pipeline.zadd(building, {self.LOADED: 0})
+                pipeline.expire(building, self.BUILD_TIMEOUT)
+                pipeline.set(current, building, ex=self.BUILD_TIMEOUT)
+                pipeline.execute()
+            total, chunk = 0, {}
+            for value in load(chunk_size):
+                chunk[value] = 0
+                if len(chunk) >= chunk_size:
+                    self.client.zadd(building, chunk)
+                    total, chunk = total + len(chunk), {}
+            if chunk:
+                self.client.zadd(building, chunk)
+                total += len(chunk)
+            self.publish_script(
+                keys=[building, f"{building}:log", self.KEY, current],
+                args=[building],
+            )
+            return total
+        finally:
+            self.client.delete(building, f"{building}:log")
+            self.release_script(keys=[current], args=[building])
+            self.release_script(keys=[lock], args=[token])
+
+    def clear(self):
+        self.client.delete(self.KEY)
+
+
+@lru_cache(maxsize=None)
+def get_index():
+    return import_string(settings.USERNAME_INDEX_BACKEND)()
+
+
+def search(prefix, limit=None):
+    """Up to `limit` active users whose username starts with `prefix`."""
+    limit = min(limit or settings.USERNAME_SEARCH_LIMIT, MAX_LIMIT)
+    prefix = prefix.lower()
+    values = get_index().search(prefix, limit)
+    if values is None:
+        values = search_database(prefix, limit)
+    return [parse_member(value) for value in values]
+
+
+def record_username(user_id, old=None, new=None):
+    """Move user_id from username `old` to `new`; None adds or removes."""
+    get_index().update(
+        member(user_id, old) if old else None,
+        member(user_id, new) if new else None,
+    )
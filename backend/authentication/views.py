@@ -1,10 +1,18 @@
 from django.conf import settings
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import ParseError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from .models import User, Profile
+from backend.batch import get_batch_data, parse_ids
+from backend.budgets import query_budget
+from backend.celery import enqueue
+from backend.pagination import get_paginator
+from . import hashing, tasks, usernames
+from .models import AccountDeletion, User, Profile
+from .revocation import CachedRefreshToken
+from .throttling import LoginEmailThrottle, LoginIPThrottle
+from .user_cache import invalidate_user
 from .serializers import (
     UserSerializer,
     UserRegistrationSerializer,
@@ -31,14 +39,15 @@ def register(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginEmailThrottle])
 def login(request):
     email = request.data.get("email")
     password = request.data.get("password")
 
     if email and password:
-        user = User.objects.filter(email=email).first()
-        if user and user.check_password(password):
-            refresh = RefreshToken.for_user(user)
+        user = User.objects.filter(email=email, is_active=True).first()
+        if hashing.check_password(user, password):
+            refresh = CachedRefreshToken.for_user(user)
 
             response = Response(
                 {
@@ -88,9 +97,12 @@ def profile(request):
 @permission_classes([IsAuthenticated])
 def profile_update(request):
     profile, created = Profile.objects.get_or_create(user=request.user)
+    previous_avatar = profile.avatar.name
     serializer = ProfileSerializer(profile, data=request.data, partial=True)
     if serializer.is_valid():
         serializer.save()
+        if profile.avatar.name != previous_avatar:
+            enqueue(tasks.process_avatar, profile.id, previous_avatar)
         return Response(serializer.data)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -106,7 +118,7 @@ def token_refresh(request):
         )
 
     try:
-        refresh = RefreshToken(refresh_token)
+        refresh = CachedRefreshToken(refresh_token)
         access_token = refresh.access_token
 
         response = Response({"access": str(access_token)})
@@ -139,7 +151,7 @@ def logout(request):
         )
 
     try:
-        refresh = RefreshToken(refresh_token)
+        refresh = CachedRefreshToken(refresh_token)
         refresh.blacklist()
 
         response = Response({"message": "Logout realizado com sucesso"})
@@ -176,6 +188,32 @@ def profile_detail(request, user_id):
         )
 
 
+@query_budget(2)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def user_batch(request):
+    user_ids = parse_ids(request)
+    profiles = Profile.objects.filter(user_id__in=user_ids).select_related("user")
+    found = {
+        profile.user_id: ProfileDetailSerializer(profile).data for profile in profiles
+    }
+    return Response(get_batch_data(user_ids, found))
+
+
+@query_budget(2, page_size=settings.USERNAME_SEARCH_LIMIT)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def user_search(request):
+    prefix = request.query_params.get("prefix", "").strip()
+    if not prefix:
+        raise ParseError("Parâmetro prefix é obrigatório")
+    try:
+        limit = int(request.query_params.get("limit", settings.USERNAME_SEARCH_LIMIT))
+    except ValueError:
+        raise ParseError("limit deve ser um inteiro")
+    return Response({"results": usernames.search(prefix, max(limit, 1))})
+
+
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def change_password(request):
@@ -206,11 +244,10 @@ def change_password(request):
     return Response({"message": "Senha alterada com sucesso"})
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def user_list(request):
-    from rest_framework.pagination import PageNumberPagination
-
     if not request.user.is_superuser:
         return Response(
             {
@@ -219,10 +256,9 @@ def user_list(request):
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    users = User.objects.all().order_by("-created_at")
+    users = User.objects.all()
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_users = paginator.paginate_queryset(users, request)
     serializer = UserSerializer(paginated_users, many=True)
 
@@ -233,7 +269,11 @@ def user_list(request):
 @permission_classes([IsAuthenticated])
 def delete_account(request):
     user = request.user
-    user.delete()
+    User.objects.filter(id=user.id).update(is_active=False)
+    invalidate_user(user.id)
+    usernames.record_username(user.id, old=user.username)
+    AccountDeletion.objects.get_or_create(user_id=user.id)
+    enqueue(tasks.delete_account, user.id)
     return Response(
         {"message": "Usuário deletado com sucesso"}, status=status.HTTP_200_OK
     )
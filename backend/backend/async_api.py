@@ -0,0 +1,77 @@
+import functools
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from authentication.backends import AsyncJWTAuthentication
+from .timing import TimedJSONRenderer
+
+
+def read_view(name, views, async_views):
+    """The async view `name` if listed in ASYNC_READ_VIEWS, else the sync one."""
+    module = async_views if name in settings.ASYNC_READ_VIEWS else views
+    return getattr(module, name)
+
+
+class JSONResponse(HttpResponse):
+    """Pre-rendered JSON response, so Django doesn't hop threads to render it."""
+
+    def __init__(self, data, status=status.HTTP_200_OK, headers=None):
+        super().__init__(
+            TimedJSONRenderer().render(data),
+            content_type="application/json",
+            status=status,
+            headers=headers,
+        )
+        self.data = data
+
+
+def handle_exception(exc, authenticator, request):
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound(*exc.args)
+
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers["WWW-Authenticate"] = authenticator.authenticate_header(request)
+        exc.status_code = status.HTTP_401_UNAUTHORIZED
+
+    if isinstance(exc.detail, (list, dict)):
+        data = exc.detail
+    else:
+        data = {"detail": exc.detail}
+    return JSONResponse(data, status=exc.status_code, headers=headers)
+
+
+def async_api_view(http_method_names):
+    """
+    Async counterpart of DRF's @api_view for authenticated read endpoints.
+
+    The view receives a DRF Request (for query_params and the paginators)
+    whose user has been resolved with the async ORM, and must return a
+    JSONResponse.
+    """
+    authenticator = AsyncJWTAuthentication()
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return JSONResponse(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                    headers={"Allow": ", ".join(http_method_names)},
+                )
+
+            drf_request = Request(request)
+            try:
+                result = await authenticator.aauthenticate(request)
+                if result is None:
+                    raise exceptions.NotAuthenticated()
+                drf_request.user, drf_request.auth = result
+                return await view(drf_request, *args, **kwargs)
+            except (exceptions.APIException, Http404) as exc:
+                return handle_exception(exc, authenticator, request)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,58 @@
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+
+def parse_ids(request):
+    """Read `?ids=1,2,3` (or repeated `ids`) into a de-duplicated list of ints."""
+    raw = ",".join(request.query_params.getlist("ids"))
+    values = [value.strip() for value in raw.split(",") if value.strip()]
+    if not values:
+        raise ParseError("Parâmetro ids é obrigatório")
+
+    try:
+        ids = list(dict.fromkeys(int(value) for value in values))
+    except ValueError:
+        raise ParseError("ids deve ser uma lista de inteiros separados por vírgula")
+
+    if len(ids) > settings.BATCH_MAX_IDS:
+        raise ParseError(f"Máximo de {settings.BATCH_MAX_IDS} ids por requisição")
+    return ids
+
+
+def get_batch_data(ids, found):
+    """Order `found` (id -> item) like the request and list the ids not found."""
+    return {
+        "results": [found[pk] for pk in ids if pk in found],
+        "missing": [pk for pk in ids if pk not in found],
+    }
+
+
+def bulk_status(pk, found, changed, done, unchanged):
+    if pk not in found:
+        return "not_found"
+    return done if pk in changed else unchanged
+
+
+def id_list():
+    return serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list
+    )
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    """Two opposite id lists (like/unlike), declared by subclasses with id_list()."""
+
+    def validate(self, attrs):
+        attrs = {name: list(dict.fromkeys(ids)) for name, ids in attrs.items()}
+        total = sum(len(ids) for ids in attrs.values())
+        if not total:
+            raise serializers.ValidationError("Informe ao menos um id")
+        if total > settings.BATCH_MAX_IDS:
+            raise serializers.ValidationError(
+                f"Máximo de {settings.BATCH_MAX_IDS} ids por requisição"
+            )
+        first, second = attrs.values()
+        if set(first) & set(second):
+            raise serializers.ValidationError("Um id não pode aparecer nas duas listas")
+        return attrs
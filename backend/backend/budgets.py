@@ -0,0 +1,38 @@
+"""
+SQL query budgets for list views.
+
+@query_budget(n) declares that a view answers a full page (PAGE_SIZE
+items unless `page_size` says otherwise) in at most n queries, and that
+the count does not grow with the number of items. The pytest plugin in
+backend.pytest_budgets runs every budgeted URL with one item and with a
+full page and enforces both.
+"""
+
+from collections import namedtuple
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.settings import api_settings
+
+Budget = namedtuple("Budget", ["queries", "page_size"])
+
+
+def query_budget(queries, page_size=None):
+    def decorator(view):
+        view.query_budget = Budget(queries, page_size or api_settings.PAGE_SIZE)
+        return view
+
+    return decorator
+
+
+def budgeted_views(resolver=None, prefix=""):
+    """{url name: (route, Budget)} for every URL whose view has a budget."""
+    resolver = resolver or get_resolver()
+    views = {}
+    for pattern in resolver.url_patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            views.update(budgeted_views(pattern, route))
+        elif isinstance(pattern, URLPattern):
+            budget = getattr(pattern.callback, "query_budget", None)
+            if budget is not None:
+                views[pattern.name] = (route, budget)
+    return views
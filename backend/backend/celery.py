@@ -0,0 +1,55 @@
+import logging
+import os
+import time
+from functools import partial
+from celery import Celery
+from celery.signals import task_postrun, task_prerun
+from django.db import OperationalError, transaction
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+app = Celery("backend")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
+
+logger = logging.getLogger(__name__)
+
+# Every task is written to be idempotent, so transient database errors
+# (deadlocks, lost connections) are simply retried with backoff.
+RETRY_POLICY = {
+    "autoretry_for": (OperationalError,),
+    "retry_backoff": True,
+    "retry_jitter": True,
+    "max_retries": 5,
+}
+
+
+def enqueue(task, *args):
+    """Queue `task` once the current transaction commits; run it inline when eager."""
+    if app.conf.task_always_eager:
+        result = task.apply(args=args)
+        result.maybe_throw()
+        return result
+    transaction.on_commit(partial(task.delay, *args))
+
+
+@task_prerun.connect
+def start_task_timer(task, **kwargs):
+    # Kept on the request, which is discarded with it even when postrun
+    # never fires.
+    task.request.started_at = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_timing(task, state, **kwargs):
+    # Imported here: this module loads before the settings, and
+    # prometheus_client must see PROMETHEUS_MULTIPROC_DIR when imported.
+    from . import metrics
+
+    started = getattr(task.request, "started_at", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    metrics.TASKS.labels(task.name, state).inc()
+    metrics.TASK_DURATION.labels(task.name).observe(duration)
+    logger.info("task=%s state=%s duration_ms=%.1f", task.name, state, duration * 1000)
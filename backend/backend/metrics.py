@@ -0,0 +1,195 @@
+"""
+Prometheus metrics, served in the text exposition format on /metrics.
+
+MetricsMiddleware records every request under its URL name (the `view`
+label, e.g. post_list, follow_user, login; "unmatched" for 404s that hit
+no route):
+
+- http_requests_total{view, method, status}
+- http_request_duration_seconds{view, method}, a histogram for p50/p95/p99
+- http_request_db_queries{view}, a histogram of SQL queries per request,
+  counted through the backend.timing hooks
+
+backend.celery adds celery_tasks_total{task, state} and
+celery_task_duration_seconds{task} for every task run.
+
+The default cache is a MeteredCache subclass, which adds
+cache_requests_total{cache, result} with result "hit" or "miss" per key
+prefix (CACHE_PREFIXES), so the hit ratio of each cache is
+hits / (hits + misses).
+
+With PROMETHEUS_MULTIPROC_DIR set, every worker process writes its
+samples to files in that directory and /metrics adds them up, whichever
+worker answers the scrape; Celery workers sharing the directory are
+included. The directory has to be emptied before the workers start.
+Without it the registry only covers the current process.
+
+/metrics answers 404 unless METRICS_TOKEN is set, and then only to
+requests with "Authorization: Bearer <METRICS_TOKEN>".
+"""
+
+import hmac
+import os
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends import locmem, redis
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseNotFound, JsonResponse
+from django.views.decorators.http import require_GET
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from . import timing
+
+REQUESTS = Counter(
+    "http_requests_total", "Requisições HTTP.", ["view", "method", "status"]
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP.",
+    ["view", "method"],
+    buckets=(
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.075,
+        0.1,
+        0.25,
+        0.5,
+        0.75,
+        1,
+        2.5,
+        5,
+        10,
+    ),
+)
+QUERIES = Histogram(
+    "http_request_db_queries",
+    "Queries SQL por requisição.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15, 20, 30, 50, 100),
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Leituras do cache.", ["cache", "result"]
+)
+TASKS = Counter(
+    "celery_tasks_total", "Tarefas do Celery executadas.", ["task", "state"]
+)
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Duração das tarefas do Celery.",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+
+# Keys are grouped by prefix so per-user and per-IP keys share a label.
+CACHE_PREFIXES = ("posts:payload", "auth:revoked", "auth:user", "throttle")
+
+
+def cache_name(key):
+    for prefix in CACHE_PREFIXES:
+        if key.startswith(prefix):
+            return prefix
+    return "other"
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else "unmatched"
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        timing.install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        with timing.track() as timings:
+            started = time.perf_counter()
+            response = self.get_response(request)
+        self.record(request, response, timings, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        with timing.track() as timings:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+        self.record(request, response, timings, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, timings, duration):
+        view = view_name(request)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+        LATENCY.labels(view, request.method).observe(duration)
+        QUERIES.labels(view).observe(timings.queries)
+
+
+class MeteredCache:
+    """Counts hits and misses of get(); get_many() on LocMemCache goes through it."""
+
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        hit = value is not self._missing
+        CACHE_REQUESTS.labels(cache_name(key), "hit" if hit else "miss").inc()
+        return value if hit else default
+
+
+class LocMemCache(MeteredCache, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(MeteredCache, redis.RedisCache):
+    def get_many(self, keys, version=None):
+        found = super().get_many(keys, version)
+        for key in keys:
+            CACHE_REQUESTS.labels(
+                cache_name(key), "hit" if key in found else "miss"
+            ).inc()
+        return found
+
+
+def registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def authorized(request):
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    supplied = request.headers.get("Authorization", "")
+    return hmac.compare_digest(supplied.encode(), expected.encode())
+
+
+@require_GET
+def metrics_view(request):
+    if not settings.METRICS_TOKEN:
+        return HttpResponseNotFound()
+    if not authorized(request):
+        response = JsonResponse({"detail": "Token de métricas inválido."}, status=401)
+        response["WWW-Authenticate"] = "Bearer"
+        return response
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
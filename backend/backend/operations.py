@@ -0,0 +1,50 @@
+from django.db import router
+from django.db.migrations.operations import AddIndex, RunSQL
+
+
+class AddIndexOnline(AddIndex):
+    """AddIndex that builds the index without blocking writes on MySQL."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "mysql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            statement = self.index.create_sql(model, schema_editor)
+            schema_editor.execute(f"{statement} ALGORITHM=INPLACE LOCK=NONE")
+
+
+class RunSQLForVendor(RunSQL):
+    """RunSQL with one set of statements per database vendor.
+
+    Vendors missing from `sql` are skipped, so the migration still applies
+    everywhere and only the backends that support the feature get it.
+    """
+
+    def __init__(self, sql, reverse_sql=None, **kwargs):
+        self.vendor_sql = sql
+        self.vendor_reverse_sql = reverse_sql or {}
+        super().__init__(sql=[], reverse_sql=[], **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        kwargs["sql"] = self.vendor_sql
+        kwargs["reverse_sql"] = self.vendor_reverse_sql
+        return name, args, kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if router.allow_migrate(
+            schema_editor.connection.alias, app_label, **self.hints
+        ):
+            vendor = schema_editor.connection.vendor
+            self._run_sql(schema_editor, self.vendor_sql.get(vendor, []))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if router.allow_migrate(
+            schema_editor.connection.alias, app_label, **self.hints
+        ):
+            vendor = schema_editor.connection.vendor
+            self._run_sql(schema_editor, self.vendor_reverse_sql.get(vendor, []))
@@ -0,0 +1,142 @@
+import base64
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_ORDERING = ("created_at", "id")
+# Largest value of a signed BIGINT primary key.
+MAX_PK = 2**63 - 1
+
+
+def decode_pk(pk):
+    """Return `pk` if it's an int a primary key can hold, else raise ValueError."""
+    if type(pk) is not int or not 0 < pk <= MAX_PK:
+        raise ValueError(f"Invalid cursor pk: {pk!r}")
+    return pk
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Cursor inválido"
+
+    def __init__(self, ordering=DEFAULT_ORDERING):
+        self.ordering = ordering
+        self.page_size = api_settings.PAGE_SIZE
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, obj):
+        time_field, pk_field = self.ordering
+        position = [getattr(obj, time_field).isoformat(), getattr(obj, pk_field)]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            timestamp, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = (parse_datetime(timestamp), decode_pk(pk))
+        except (TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        if position[0] is None:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def filter_queryset(self, queryset, position=None):
+        time_field, pk_field = self.ordering
+        queryset = queryset.order_by(f"-{time_field}", f"-{pk_field}")
+        if position is not None:
+            timestamp, pk = position
+            queryset = queryset.filter(
+                Q(**{f"{time_field}__lt": timestamp})
+                | Q(**{time_field: timestamp, f"{pk_field}__lt": pk})
+            )
+        return queryset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = self.filter_queryset(queryset, self.decode_cursor(request))
+        return self.get_page(list(queryset[: page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = self.filter_queryset(queryset, self.decode_cursor(request))
+        return self.get_page(
+            [obj async for obj in queryset[: page_size + 1]], page_size
+        )
+
+    def get_page(self, results, page_size):
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        self.next_cursor = self.encode_cursor(results[-1]) if self.has_next else None
+        return results
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        return {"next": self.get_next_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class LegacyPageNumberPagination(PageNumberPagination):
+    def __init__(self, ordering=DEFAULT_ORDERING):
+        self.ordering = ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = queryset.order_by(*[f"-{field}" for field in self.ordering])
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def get_paginated_data(self, data):
+        return {
+            "count": self.page.paginator.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+def get_paginator(request, ordering=DEFAULT_ORDERING):
+    if PageNumberPagination.page_query_param in request.query_params:
+        return LegacyPageNumberPagination(ordering)
+    return KeysetPagination(ordering)
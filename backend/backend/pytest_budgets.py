@@ -0,0 +1,90 @@
+"""
+pytest plugin enforcing the @query_budget declarations (backend.budgets).
+
+Tests that take the `budgeted_view` fixture are run once per budgeted
+URL name. Each name needs a seeder registered with @budget_case that
+creates `count` items visible to `user` and returns the URL to GET;
+check_query_budget seeds one item and then a full page (each in a
+savepoint that is rolled back), requests the URL with every cache
+empty, and fails if the full page costs more queries than one item or
+more than the budget.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from .budgets import budgeted_views
+
+CASES = {}
+
+
+def budget_case(name):
+    def register(seed):
+        CASES[name] = seed
+        return seed
+
+    return register
+
+
+def clear_caches():
+    from authentication import user_cache, usernames
+    from follows import graph
+
+    cache.clear()
+    user_cache.clear_local()
+    graph.get_graph().clear()
+    usernames.get_index().clear()
+
+
+def pytest_generate_tests(metafunc):
+    if "budgeted_view" in metafunc.fixturenames:
+        names = sorted(budgeted_views())
+        metafunc.parametrize("budgeted_view", names, ids=names)
+
+
+def _count_queries(client, path, count):
+    clear_caches()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    assert response.status_code == 200, f"GET {path}: {response.status_code}"
+    results = response.json()["results"]
+    assert len(results) == count, f"GET {path}: {len(results)} itens, esperado {count}"
+    return len(queries)
+
+
+@pytest.fixture
+def check_query_budget(db, django_user_model):
+    def check(name):
+        route, budget = budgeted_views()[name]
+        seed = CASES.get(name)
+        if seed is None:
+            pytest.fail(f"{name} ({route}) tem @query_budget mas nenhum @budget_case")
+
+        user = django_user_model.objects.create_user(
+            username="budget", email="budget@example.com", password="pass12345"
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+        )
+
+        counts = []
+        for count in (1, budget.page_size):
+            with transaction.atomic():
+                counts.append(_count_queries(client, seed(user, count), count))
+                transaction.set_rollback(True)
+
+        one, full = counts
+        assert full <= one, (
+            f"{name}: {one} queries com 1 item e {full} com {budget.page_size}; "
+            "o número de queries cresce com a página (N+1)"
+        )
+        assert (
+            full <= budget.queries
+        ), f"{name}: {full} queries, acima do orçamento de {budget.queries}"
+        return full
+
+    return check
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
@@ -37,8 +38,11 @@ INSTALLED_APPS = [
     "authentication",
     "posts",
     "follows",
+    "realtime",
 ]
 MIDDLEWARE = [
+    "backend.timing.ServerTimingMiddleware",
+    "backend.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -69,6 +73,16 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "backend.wsgi.application"
 
+# Read views served by their async implementation; the rest use the sync
+# DRF views. Defaults to the ones python -m benchmarks.async_views measures
+# as faster async: post_list, post_detail and comment_list go through the
+# cache's a* methods, which still run the sync client in a thread.
+ASYNC_READ_VIEWS = config(
+    "ASYNC_READ_VIEWS",
+    default="my_followers,my_following,profile_detail",
+    cast=Csv(),
+)
+
 
 DATABASE_URL = config("DATABASE_URL", default=None)
 
@@ -123,17 +137,36 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.backends.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "backend.timing.TimedJSONRenderer",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "backend.pagination.KeysetPagination",
     "PAGE_SIZE": 20,
+    # Proxies in front of the app that append to X-Forwarded-For; with 0
+    # the per-IP throttle uses REMOTE_ADDR and ignores the header.
+    "NUM_PROXIES": config("NUM_PROXIES", default=0, cast=int),
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": config("LOGIN_THROTTLE_IP_RATE", default="20/min"),
+        "login_email": config("LOGIN_THROTTLE_EMAIL_RATE", default="5/min"),
+    },
 }
+REQUEST_TIMING_SAMPLE_RATE = config(
+    "REQUEST_TIMING_SAMPLE_RATE", default=0.0, cast=float
+)
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+# prometheus_client reads it from the environment; exported here so it can
+# also come from .env.
+PROMETHEUS_MULTIPROC_DIR = config("PROMETHEUS_MULTIPROC_DIR", default="")
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", PROMETHEUS_MULTIPROC_DIR)
+PAGINATION_MAX_PAGE_SIZE = config("PAGINATION_MAX_PAGE_SIZE", default=100, cast=int)
+BATCH_MAX_IDS = config("BATCH_MAX_IDS", default=100, cast=int)
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -141,6 +174,108 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": True,
 }
+ACCOUNT_PURGE_BATCH_SIZE = config("ACCOUNT_PURGE_BATCH_SIZE", default=1000, cast=int)
+TOKEN_PRUNE_BATCH_SIZE = config("TOKEN_PRUNE_BATCH_SIZE", default=1000, cast=int)
+LOGIN_HASH_WORKERS = config("LOGIN_HASH_WORKERS", default=2, cast=int)
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)
+AUTH_USER_LOCAL_CACHE_TIMEOUT = config(
+    "AUTH_USER_LOCAL_CACHE_TIMEOUT", default=5, cast=int
+)
+AUTH_USER_LOCAL_CACHE_SIZE = 10_000
+AUTH_REVOCATION_CACHE_TIMEOUT = config(
+    "AUTH_REVOCATION_CACHE_TIMEOUT", default=60, cast=int
+)
+REDIS_URL = config("REDIS_URL", default="")
+# Cache "not revoked" for new refresh tokens until they expire. Only safe
+# with a shared cache: a per-process entry would hide a logout served by
+# another process.
+AUTH_REVOCATION_CACHE_ISSUED = config(
+    "AUTH_REVOCATION_CACHE_ISSUED", default=bool(REDIS_URL), cast=bool
+)
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "backend.metrics.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "backend.metrics.LocMemCache",
+        }
+    }
+
+REALTIME_BROKER = config(
+    "REALTIME_BROKER",
+    default=(
+        "realtime.broker.RedisBroker"
+        if REDIS_URL
+        else "realtime.broker.InProcessBroker"
+    ),
+)
+
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default=REDIS_URL)
+CELERY_TASK_ALWAYS_EAGER = config(
+    "CELERY_TASK_ALWAYS_EAGER", default=not CELERY_BROKER_URL, cast=bool
+)
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    "prune-expired-tokens": {
+        "task": "authentication.tasks.prune_expired_tokens",
+        "schedule": timedelta(hours=1),
+    },
+    "compute-follow-suggestions": {
+        "task": "follows.tasks.compute_follow_suggestions",
+        "schedule": timedelta(days=1),
+    },
+    "trim-timelines": {
+        "task": "posts.tasks.trim_timelines",
+        "schedule": timedelta(hours=1),
+    },
+    "rebuild-username-index": {
+        "task": "authentication.tasks.rebuild_username_index",
+        "schedule": timedelta(days=1),
+    },
+}
+
+FOLLOW_GRAPH_BACKEND = config(
+    "FOLLOW_GRAPH_BACKEND",
+    default=(
+        "follows.graph.RedisFollowGraph"
+        if REDIS_URL
+        else "follows.graph.LocalFollowGraph"
+    ),
+)
+FOLLOW_GRAPH_TIMEOUT = config("FOLLOW_GRAPH_TIMEOUT", default=3600, cast=int)
+FOLLOW_GRAPH_LOCAL_TIMEOUT = config("FOLLOW_GRAPH_LOCAL_TIMEOUT", default=30, cast=int)
+FOLLOW_GRAPH_LOCAL_SIZE = 10_000
+FOLLOW_SUGGESTIONS_LIMIT = config("FOLLOW_SUGGESTIONS_LIMIT", default=20, cast=int)
+FOLLOW_SUGGESTIONS_MAX_FANOUT = config(
+    "FOLLOW_SUGGESTIONS_MAX_FANOUT", default=1000, cast=int
+)
+FOLLOW_SUGGESTIONS_BATCH_SIZE = 500
+
+USERNAME_INDEX_BACKEND = config(
+    "USERNAME_INDEX_BACKEND",
+    default=(
+        "authentication.usernames.RedisUsernameIndex"
+        if REDIS_URL
+        else "authentication.usernames.LocalUsernameIndex"
+    ),
+)
+USERNAME_INDEX_LOCAL_TIMEOUT = config(
+    "USERNAME_INDEX_LOCAL_TIMEOUT", default=300, cast=int
+)
+USERNAME_SEARCH_LIMIT = 10
+
+POST_CACHE_TIMEOUT = config("POST_CACHE_TIMEOUT", default=300, cast=int)
+TIMELINE_MAX_LENGTH = config("TIMELINE_MAX_LENGTH", default=800, cast=int)
+
 CORS_ALLOWED_ORIGINS = config(
     "CORS_ALLOWED_ORIGINS",
     default="http://localhost:3000,http://127.0.0.1:3000",
@@ -162,6 +297,7 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+AVATAR_MAX_PIXELS = config("AVATAR_MAX_PIXELS", default=16_000_000, cast=int)
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -0,0 +1,189 @@
+"""
+Per-request timing, reported in a Server-Timing header and a log line.
+
+ServerTimingMiddleware samples REQUEST_TIMING_SAMPLE_RATE of requests.
+A sampled request gets a Timings object in a context variable, which
+follows it into sync_to_async threads, and the instrumented spots add
+to it:
+
+- db: every query, through a wrapper on each database connection
+- auth: JWT authentication (authentication.backends)
+- serialize: evaluating serializer.data
+- render: JSON rendering (TimedJSONRenderer)
+
+With a sample rate of 0 the middleware removes itself at startup and
+nothing is installed; the renderer and authentication only check for a
+missing context variable. backend.metrics reuses the same hooks, through
+track(), to count the queries of every request.
+"""
+
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import renderers, serializers
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("db", "auth", "serialize", "render")
+
+_current = ContextVar("request_timings", default=None)
+
+
+class Timings:
+    def __init__(self):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self._depth = defaultdict(int)
+
+    def header(self, total):
+        metrics = [
+            f'db;dur={self.durations["db"] * 1000:.1f};desc="{self.queries} queries"'
+        ]
+        metrics += [
+            f"{phase};dur={self.durations[phase] * 1000:.1f}" for phase in PHASES[1:]
+        ]
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+@contextmanager
+def measure(phase):
+    """Add the time spent in the block to `phase` of the current request."""
+    timings = _current.get()
+    # Nested blocks of the same phase (a serializer evaluated inside
+    # another) count once.
+    if timings is None or timings._depth[phase]:
+        yield
+        return
+
+    timings._depth[phase] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.durations[phase] += time.perf_counter() - started
+        timings._depth[phase] -= 1
+
+
+@contextmanager
+def track():
+    """Timings of the current request, started here unless already running."""
+    timings = _current.get()
+    if timings is not None:
+        yield timings
+        return
+
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.durations["db"] += time.perf_counter() - started
+        timings.queries += 1
+
+
+def _wrap_connection(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def _timed_data(data):
+    def fget(self):
+        with measure("serialize"):
+            return data.fget(self)
+
+    return property(fget)
+
+
+def install():
+    """Hook the database and serializers; done once, when timing is enabled."""
+    if getattr(install, "done", False):
+        return
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(connection)
+    connection_created.connect(_wrap_connection)
+    serializers.BaseSerializer.data = _timed_data(serializers.BaseSerializer.data)
+    install.done = True
+
+
+class TimedJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure("render"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        install()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        with track() as timings:
+            started = time.perf_counter()
+            response = self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        with track() as timings:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - started)
+
+    def report(self, request, response, timings, total):
+        response["Server-Timing"] = timings.header(total)
+        match = request.resolver_match
+        logger.info(
+            "request method=%s path=%s view=%s status=%s total_ms=%.1f db_ms=%.1f "
+            "queries=%d auth_ms=%.1f serialize_ms=%.1f render_ms=%.1f",
+            request.method,
+            request.path,
+            match.url_name if match else None,
+            response.status_code,
+            total * 1000,
+            timings.durations["db"] * 1000,
+            timings.queries,
+            timings.durations["auth"] * 1000,
+            timings.durations["serialize"] * 1000,
+            timings.durations["render"] * 1000,
+        )
+        return response
@@ -2,12 +2,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from . import metrics
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("authentication.urls")),
     path("api/follows/", include("follows.urls")),
     path("api/posts/", include("posts.urls")),
+    path("metrics", metrics.metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,128 @@
+"""
+Compare the sync (DRF) and async read endpoints under uvicorn.
+
+Seeds a SQLite database, then starts uvicorn once with ASYNC_READ_VIEWS
+empty and once listing every endpoint below, and drives each one at the
+given concurrency. Reports requests/sec, p50 and p99 latency per endpoint.
+
+    cd backend
+    python -m benchmarks.async_views --concurrency 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from .http import run_load
+from .server import benchmark_env, serve, setup_django
+
+
+def seed(users, posts_per_user, follows_per_user):
+    from authentication.counters import rebuild_profile_counters
+    from authentication.models import User, Profile
+    from follows.models import Follow
+    from posts.counters import rebuild_counters
+    from posts.models import Post, Comment, Like
+    from posts.timeline import rebuild_timeline
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    accounts = User.objects.bulk_create(
+        [
+            User(username=f"user{i}", email=f"user{i}@example.com", password="!")
+            for i in range(users)
+        ]
+    )
+    Profile.objects.bulk_create([Profile(user=user) for user in accounts])
+    Follow.objects.bulk_create(
+        [
+            Follow(follower=user, following=accounts[(i + j + 1) % users])
+            for i, user in enumerate(accounts)
+            for j in range(follows_per_user)
+        ]
+    )
+    posts = Post.objects.bulk_create(
+        [
+            Post(author=user, content=f"Post {n} by {user.username}")
+            for user in accounts
+            for n in range(posts_per_user)
+        ]
+    )
+    Like.objects.bulk_create(
+        [Like(user=user, post=posts[i]) for i, user in enumerate(accounts)]
+    )
+    Comment.objects.bulk_create(
+        [
+            Comment(author=user, post=posts[0], content=f"Comment {i}")
+            for i, user in enumerate(accounts)
+        ]
+    )
+    rebuild_counters()
+    rebuild_profile_counters()
+    for user in accounts:
+        rebuild_timeline(user.id)
+
+    viewer = accounts[0]
+    return {
+        "token": str(RefreshToken.for_user(viewer).access_token),
+        "paths": {
+            "post_list": "/api/posts/",
+            "post_detail": f"/api/posts/{posts[0].id}/",
+            "comment_list": f"/api/posts/{posts[0].id}/comments/",
+            "profile_detail": f"/api/auth/profile/{accounts[1].id}/",
+            "my_followers": "/api/follows/my-followers/",
+            "my_following": "/api/follows/my-following/",
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--posts-per-user", type=int, default=20)
+    parser.add_argument("--follows-per-user", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "benchmark.sqlite3"
+        setup_django(benchmark_env(db_path))
+        fixture = seed(args.users, args.posts_per_user, args.follows_per_user)
+        headers = {"Authorization": f"Bearer {fixture['token']}"}
+
+        results = []
+        for mode, names in (("sync", ""), ("async", ",".join(fixture["paths"]))):
+            env = benchmark_env(db_path, ASYNC_READ_VIEWS=names)
+            with serve(env, args.port, args.workers):
+                for name, path in fixture["paths"].items():
+                    stats = asyncio.run(
+                        run_load(
+                            "127.0.0.1",
+                            args.port,
+                            path,
+                            headers,
+                            args.concurrency,
+                            args.duration,
+                        )
+                    )
+                    results.append({"endpoint": name, "mode": mode, **stats})
+
+    print(
+        f"{'endpoint':<16}{'mode':<7}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'err':>6}"
+    )
+    for row in sorted(results, key=lambda row: (row["endpoint"], row["mode"])):
+        print(
+            f"{row['endpoint']:<16}{row['mode']:<7}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['errors']:>6}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,594 @@
+"""
+Per-endpoint benchmarks: every view in the auth, follows and posts URLs.
+
+Each size seeds a throwaway SQLite database with that many posts, a
+tenth as many users on a power-law follow graph, likes, comments, and a
+"viewer" account that follows the 200 most followed users. Every URL
+name in authentication.urls, follows.urls and posts.urls then gets
+`--repeat` requests through DRF's APIClient (after a short warm-up)
+and the wall time, SQL query count and SQL time of each are recorded.
+
+    cd backend
+    python -m benchmarks.endpoints --posts 1000 100000 --output before.json
+    python -m benchmarks.endpoints --posts 1000 100000 --compare before.json
+
+With --compare the run is checked against an earlier --output file
+and the exit status is 1 when an endpoint got slower than --threshold
+times its old median or runs more queries than before.
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import accumulate
+from pathlib import Path
+from .graphs import power_law_edges
+from .search import vocabulary
+from .server import BACKEND_DIR, benchmark_env, setup_django
+
+APPS = ("authentication.urls", "follows.urls", "posts.urls")
+PASSWORD = "benchmark-pass"
+VIEWER_FOLLOWING = 200
+
+# One request: `user` (default: the viewer) is who it is authenticated as.
+Request = namedtuple("Request", ["method", "path", "data", "user"])
+Request.__new__.__defaults__ = (None, None)
+
+CASES = {}
+
+
+def case(name):
+    """Register the request for URL `name`; called with (dataset, iteration).
+
+    Anything a case does before returning (creating the post a DELETE
+    removes, say) is outside the timed part.
+    """
+
+    def register(build):
+        CASES[name] = build
+        return build
+
+    return register
+
+
+class Dataset:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def seed(posts, seed_value=0):
+    from django.contrib.auth.hashers import make_password
+    from authentication.counters import rebuild_profile_counters
+    from authentication.models import Profile, User
+    from follows.models import Follow
+    from follows.suggestions import compute_suggestions
+    from posts.counters import rebuild_counters
+    from posts.models import Comment, Like, Post
+    from posts.timeline import rebuild_timeline
+
+    rng = random.Random(seed_value)
+    users = max(1000, posts // 10)
+    started = time.perf_counter()
+
+    User.objects.bulk_create(
+        [
+            User(id=i, username=f"user{i}", email=f"user{i}@example.com", password="!")
+            for i in range(1, users + 1)
+        ],
+        batch_size=5000,
+    )
+    viewer = User.objects.create(
+        id=users + 1,
+        username="viewer",
+        email="viewer@example.com",
+        password=make_password(PASSWORD),
+        is_superuser=True,
+    )
+    Profile.objects.bulk_create(
+        [Profile(user_id=i) for i in range(1, users + 2)], batch_size=5000
+    )
+
+    edges = power_law_edges(posts, users)
+    # The most followed accounts have the lowest ids.
+    edges += [(viewer.id, i) for i in range(1, VIEWER_FOLLOWING + 1)]
+    Follow.objects.bulk_create(
+        [Follow(follower_id=a, following_id=b) for a, b in edges], batch_size=5000
+    )
+
+    words = vocabulary(5000)
+    weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    for start in range(0, posts, 10_000):
+        Post.objects.bulk_create(
+            [
+                Post(
+                    author_id=rng.randint(1, users + 1),
+                    content=" ".join(rng.choices(words, cum_weights=weights, k=12)),
+                )
+                for _ in range(min(10_000, posts - start))
+            ]
+        )
+    first_post = Post.objects.order_by("id").values_list("id", flat=True).first()
+
+    def popular_post():
+        # Skewed towards the oldest posts, so a few collect most reactions.
+        return first_post + int(posts * rng.random() ** 4)
+
+    likes = {(rng.randint(1, users), popular_post()) for _ in range(posts // 2)}
+    Like.objects.bulk_create(
+        [Like(user_id=u, post_id=p) for u, p in likes], batch_size=5000
+    )
+    Comment.objects.bulk_create(
+        [
+            Comment(
+                author_id=rng.randint(1, users), post_id=popular_post(), content="Oi"
+            )
+            for _ in range(posts // 10)
+        ],
+        batch_size=5000,
+    )
+
+    rebuild_counters()
+    rebuild_profile_counters()
+    rebuild_timeline(viewer.id)
+    compute_suggestions()
+
+    followed = set(range(1, VIEWER_FOLLOWING + 1))
+    return Dataset(
+        posts=posts,
+        users=users,
+        edges=len(edges),
+        seed_seconds=time.perf_counter() - started,
+        viewer=viewer,
+        popular_user=1,
+        popular_post=first_post,
+        post_ids=list(range(first_post, first_post + 20)),
+        user_ids=list(range(1, 21)),
+        followed=sorted(followed),
+        not_followed=[i for i in range(users, 0, -1) if i not in followed],
+        search_term=words[10],
+    )
+
+
+def own_post(dataset, content="Benchmark"):
+    from posts.models import Post
+
+    return Post.objects.create(author=dataset.viewer, content=content)
+
+
+def own_comment(dataset):
+    from posts.models import Comment
+
+    return Comment.objects.create(
+        author=dataset.viewer, post_id=dataset.popular_post, content="Benchmark"
+    )
+
+
+def new_user(dataset, i):
+    from authentication.models import Profile, User
+
+    user = User.objects.create(
+        username=f"bench{dataset.posts}-{i}", email=f"bench{i}@example.com"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+def new_refresh_token(dataset):
+    from authentication.revocation import CachedRefreshToken
+
+    return str(CachedRefreshToken.for_user(dataset.viewer))
+
+
+@case("register")
+def register_case(dataset, i):
+    username = f"new{dataset.posts}-{i}"
+    data = {
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD,
+    }
+    return Request("post", "/api/auth/register/", data)
+
+
+@case("login")
+def login_case(dataset, i):
+    data = {"email": dataset.viewer.email, "password": PASSWORD}
+    return Request("post", "/api/auth/login/", data)
+
+
+@case("logout")
+def logout_case(dataset, i):
+    return Request("post", "/api/auth/logout/", {"refresh": new_refresh_token(dataset)})
+
+
+@case("token_refresh")
+def token_refresh_case(dataset, i):
+    data = {"refresh": new_refresh_token(dataset)}
+    return Request("post", "/api/auth/token/refresh/", data)
+
+
+@case("profile")
+def profile_case(dataset, i):
+    return Request("get", "/api/auth/profile/")
+
+
+@case("profile_update")
+def profile_update_case(dataset, i):
+    return Request("put", "/api/auth/profile/update/", {"bio": f"Bio {i}"})
+
+
+@case("profile_detail")
+def profile_detail_case(dataset, i):
+    return Request("get", f"/api/auth/profile/{dataset.popular_user}/")
+
+
+@case("change_password")
+def change_password_case(dataset, i):
+    data = {"old_password": PASSWORD, "new_password": PASSWORD}
+    return Request("put", "/api/auth/change-password/", data)
+
+
+@case("user_list")
+def user_list_case(dataset, i):
+    return Request("get", "/api/auth/users/")
+
+
+@case("user_batch")
+def user_batch_case(dataset, i):
+    ids = ",".join(map(str, dataset.user_ids))
+    return Request("get", f"/api/auth/users/batch/?ids={ids}")
+
+
+@case("user_search")
+def user_search_case(dataset, i):
+    return Request("get", "/api/auth/users/search/?prefix=user1")
+
+
+@case("delete_account")
+def delete_account_case(dataset, i):
+    return Request("delete", "/api/auth/users/me/delete/", user=new_user(dataset, i))
+
+
+@case("follow_user")
+def follow_user_case(dataset, i):
+    data = {"following": dataset.not_followed[i]}
+    return Request("post", "/api/follows/follow/", data)
+
+
+@case("follow_bulk")
+def follow_bulk_case(dataset, i):
+    # From the other end of the list than follow_user.
+    ids = dataset.not_followed[::-1][i * 10 : i * 10 + 10]
+    return Request("post", "/api/follows/follow/bulk/", {"follow": ids})
+
+
+@case("unfollow_user")
+def unfollow_user_case(dataset, i):
+    return Request("delete", f"/api/follows/unfollow/{dataset.followed[i]}/")
+
+
+@case("my_followers")
+def my_followers_case(dataset, i):
+    return Request("get", "/api/follows/my-followers/")
+
+
+@case("my_following")
+def my_following_case(dataset, i):
+    return Request("get", "/api/follows/my-following/")
+
+
+@case("follow_suggestions")
+def follow_suggestions_case(dataset, i):
+    return Request("get", "/api/follows/suggestions/")
+
+
+@case("post_list")
+def post_list_case(dataset, i):
+    return Request("get", "/api/posts/")
+
+
+@case("post_create")
+def post_create_case(dataset, i):
+    return Request("post", "/api/posts/create/", {"content": f"Post {i}"})
+
+
+@case("post_batch")
+def post_batch_case(dataset, i):
+    ids = ",".join(map(str, dataset.post_ids))
+    return Request("get", f"/api/posts/batch/?ids={ids}")
+
+
+@case("post_detail")
+def post_detail_case(dataset, i):
+    return Request("get", f"/api/posts/{dataset.popular_post}/")
+
+
+@case("post_search")
+def post_search_case(dataset, i):
+    return Request("get", f"/api/posts/search/?q={dataset.search_term}")
+
+
+@case("post_update")
+def post_update_case(dataset, i):
+    if i == 0:
+        dataset.updated_post = own_post(dataset)
+    path = f"/api/posts/{dataset.updated_post.id}/update/"
+    return Request("put", path, {"content": f"Editado {i}"})
+
+
+@case("post_delete")
+def post_delete_case(dataset, i):
+    return Request("delete", f"/api/posts/{own_post(dataset).id}/delete/")
+
+
+@case("post_like")
+def post_like_case(dataset, i):
+    return Request("post", f"/api/posts/{dataset.popular_post}/like/")
+
+
+@case("post_bulk_like")
+def post_bulk_like_case(dataset, i):
+    key = "unlike" if i % 2 else "like"
+    return Request("post", "/api/posts/like/bulk/", {key: dataset.post_ids})
+
+
+@case("post_likes")
+def post_likes_case(dataset, i):
+    return Request("get", f"/api/posts/{dataset.popular_post}/likes/")
+
+
+@case("comment_list")
+def comment_list_case(dataset, i):
+    return Request("get", f"/api/posts/{dataset.popular_post}/comments/")
+
+
+@case("comment_create")
+def comment_create_case(dataset, i):
+    path = f"/api/posts/{dataset.popular_post}/comments/create/"
+    return Request("post", path, {"content": f"Comentário {i}"})
+
+
+@case("comment_update")
+def comment_update_case(dataset, i):
+    if i == 0:
+        dataset.updated_comment = own_comment(dataset)
+    path = f"/api/posts/comments/{dataset.updated_comment.id}/update/"
+    return Request("put", path, {"content": f"Editado {i}"})
+
+
+@case("comment_delete")
+def comment_delete_case(dataset, i):
+    return Request("delete", f"/api/posts/comments/{own_comment(dataset).id}/delete/")
+
+
+@case("user_posts")
+def user_posts_case(dataset, i):
+    return Request("get", f"/api/posts/user/{dataset.popular_user}/")
+
+
+@case("my_posts")
+def my_posts_case(dataset, i):
+    return Request("get", "/api/posts/my-posts/")
+
+
+def url_names():
+    from django.urls import get_resolver
+
+    names = []
+    for pattern in get_resolver().url_patterns:
+        module = getattr(pattern, "urlconf_name", None)
+        if getattr(module, "__name__", None) in APPS:
+            names += [p.name for p in pattern.url_patterns if p.name]
+    return names
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts and times every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def measure(dataset, name, repeat, warmup, cold):
+    from django.core.cache import cache
+    from django.db import connection
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    clients = {}
+
+    def client_for(user):
+        if user.id not in clients:
+            client = APIClient(SERVER_NAME="localhost")
+            token = RefreshToken.for_user(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            clients[user.id] = client
+        return clients[user.id]
+
+    wall, queries, sql, statuses = [], [], [], set()
+    for i in range(warmup + repeat):
+        request = CASES[name](dataset, i)
+        client = client_for(request.user or dataset.viewer)
+        if cold:
+            cache.clear()
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            response = getattr(client, request.method)(
+                request.path, request.data, format="json"
+            )
+            elapsed = time.perf_counter() - started
+        if i >= warmup:
+            wall.append(elapsed * 1000)
+            queries.append(timer.count)
+            sql.append(timer.seconds * 1000)
+            statuses.add(response.status_code)
+
+    return {
+        "method": request.method.upper(),
+        "status": sorted(statuses),
+        "p50_ms": statistics.median(wall),
+        "p95_ms": percentile(wall, 0.95),
+        "mean_ms": statistics.mean(wall),
+        "queries": statistics.median(queries),
+        "max_queries": max(queries),
+        "sql_ms": statistics.median(sql),
+    }
+
+
+def run(posts, repeat, warmup, cold):
+    # Task and request logs would otherwise drown the report.
+    logging.disable(logging.INFO)
+    dataset = seed(posts)
+    names = url_names()
+    endpoints = {
+        name: measure(dataset, name, repeat, warmup, cold)
+        for name in names
+        if name in CASES
+    }
+    return {
+        "posts": posts,
+        "users": dataset.users,
+        "edges": dataset.edges,
+        "seed_seconds": dataset.seed_seconds,
+        "endpoints": endpoints,
+        "uncovered": [name for name in names if name not in CASES],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new, threshold):
+    """(size, name, reason) for every endpoint that regressed."""
+    regressions = []
+    old_sizes = {result["posts"]: result["endpoints"] for result in old["results"]}
+    for result in new["results"]:
+        before = old_sizes.get(result["posts"], {})
+        for name, after in result["endpoints"].items():
+            if name not in before:
+                continue
+            if after["queries"] > before[name]["queries"]:
+                regressions.append(
+                    (
+                        result["posts"],
+                        name,
+                        f"queries {before[name]['queries']} -> {after['queries']}",
+                    )
+                )
+            if after["p50_ms"] > before[name]["p50_ms"] * threshold:
+                regressions.append(
+                    (
+                        result["posts"],
+                        name,
+                        f"p50 {before[name]['p50_ms']:.1f}ms -> "
+                        f"{after['p50_ms']:.1f}ms",
+                    )
+                )
+    return regressions
+
+
+def report(results):
+    print(
+        f"{'posts':>9}  {'endpoint':<20}{'method':<8}{'status':<10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}{'sql ms':>9}"
+    )
+    for result in results:
+        for name, row in result["endpoints"].items():
+            status = ",".join(map(str, row["status"]))
+            print(
+                f"{result['posts']:>9}  {name:<20}{row['method']:<8}{status:<10}"
+                f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['queries']:>9g}{row['sql_ms']:>9.2f}"
+            )
+        for name in result["uncovered"]:
+            print(f"{result['posts']:>9}  {name:<20}sem caso de benchmark")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--cold", action="store_true", help="limpa o cache antes de cada requisição"
+    )
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    results = []
+    for posts in args.posts:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = benchmark_env(
+                Path(tmp) / "benchmark.sqlite3",
+                LOGIN_THROTTLE_IP_RATE="1000000/min",
+                LOGIN_THROTTLE_EMAIL_RATE="1000000/min",
+            )
+            with ProcessPoolExecutor(
+                max_workers=1, initializer=setup_django, initargs=(env,)
+            ) as pool:
+                results.append(
+                    pool.submit(
+                        run, posts, args.repeat, args.warmup, args.cold
+                    ).result()
+                )
+
+    output = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "cold": args.cold,
+        "results": results,
+    }
+    report(results)
+    if args.output:
+        args.output.write_text(json.dumps(output, indent=2))
+
+    if args.compare:
+        old = json.loads(args.compare.read_text())
+        regressions = compare(old, output, args.threshold)
+        print(f"\nComparado com {old.get('commit') or args.compare}:")
+        for posts, name, reason in regressions:
+            print(f"  {posts:>9}  {name:<20}{reason}")
+        if regressions:
+            sys.exit(1)
+        print("  nenhuma regressão")
+
+
+if __name__ == "__main__":
+    main()
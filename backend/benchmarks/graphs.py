@@ -0,0 +1,26 @@
+"""Synthetic follow graphs with a power-law (Zipf) in-degree."""
+
+import random
+from itertools import accumulate
+
+
+def power_law_edges(edges, users=None, exponent=1.1, seed=0):
+    """About `edges` sorted, de-duplicated (follower, following) pairs, ids from 1.
+
+    Out-degrees are drawn around the average and targets are picked with
+    probability ~ 1/rank**exponent, so a few accounts collect most of the
+    followers, as on a real network.
+    """
+    users = users or max(2, edges // 20)
+    rng = random.Random(seed)
+    ids = list(range(1, users + 1))
+    weights = list(accumulate(1 / rank**exponent for rank in ids))
+    average = edges / users
+
+    pairs = []
+    for follower in ids:
+        degree = min(users - 1, int(rng.expovariate(1 / average)) + 1)
+        targets = set(rng.choices(ids, cum_weights=weights, k=degree))
+        targets.discard(follower)
+        pairs.extend((follower, target) for target in sorted(targets))
+    return pairs
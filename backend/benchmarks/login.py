@@ -0,0 +1,136 @@
+"""
+Measure login throughput and its impact on other endpoints under uvicorn.
+
+Seeds a SQLite database with users sharing one real password hash, then
+drives GET /api/posts/ alone (baseline) and again while a storm of
+logins runs against the same server. The storm is repeated for each
+LOGIN_HASH_WORKERS value, with throttling lifted so every login hashes,
+and once more with the default rates to show how many attempts the
+token buckets reject before hashing.
+
+    cd backend
+    python -m benchmarks.login --hash-workers 1 2 64 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from .http import run_load
+from .server import benchmark_env, serve, setup_django
+
+PASSWORD = "benchmark-password"
+UNTHROTTLED = {
+    "LOGIN_THROTTLE_IP_RATE": "1000000/s",
+    "LOGIN_THROTTLE_EMAIL_RATE": "1000000/s",
+}
+
+
+def seed(users):
+    from django.contrib.auth.hashers import make_password
+    from authentication.models import User, Profile
+    from posts.models import Post
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    encoded = make_password(PASSWORD)
+    accounts = User.objects.bulk_create(
+        [
+            User(username=f"user{i}", email=f"user{i}@example.com", password=encoded)
+            for i in range(users)
+        ]
+    )
+    Profile.objects.bulk_create([Profile(user=user) for user in accounts])
+    Post.objects.bulk_create(
+        [Post(author=user, content=f"Post by {user.username}") for user in accounts]
+    )
+    return str(RefreshToken.for_user(accounts[0]).access_token)
+
+
+async def storm(port, token, args):
+    login = json.dumps({"email": "user1@example.com", "password": PASSWORD})
+    probe, logins = await asyncio.gather(
+        run_load(
+            "127.0.0.1",
+            port,
+            "/api/posts/",
+            {"Authorization": f"Bearer {token}"},
+            args.probe_concurrency,
+            args.duration,
+        ),
+        run_load(
+            "127.0.0.1",
+            port,
+            "/api/auth/login/",
+            {"Content-Type": "application/json"},
+            args.login_concurrency,
+            args.duration,
+            method="POST",
+            body=login.encode(),
+        ),
+    )
+    return probe, logins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--hash-workers", type=int, nargs="+", default=[1, 2, 64])
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--probe-concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "benchmark.sqlite3"
+        setup_django(benchmark_env(db_path))
+        token = seed(args.users)
+
+        with serve(benchmark_env(db_path, **UNTHROTTLED), args.port):
+            probe = asyncio.run(
+                run_load(
+                    "127.0.0.1",
+                    args.port,
+                    "/api/posts/",
+                    {"Authorization": f"Bearer {token}"},
+                    args.probe_concurrency,
+                    args.duration,
+                )
+            )
+        results.append({"scenario": "baseline", "probe": probe, "login": None})
+
+        scenarios = [
+            (f"storm/hash={workers}", {**UNTHROTTLED, "LOGIN_HASH_WORKERS": workers})
+            for workers in args.hash_workers
+        ]
+        scenarios.append(("storm/throttled", {}))
+        for name, overrides in scenarios:
+            with serve(benchmark_env(db_path, **overrides), args.port):
+                probe, logins = asyncio.run(storm(args.port, token, args))
+            results.append({"scenario": name, "probe": probe, "login": logins})
+
+    print(
+        f"{'scenario':<18}{'login/s':>9}{'429':>7}{'login p99':>11}"
+        f"{'posts/s':>9}{'posts p50':>11}{'posts p99':>11}"
+    )
+    for row in results:
+        login, probe = row["login"], row["probe"]
+        login_cols = (
+            f"{login['rps']:>9.1f}{login['throttled']:>7}{login['p99_ms']:>11.1f}"
+            if login
+            else f"{'-':>9}{'-':>7}{'-':>11}"
+        )
+        print(
+            f"{row['scenario']:<18}{login_cols}"
+            f"{probe['rps']:>9.1f}{probe['p50_ms']:>11.1f}{probe['p99_ms']:>11.1f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Latency of /api/posts/search/ queries against a LIKE '%term%' scan.
+
+A throwaway SQLite database is seeded with synthetic posts whose words
+follow a Zipf distribution, so there are very common, middling and rare
+terms, and each kind of query is timed through posts.search (first page,
+second page, author filter) next to the icontains filter it replaces.
+
+    cd backend
+    python -m benchmarks.search --posts 100000 1000000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from pathlib import Path
+from .server import benchmark_env, setup_django
+
+SYLLABLES = ["ba", "ca", "da", "fe", "go", "la", "mi", "no", "pe", "ri", "sa", "tu"]
+
+
+def vocabulary(size):
+    rng = random.Random(1)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words, key=lambda word: (len(word), word))
+
+
+def seed(posts, authors, words_per_post, exponent=1.0):
+    from authentication.models import User
+    from posts.models import Post
+
+    words = vocabulary(5000)
+    weights = list(accumulate(1 / rank**exponent for rank in range(1, len(words) + 1)))
+    rng = random.Random(0)
+
+    User.objects.bulk_create(
+        [
+            User(id=i, username=f"user{i}", email=f"user{i}@example.com", password="!")
+            for i in range(1, authors + 1)
+        ],
+        batch_size=5000,
+    )
+    started = time.perf_counter()
+    for start in range(0, posts, 10_000):
+        Post.objects.bulk_create(
+            [
+                Post(
+                    author_id=rng.randint(1, authors),
+                    content=" ".join(
+                        rng.choices(words, cum_weights=weights, k=words_per_post)
+                    ),
+                )
+                for _ in range(min(10_000, posts - start))
+            ]
+        )
+    return words, time.perf_counter() - started
+
+
+def timed(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = run()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "results": count,
+        "p50_ms": statistics.median(samples),
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def run(posts, authors, words_per_post, repeat):
+    from posts.models import Post
+    from posts.search import search_posts
+
+    words, seed_seconds = seed(posts, authors, words_per_post)
+    common, middling, rare = words[0], words[100], words[3000]
+    queries = {
+        "common": [common],
+        "middling": [middling],
+        "rare": [rare],
+        "two terms": [common, middling],
+        "prefix": [middling[:3]],
+    }
+
+    rows = []
+    for name, terms in queries.items():
+        first = search_posts(terms, limit=21)
+        rows.append(
+            {
+                "query": name,
+                "fts": timed(lambda: len(search_posts(terms, limit=21)), repeat),
+                "fts_page_2": timed(
+                    lambda: len(search_posts(terms, position=first[-1], limit=21)),
+                    repeat,
+                ),
+                "fts_author": timed(
+                    lambda: len(search_posts(terms, author_id=1, limit=21)), repeat
+                ),
+                "icontains": timed(
+                    lambda: len(
+                        Post.objects.filter(content__icontains=terms[0])
+                        .order_by("-created_at", "-id")
+                        .values_list("id", flat=True)[:21]
+                    ),
+                    repeat,
+                ),
+            }
+        )
+    return {"posts": posts, "seed_seconds": seed_seconds, "queries": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--authors", type=int, default=10_000)
+    parser.add_argument("--words", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    for posts in args.posts:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = benchmark_env(Path(tmp) / "benchmark.sqlite3")
+            with ProcessPoolExecutor(
+                max_workers=1, initializer=setup_django, initargs=(env,)
+            ) as pool:
+                results.append(
+                    pool.submit(
+                        run, posts, args.authors, args.words, args.repeat
+                    ).result()
+                )
+
+    columns = ["fts", "fts_page_2", "fts_author", "icontains"]
+    print(
+        f"{'posts':>9}  {'query':<10}"
+        + "".join(f"{c + ' p50/p99':>22}" for c in columns)
+    )
+    for result in results:
+        for row in result["queries"]:
+            timings = "".join(
+                f"{row[c]['p50_ms']:>13.2f}/{row[c]['p99_ms']:<8.2f}" for c in columns
+            )
+            print(f"{result['posts']:>9}  {row['query']:<10}{timings}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
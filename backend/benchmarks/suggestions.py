@@ -0,0 +1,116 @@
+"""
+Run time and memory of the "who to follow" job on power-law graphs.
+
+By default only the in-memory part (building the CSR matrix and ranking
+every user) runs, each size in a fresh process so the peak RSS is its
+own. With --db the graph is written to a throwaway SQLite database and
+the full job, including reading Follow and storing FollowSuggestion,
+is timed instead.
+
+    cd backend
+    python -m benchmarks.suggestions --edges 100000 1000000
+"""
+
+import argparse
+import json
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from .graphs import power_law_edges
+from .server import benchmark_env, setup_django
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_in_memory(edges, limit, max_fanout):
+    from follows.suggestions import FollowMatrix, suggest
+
+    pairs = power_law_edges(edges)
+    before = rss_mb()
+    started = time.perf_counter()
+    matrix = FollowMatrix(iter(pairs))
+    built = time.perf_counter()
+    del pairs
+
+    suggestions = 0
+    for user_id in matrix.users():
+        suggestions += len(suggest(matrix, user_id, limit, max_fanout))
+    finished = time.perf_counter()
+
+    return {
+        "mode": "memory",
+        "edges": len(matrix),
+        "users": len(matrix.rows),
+        "suggestions": suggestions,
+        "build_seconds": built - started,
+        "total_seconds": finished - started,
+        "peak_rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - before,
+    }
+
+
+def run_with_database(edges, limit, max_fanout):
+    from authentication.models import User
+    from follows.models import Follow
+    from follows.suggestions import compute_suggestions
+
+    pairs = power_law_edges(edges)
+    users = max(max(pair) for pair in pairs)
+    User.objects.bulk_create(
+        [
+            User(id=i, username=f"user{i}", email=f"user{i}@example.com", password="!")
+            for i in range(1, users + 1)
+        ],
+        batch_size=5000,
+    )
+    Follow.objects.bulk_create(
+        [Follow(follower_id=a, following_id=b) for a, b in pairs], batch_size=5000
+    )
+    del pairs
+
+    stats = compute_suggestions(limit=limit, max_fanout=max_fanout)
+    return {"mode": "database", **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edges", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--max-fanout", type=int, default=1000)
+    parser.add_argument("--db", action="store_true")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    for edges in args.edges:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = benchmark_env(Path(tmp) / "benchmark.sqlite3")
+            with ProcessPoolExecutor(
+                max_workers=1, initializer=setup_django, initargs=(env,)
+            ) as pool:
+                run = run_with_database if args.db else run_in_memory
+                results.append(
+                    pool.submit(run, edges, args.limit, args.max_fanout).result()
+                )
+
+    print(
+        f"{'mode':<10}{'edges':>10}{'users':>9}{'suggestions':>13}"
+        f"{'seconds':>9}{'peak MB':>9}"
+    )
+    for row in results:
+        print(
+            f"{row['mode']:<10}{row['edges']:>10}{row['users']:>9}"
+            f"{row['suggestions']:>13}{row['total_seconds']:>9.1f}"
+            f"{row['peak_rss_mb']:>9.0f}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Typeahead latency of the username prefix index against an istartswith query.
+
+A throwaway SQLite database is seeded with synthetic usernames, the
+local (bisect) index is built from it, and prefixes of one to four
+characters are timed through authentication.usernames.search and
+through User.objects.filter(username__istartswith=...).
+
+    cd backend
+    python -m benchmarks.usernames --users 100000 1000000
+"""
+
+import argparse
+import json
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from .search import timed
+from .server import benchmark_env, setup_django
+
+
+def usernames(count):
+    rng = random.Random(0)
+    names = set()
+    while len(names) < count:
+        names.add(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+            + str(rng.randint(0, 99))
+        )
+    return sorted(names)
+
+
+def run(users, limit, repeat):
+    from authentication import usernames as index
+    from authentication.models import User
+
+    names = usernames(users)
+    User.objects.bulk_create(
+        [
+            User(username=name, email=f"{name}@example.com", password="!")
+            for name in names
+        ],
+        batch_size=5000,
+    )
+
+    started = time.perf_counter()
+    size = index.get_index().rebuild()
+    build_seconds = time.perf_counter() - started
+
+    # Rebuilt once more under tracemalloc, which slows it down, for its size.
+    tracemalloc.start()
+    index.get_index().rebuild()
+    index_mb = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    rows = []
+    for length in range(1, 5):
+        prefixes = [rng.choice(names)[:length] for _ in range(repeat)]
+        prefix = iter(prefixes * 2)
+        rows.append(
+            {
+                "prefix_length": length,
+                "index": timed(lambda: len(index.search(next(prefix), limit)), repeat),
+                "istartswith": timed(
+                    lambda: len(
+                        User.objects.filter(username__istartswith=next(prefix))
+                        .order_by("username")
+                        .values_list("id", "username")[:limit]
+                    ),
+                    repeat,
+                ),
+            }
+        )
+    return {
+        "users": size,
+        "build_seconds": build_seconds,
+        "index_mb": index_mb,
+        "prefixes": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    results = []
+    for users in args.users:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = benchmark_env(Path(tmp) / "benchmark.sqlite3")
+            with ProcessPoolExecutor(
+                max_workers=1, initializer=setup_django, initargs=(env,)
+            ) as pool:
+                results.append(
+                    pool.submit(run, users, args.limit, args.repeat).result()
+                )
+
+    print(
+        f"{'users':>9}{'build s':>9}{'MB':>6}{'prefix':>8}"
+        f"{'index p50/p99 ms':>20}{'istartswith p50/p99 ms':>26}"
+    )
+    for result in results:
+        for row in result["prefixes"]:
+            index, query = row["index"], row["istartswith"]
+            print(
+                f"{result['users']:>9}{result['build_seconds']:>9.1f}"
+                f"{result['index_mb']:>6.0f}{row['prefix_length']:>8}"
+                f"{index['p50_ms']:>11.3f}/{index['p99_ms']:<8.3f}"
+                f"{query['p50_ms']:>17.2f}/{query['p99_ms']:<8.2f}"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import pytest
+
+pytest_plugins = ["backend.pytest_budgets"]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from backend.pytest_budgets import clear_caches
+
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@pytest.fixture(autouse=True)
+def celery_eager(settings):
+    settings.CELERY_TASK_ALWAYS_EAGER = True
@@ -0,0 +1,31 @@
+from backend.async_api import JSONResponse, async_api_view
+from backend.budgets import query_budget
+from backend.pagination import get_paginator
+from .models import Follow
+from .serializers import FollowSerializer
+
+
+@query_budget(2)
+@async_api_view(["GET"])
+async def my_followers(request):
+    followers = Follow.objects.filter(following=request.user).select_related(
+        "follower", "following"
+    )
+
+    paginator = get_paginator(request)
+    paginated_followers = await paginator.apaginate_queryset(followers, request)
+    serializer = FollowSerializer(paginated_followers, many=True)
+    return JSONResponse(paginator.get_paginated_data(serializer.data))
+
+
+@query_budget(2)
+@async_api_view(["GET"])
+async def my_following(request):
+    following = Follow.objects.filter(follower=request.user).select_related(
+        "follower", "following"
+    )
+
+    paginator = get_paginator(request)
+    paginated_following = await paginator.apaginate_queryset(following, request)
+    serializer = FollowSerializer(paginated_following, many=True)
+    return JSONResponse(paginator.get_paginated_data(serializer.data))
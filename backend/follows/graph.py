@@ -0,0 +1,233 @@
+"""
+Follow graph: each user's following and follower id sets, cached.
+
+A user's set is read from the Follow table the first time it is needed
+and then served from the backend picked by FOLLOW_GRAPH_BACKEND: Redis
+sets shared by every process when REDIS_URL is set, otherwise a
+per-process LRU. Follow and unfollow write through to the cached sets
+(see follows.signals), and every set also expires after a while, which
+bounds the drift from a write racing a concurrent load.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+import redis
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .models import Follow
+
+FOLLOWING = "following"
+FOLLOWERS = "followers"
+
+
+def load(kind, user_id):
+    if kind == FOLLOWING:
+        rows = Follow.objects.filter(follower_id=user_id).values_list(
+            "following_id", flat=True
+        )
+    else:
+        rows = Follow.objects.filter(following_id=user_id).values_list(
+            "follower_id", flat=True
+        )
+    return set(rows)
+
+
+def _edges(pairs):
+    """(follower, following) pairs as (kind, owner, member) set updates."""
+    for follower_id, following_id in pairs:
+        yield FOLLOWING, follower_id, following_id
+        yield FOLLOWERS, following_id, follower_id
+
+
+class LocalFollowGraph:
+    """Per-process LRU of adjacency sets (dev and tests)."""
+
+    def __init__(self, size=None, timeout=None):
+        self.size = size or settings.FOLLOW_GRAPH_LOCAL_SIZE
+        self.timeout = timeout or settings.FOLLOW_GRAPH_LOCAL_TIMEOUT
+        self._sets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def members(self, kind, user_id):
+        key = (kind, user_id)
+        with self._lock:
+            entry = self._sets.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._sets.move_to_end(key)
+                return entry[1]
+
+        ids = frozenset(load(kind, user_id))
+        with self._lock:
+            self._sets[key] = (time.monotonic() + self.timeout, ids)
+            self._sets.move_to_end(key)
+            while len(self._sets) > self.size:
+                self._sets.popitem(last=False)
+        return ids
+
+    def contains(self, kind, user_id, member):
+        return member in self.members(kind, user_id)
+
+    def contains_many(self, kind, user_id, members):
+        return self.members(kind, user_id) & set(members)
+
+    def intersection(self, kind, user_ids):
+        return set.intersection(*(set(self.members(kind, pk)) for pk in user_ids))
+
+    def count(self, kind, user_id):
+        return len(self.members(kind, user_id))
+
+    def _update(self, pairs, add):
+        with self._lock:
+            for kind, owner, member in _edges(pairs):
+                entry = self._sets.get((kind, owner))
+                if entry is not None:
+                    ids = entry[1] | {member} if add else entry[1] - {member}
+                    self._sets[(kind, owner)] = (entry[0], ids)
+
+    def add_many(self, pairs):
+        self._update(pairs, add=True)
+
+    def remove_many(self, pairs):
+        self._update(pairs, add=False)
+
+    def clear(self):
+        with self._lock:
+            self._sets.clear()
+
+
+class RedisFollowGraph:
+    """Adjacency sets in Redis, shared by every worker process."""
+
+    # Member marking a set as loaded, so an empty set still exists in Redis;
+    # user ids start at 1.
+    LOADED = 0
+
+    # Only touch sets that are already loaded; a missing one is read from
+    # the database in full the next time it is needed.
+    UPDATE_SCRIPT = """
+    for i, key in ipairs(KEYS) do
+        if redis.call('SISMEMBER', key, 0) == 1 then
+            redis.call(ARGV[1], key, ARGV[i + 1])
+        end
+    end
+    """
+
+    def __init__(self, url=None, timeout=None):
+        self.client = redis.Redis.from_url(url or settings.REDIS_URL)
+        self.timeout = timeout or settings.FOLLOW_GRAPH_TIMEOUT
+        self.update_script = self.client.register_script(self.UPDATE_SCRIPT)
+
+    @staticmethod
+    def key(kind, user_id):
+        return f"follows:{kind}:{user_id}"
+
+    def _ensure(self, kind, user_ids):
+        keys = [self.key(kind, pk) for pk in user_ids]
+        with self.client.pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.sismember(key, self.LOADED)
+            loaded = pipeline.execute()
+
+        missing = [pk for pk, found in zip(user_ids, loaded) if not found]
+        if missing:
+            with self.client.pipeline() as pipeline:
+                for pk in missing:
+                    key = self.key(kind, pk)
+                    pipeline.delete(key)
+                    pipeline.sadd(key, self.LOADED, *load(kind, pk))
+                    pipeline.expire(key, self.timeout)
+                pipeline.execute()
+        return keys
+
+    def _ids(self, values):
+        return {int(value) for value in values} - {self.LOADED}
+
+    def members(self, kind, user_id):
+        (key,) = self._ensure(kind, [user_id])
+        return frozenset(self._ids(self.client.smembers(key)))
+
+    def contains(self, kind, user_id, member):
+        (key,) = self._ensure(kind, [user_id])
+        return bool(self.client.sismember(key, member))
+
+    def contains_many(self, kind, user_id, members):
+        members = list(members)
+        if not members:
+            return set()
+        (key,) = self._ensure(kind, [user_id])
+        found = self.client.smismember(key, members)
+        return {member for member, hit in zip(members, found) if hit}
+
+    def intersection(self, kind, user_ids):
+        return self._ids(self.client.sinter(self._ensure(kind, list(user_ids))))
+
+    def count(self, kind, user_id):
+        (key,) = self._ensure(kind, [user_id])
+        return self.client.scard(key) - 1
+
+    def _update(self, pairs, command):
+        edges = list(_edges(pairs))
+        if edges:
+            self.update_script(
+                keys=[self.key(kind, owner) for kind, owner, _ in edges],
+                args=[command, *(member for _, _, member in edges)],
+            )
+
+    def add_many(self, pairs):
+        self._update(pairs, "SADD")
+
+    def remove_many(self, pairs):
+        self._update(pairs, "SREM")
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match="follows:*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+@lru_cache(maxsize=None)
+def get_graph():
+    return import_string(settings.FOLLOW_GRAPH_BACKEND)()
+
+
+def following_ids(user_id):
+    return get_graph().members(FOLLOWING, user_id)
+
+
+def follower_ids(user_id):
+    return get_graph().members(FOLLOWERS, user_id)
+
+
+def is_following(follower_id, following_id):
+    return get_graph().contains(FOLLOWING, follower_id, following_id)
+
+
+def followed_among(user_id, candidate_ids):
+    """The subset of candidate_ids that user_id follows."""
+    return get_graph().contains_many(FOLLOWING, user_id, candidate_ids)
+
+
+def common_following(*user_ids):
+    return get_graph().intersection(FOLLOWING, user_ids)
+
+
+def common_followers(*user_ids):
+    return get_graph().intersection(FOLLOWERS, user_ids)
+
+
+def following_count(user_id):
+    return get_graph().count(FOLLOWING, user_id)
+
+
+def follower_count(user_id):
+    return get_graph().count(FOLLOWERS, user_id)
+
+
+def record_follows(pairs):
+    get_graph().add_many(pairs)
+
+
+def record_unfollows(pairs):
+    get_graph().remove_many(pairs)
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from follows.suggestions import compute_suggestions
+
+
+class Command(BaseCommand):
+    help = "Calcula as sugestões de quem seguir a partir do grafo de follows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.FOLLOW_SUGGESTIONS_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--limit", type=int, default=settings.FOLLOW_SUGGESTIONS_LIMIT
+        )
+        parser.add_argument(
+            "--max-fanout", type=int, default=settings.FOLLOW_SUGGESTIONS_MAX_FANOUT
+        )
+
+    def handle(self, *args, **options):
+        stats = compute_suggestions(
+            options["batch_size"], options["limit"], options["max_fanout"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{stats['suggestions']} sugestões para {stats['users']} usuários "
+                f"({stats['edges']} follows) em {stats['total_seconds']:.1f} s, "
+                f"pico de memória {stats['peak_rss_mb']} MB"
+            )
+        )
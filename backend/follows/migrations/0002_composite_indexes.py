@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:51
+
+from django.conf import settings
+from django.db import migrations, models
+from backend.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("follows", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="follow",
+            index=models.Index(
+                fields=["following", "-created_at", "-id"],
+                name="follows_following_recent",
+            ),
+        ),
+        AddIndexOnline(
+            model_name="follow",
+            index=models.Index(
+                fields=["follower", "-created_at", "-id"],
+                name="follows_follower_recent",
+            ),
+        ),
+    ]
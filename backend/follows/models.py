@@ -13,6 +13,37 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ("follower", "following")
+        indexes = [
+            models.Index(
+                fields=["following", "-created_at", "-id"],
+                name="follows_following_recent",
+            ),
+            models.Index(
+                fields=["follower", "-created_at", "-id"],
+                name="follows_follower_recent",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
+
+
+class FollowSuggestion(models.Model):
+    """A precomputed "who to follow" entry, written by follows.suggestions."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="follow_suggestions"
+    )
+    suggested = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    mutual_count = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "suggested")
+        indexes = [
+            models.Index(fields=["user", "rank"], name="follows_suggestion_rank"),
+        ]
+
+    def __str__(self):
+        return f"Suggest {self.suggested_id} to {self.user_id}"
@@ -0,0 +1,14 @@
+"""
+Base querysets of the paginated follow views, shared with
+tests/test_indexes.py.
+"""
+
+from .models import Follow
+
+
+def followers_of(user):
+    return Follow.objects.filter(following=user).select_related("follower", "following")
+
+
+def followed_by(user):
+    return Follow.objects.filter(follower=user).select_related("follower", "following")
@@ -1,6 +1,7 @@
 from rest_framework import serializers
-from .models import Follow
+from .models import Follow, FollowSuggestion
 from authentication.serializers import UserSerializer
+from backend.batch import BulkIdsSerializer, id_list
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -17,3 +18,16 @@ class FollowCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Follow
         fields = ["following"]
+
+
+class FollowSuggestionSerializer(serializers.ModelSerializer):
+    user = UserSerializer(source="suggested", read_only=True)
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ["user", "mutual_count"]
+
+
+class BulkFollowSerializer(BulkIdsSerializer):
+    follow = id_list()
+    unfollow = id_list()
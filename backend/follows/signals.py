@@ -0,0 +1,22 @@
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import graph
+from .models import Follow
+
+# The cached graph is written once the transaction commits, so a rolled
+# back follow or unfollow never reaches it.
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        pairs = [(instance.follower_id, instance.following_id)]
+        transaction.on_commit(partial(graph.record_follows, pairs))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    pairs = [(instance.follower_id, instance.following_id)]
+    transaction.on_commit(partial(graph.record_unfollows, pairs))
@@ -0,0 +1,18 @@
+import logging
+from celery import shared_task
+from backend.celery import RETRY_POLICY
+from . import suggestions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(**RETRY_POLICY)
+def compute_follow_suggestions():
+    stats = suggestions.compute_suggestions()
+    logger.info(
+        "Sugestões calculadas: users=%(users)s edges=%(edges)s "
+        "suggestions=%(suggestions)s seconds=%(total_seconds).1f "
+        "peak_rss_mb=%(peak_rss_mb)s",
+        stats,
+    )
+    return stats
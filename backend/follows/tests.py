@@ -75,6 +75,140 @@ class TestFollowUser:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
+@pytest.mark.django_db
+class TestFollowBulk:
+    def test_follow_bulk(self, authenticated_client, user1, user2, user3):
+        from posts.models import Post, TimelineEntry
+
+        Follow.objects.create(follower=user1, following=user3)
+        post = Post.objects.create(author=user2, content="Old post")
+        response = authenticated_client.post(
+            "/api/follows/follow/bulk/",
+            {"follow": [user2.id, user3.id, user1.id, 999], "unfollow": []},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["status"] for item in response.data["results"]] == [
+            "followed",
+            "already_following",
+            "self",
+            "not_found",
+        ]
+        assert Follow.objects.filter(follower=user1).count() == 2
+        assert TimelineEntry.objects.filter(user=user1, post=post).exists()
+
+    def test_unfollow_bulk(self, authenticated_client, user1, user2, user3):
+        Follow.objects.create(follower=user1, following=user2)
+        response = authenticated_client.post(
+            "/api/follows/follow/bulk/",
+            {"unfollow": [user2.id, user3.id]},
+            format="json",
+        )
+        assert [item["status"] for item in response.data["results"]] == [
+            "unfollowed",
+            "not_following",
+        ]
+        assert not Follow.objects.filter(follower=user1).exists()
+
+    def test_follow_bulk_query_count(self, authenticated_client, user1):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        users = [
+            User.objects.create_user(
+                username=f"bulk{i}", email=f"bulk{i}@example.com", password="x"
+            )
+            for i in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.post(
+                "/api/follows/follow/bulk/",
+                {"follow": [user.id for user in users]},
+                format="json",
+            )
+        assert Follow.objects.filter(follower=user1).count() == 20
+        inserts = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('INSERT INTO "follows_follow"')
+        ]
+        assert len(inserts) == 1
+
+    def test_follow_bulk_ignores_stale_graph(
+        self, authenticated_client, user1, user2, django_capture_on_commit_callbacks
+    ):
+        from . import graph
+
+        graph.following_ids(user1.id)
+        # Written by another worker: this process's graph does not see it.
+        Follow.objects.bulk_create([Follow(follower=user1, following=user2)])
+        Profile.objects.filter(user__in=[user1, user2]).update(
+            following_count=1, followers_count=1
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = authenticated_client.post(
+                "/api/follows/follow/bulk/", {"follow": [user2.id]}, format="json"
+            )
+        assert response.data["results"][0]["status"] == "already_following"
+        assert Follow.objects.filter(follower=user1, following=user2).count() == 1
+        assert Profile.objects.get(user=user1).following_count == 1
+        assert Profile.objects.get(user=user2).followers_count == 1
+
+    def test_writes_lock_every_user_in_id_order(
+        self, authenticated_client, user1, user2, user3
+    ):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def locks(context):
+            return [
+                query["sql"]
+                for query in context.captured_queries
+                if query["sql"].startswith(
+                    'SELECT "authentication_user"."id" AS "id" FROM'
+                )
+                and "ORDER BY 1 ASC" in query["sql"]
+            ]
+
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.post("/api/follows/follow/", {"following": user3.id})
+        [lock] = locks(context)
+        assert f"IN ({user1.id}, {user3.id})" in lock
+        sql = [query["sql"] for query in context.captured_queries]
+        assert sql.index(lock) < next(
+            i for i, q in enumerate(sql) if q.startswith('INSERT INTO "follows_follow"')
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.post(
+                "/api/follows/follow/bulk/",
+                {"follow": [user2.id], "unfollow": [user3.id]},
+                format="json",
+            )
+        [lock] = locks(context)
+        assert f"IN ({user1.id}, {user2.id}, {user3.id})" in lock
+
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.delete(f"/api/follows/unfollow/{user2.id}/")
+        [lock] = locks(context)
+        assert f"IN ({user1.id}, {user2.id})" in lock
+
+    def test_follow_bulk_validation(self, authenticated_client, user2, settings):
+        response = authenticated_client.post(
+            "/api/follows/follow/bulk/",
+            {"follow": [user2.id], "unfollow": [user2.id]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        settings.BATCH_MAX_IDS = 1
+        response = authenticated_client.post(
+            "/api/follows/follow/bulk/", {"follow": [1, 2]}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestUnfollowUser:
     def test_unfollow_user(self, authenticated_client, user1, user2):
@@ -104,3 +238,179 @@ class TestMyFollowing:
         response = authenticated_client.get("/api/follows/my-following/")
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 1
+
+
+@pytest.mark.django_db
+class TestFollowGraph:
+    def test_queries(self, user1, user2, user3):
+        from . import graph
+
+        Follow.objects.create(follower=user1, following=user3)
+        Follow.objects.create(follower=user2, following=user3)
+        Follow.objects.create(follower=user2, following=user1)
+
+        assert graph.following_ids(user2.id) == {user1.id, user3.id}
+        assert graph.follower_ids(user3.id) == {user1.id, user2.id}
+        assert graph.is_following(user1.id, user3.id)
+        assert not graph.is_following(user3.id, user1.id)
+        assert graph.followed_among(user2.id, [user1.id, user2.id]) == {user1.id}
+        assert graph.common_following(user1.id, user2.id) == {user3.id}
+        assert graph.common_followers(user1.id, user3.id) == {user2.id}
+        assert graph.following_count(user2.id) == 2
+        assert graph.follower_count(user2.id) == 0
+
+    def test_writes_go_through_without_queries(
+        self,
+        authenticated_client,
+        user1,
+        user2,
+        user3,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        from . import graph
+
+        graph.following_ids(user1.id)
+        graph.follower_ids(user2.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.post("/api/follows/follow/", {"following": user2.id})
+            authenticated_client.post(
+                "/api/follows/follow/bulk/", {"follow": [user3.id]}, format="json"
+            )
+
+        with django_assert_num_queries(0):
+            assert graph.following_ids(user1.id) == {user2.id, user3.id}
+            assert graph.follower_ids(user2.id) == {user1.id}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f"/api/follows/unfollow/{user2.id}/")
+        with django_assert_num_queries(0):
+            assert graph.following_ids(user1.id) == {user3.id}
+            assert graph.follower_ids(user2.id) == set()
+
+    def test_stale_graph_does_not_refuse_a_follow(
+        self, authenticated_client, user1, user2
+    ):
+        from . import graph
+
+        Follow.objects.create(follower=user1, following=user2)
+        graph.following_ids(user1.id)
+        # Unfollowed through another process: this one's set still has it.
+        Follow.objects.filter(follower=user1, following=user2)._raw_delete("default")
+
+        response = authenticated_client.post(
+            "/api/follows/follow/", {"following": user2.id}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_rolled_back_follow_stays_out_of_the_graph(
+        self, user1, user2, django_capture_on_commit_callbacks
+    ):
+        from django.db import transaction
+        from . import graph
+
+        graph.following_ids(user1.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                Follow.objects.create(follower=user1, following=user2)
+                transaction.set_rollback(True)
+
+        assert graph.following_ids(user1.id) == set()
+
+    def test_stale_graph_still_rejects_duplicates(
+        self, authenticated_client, user1, user2
+    ):
+        from . import graph
+
+        graph.following_ids(user1.id)
+        # bulk_create skips the signals, leaving the cached set stale.
+        Follow.objects.bulk_create([Follow(follower=user1, following=user2)])
+
+        response = authenticated_client.post(
+            "/api/follows/follow/", {"following": user2.id}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Follow.objects.filter(follower=user1, following=user2).count() == 1
+
+    def test_local_graph_evicts_least_recently_used(
+        self, user1, user2, user3, django_assert_num_queries
+    ):
+        from .graph import FOLLOWING, LocalFollowGraph
+
+        local = LocalFollowGraph(size=2)
+        local.members(FOLLOWING, user1.id)
+        local.members(FOLLOWING, user2.id)
+        local.members(FOLLOWING, user1.id)
+        local.members(FOLLOWING, user3.id)
+
+        with django_assert_num_queries(0):
+            local.members(FOLLOWING, user1.id)
+        with django_assert_num_queries(1):
+            local.members(FOLLOWING, user2.id)
+
+
+@pytest.mark.django_db
+class TestFollowSuggestions:
+    def test_suggest_ranks_by_mutual_follows(self):
+        from .suggestions import FollowMatrix, suggest
+
+        edges = sorted([(1, 2), (1, 3), (2, 4), (2, 5), (3, 4), (3, 1), (4, 5)])
+        matrix = FollowMatrix(edges)
+
+        assert list(matrix.following(1)) == [2, 3]
+        assert suggest(matrix, 1, limit=10, max_fanout=100) == [(4, 2), (5, 1)]
+        assert suggest(matrix, 1, limit=1, max_fanout=100) == [(4, 2)]
+        assert suggest(matrix, 1, limit=10, max_fanout=1) == [(4, 1)]
+        assert suggest(matrix, 5, limit=10, max_fanout=100) == []
+
+    def test_endpoint_serves_stored_suggestions(
+        self,
+        authenticated_client,
+        user1,
+        user2,
+        user3,
+        django_capture_on_commit_callbacks,
+    ):
+        from django.core.management import call_command
+
+        user4 = User.objects.create_user(
+            username="user4", email="user4@example.com", password="pass123"
+        )
+        Follow.objects.create(follower=user1, following=user2)
+        Follow.objects.create(follower=user2, following=user3)
+        Follow.objects.create(follower=user2, following=user4)
+        Follow.objects.create(follower=user4, following=user3)
+        call_command("compute_follow_suggestions")
+
+        response = authenticated_client.get("/api/follows/suggestions/")
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["user"]["id"] for item in response.data["results"]] == [
+            user3.id,
+            user4.id,
+        ]
+        assert response.data["results"][0]["mutual_count"] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.post("/api/follows/follow/", {"following": user3.id})
+        User.objects.filter(id=user4.id).update(is_active=False)
+        response = authenticated_client.get("/api/follows/suggestions/")
+        assert response.data["results"] == []
+
+    def test_recompute_drops_stale_suggestions(self, user1, user2, user3):
+        from .models import FollowSuggestion
+        from .suggestions import compute_suggestions
+
+        Follow.objects.create(follower=user1, following=user2)
+        Follow.objects.create(follower=user2, following=user3)
+        stats = compute_suggestions()
+        assert stats["edges"] == 2
+        assert stats["suggestions"] == 1
+        assert FollowSuggestion.objects.filter(user=user1, suggested=user3).exists()
+
+        Follow.objects.filter(follower=user1).delete()
+        compute_suggestions()
+        assert not FollowSuggestion.objects.exists()
+
+    def test_suggestions_unauthorized(self, api_client):
+        response = api_client.get("/api/follows/suggestions/")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -1,9 +1,20 @@
 from django.urls import path
-from . import views
+from backend.async_api import read_view
+from . import async_views, views
 
 urlpatterns = [
     path("follow/", views.follow_user, name="follow_user"),
+    path("follow/bulk/", views.follow_bulk, name="follow_bulk"),
     path("unfollow/<int:user_id>/", views.unfollow_user, name="unfollow_user"),
-    path("my-followers/", views.my_followers, name="my_followers"),
-    path("my-following/", views.my_following, name="my_following"),
+    path(
+        "my-followers/",
+        read_view("my_followers", views, async_views),
+        name="my_followers",
+    ),
+    path(
+        "my-following/",
+        read_view("my_following", views, async_views),
+        name="my_following",
+    ),
+    path("suggestions/", views.follow_suggestions, name="follow_suggestions"),
 ]
@@ -1,14 +1,43 @@
+from functools import partial
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
-from .models import Follow
-from .serializers import FollowSerializer, FollowCreateSerializer
+from backend.batch import bulk_status
+from backend.budgets import query_budget
+from backend.celery import enqueue
+from backend.pagination import get_paginator
+from posts import tasks as posts_tasks
+from . import graph, queries
+from .models import Follow, FollowSuggestion
+from .serializers import (
+    FollowSerializer,
+    FollowCreateSerializer,
+    FollowSuggestionSerializer,
+    BulkFollowSerializer,
+)
+from authentication.counters import adjust_follow_counts
 from authentication.models import User
 
 
+def lock_follows(follower_id, user_ids):
+    """Lock the follower and every user it touches, in id order.
+
+    The Follow INSERT takes a shared lock on both users' rows for its
+    foreign keys; taking them all up front, sorted, means two users
+    following each other wait instead of deadlocking. Returns the ids
+    that exist.
+    """
+    return set(
+        User.objects.select_for_update()
+        .filter(id__in=[follower_id, *user_ids])
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def follow_user(request):
@@ -22,15 +51,20 @@ def follow_user(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if Follow.objects.filter(
-            follower=request.user, following=following_user
-        ).exists():
+        try:
+            # Decided by the unique constraint, not the cached graph, which
+            # can be stale (another process's unfollow, a local graph).
+            with transaction.atomic():
+                lock_follows(request.user.id, [following_user.id])
+                follow = Follow.objects.create(
+                    follower=request.user, following=following_user
+                )
+                adjust_follow_counts([(request.user.id, following_user.id)], 1)
+        except IntegrityError:
             return Response(
                 {"error": "Você já está seguindo este usuário"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        follow = Follow.objects.create(follower=request.user, following=following_user)
         return Response(
             {
                 "message": f"Você começou a seguir {following_user.username}",
@@ -42,13 +76,77 @@ def follow_user(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def follow_bulk(request):
+    serializer = BulkFollowSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    to_follow = serializer.validated_data["follow"]
+    to_unfollow = serializer.validated_data["unfollow"]
+
+    with transaction.atomic():
+        users = lock_follows(request.user.id, to_follow + to_unfollow)
+        users.discard(request.user.id)
+        # Decided from the rows, not the cached graph, which can be stale:
+        # with the follower locked nobody else adds or removes them, so
+        # the counts move by exactly what is inserted and deleted here.
+        following = set(
+            Follow.objects.select_for_update()
+            .filter(follower=request.user, following_id__in=users)
+            .values_list("following_id", flat=True)
+        )
+        new_follows = [pk for pk in to_follow if pk in users and pk not in following]
+        removed = [pk for pk in to_unfollow if pk in following]
+        new_pairs = [(request.user.id, pk) for pk in new_follows]
+        # bulk_create skips post_save, so the graph is updated here and the
+        # timeline backfill is queued below.
+        Follow.objects.bulk_create(
+            [Follow(follower=request.user, following_id=pk) for pk in new_follows]
+        )
+        transaction.on_commit(partial(graph.record_follows, new_pairs))
+        Follow.objects.filter(follower=request.user, following_id__in=removed).delete()
+        adjust_follow_counts(new_pairs, 1)
+        adjust_follow_counts([(request.user.id, pk) for pk in removed], -1)
+
+    for pk in new_follows:
+        enqueue(posts_tasks.backfill_timeline, request.user.id, pk)
+
+    results = [
+        {
+            "user_id": pk,
+            "status": (
+                "self"
+                if pk == request.user.id
+                else bulk_status(
+                    pk, users, new_follows, "followed", "already_following"
+                )
+            ),
+        }
+        for pk in to_follow
+    ] + [
+        {
+            "user_id": pk,
+            "status": bulk_status(pk, users, removed, "unfollowed", "not_following"),
+        }
+        for pk in to_unfollow
+    ]
+    return Response({"results": results})
+
+
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def unfollow_user(request, user_id):
     try:
         following_user = get_object_or_404(User, id=user_id)
-        follow = Follow.objects.get(follower=request.user, following=following_user)
-        follow.delete()
+        with transaction.atomic():
+            lock_follows(request.user.id, [following_user.id])
+            deleted, _ = Follow.objects.filter(
+                follower=request.user, following=following_user
+            ).delete()
+            if not deleted:
+                raise Follow.DoesNotExist
+            adjust_follow_counts([(request.user.id, following_user.id)], -1)
 
         return Response(
             {"message": f"Você deixou de seguir {following_user.username}"},
@@ -61,25 +159,40 @@ def unfollow_user(request, user_id):
         )
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_followers(request):
-    followers = Follow.objects.filter(following=request.user).select_related("follower")
+    followers = queries.followers_of(request.user)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_followers = paginator.paginate_queryset(followers, request)
     serializer = FollowSerializer(paginated_followers, many=True)
     return paginator.get_paginated_response(serializer.data)
 
 
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_following(request):
-    following = Follow.objects.filter(follower=request.user).select_related("following")
+    following = queries.followed_by(request.user)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_following = paginator.paginate_queryset(following, request)
     serializer = FollowSerializer(paginated_following, many=True)
     return paginator.get_paginated_response(serializer.data)
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def follow_suggestions(request):
+    suggestions = (
+        FollowSuggestion.objects.filter(user=request.user, suggested__is_active=True)
+        .select_related("suggested")
+        .order_by("rank")
+    )
+    # Accounts followed since the last run stay stored until the next one.
+    followed = graph.following_ids(request.user.id)
+    results = [item for item in suggestions if item.suggested_id not in followed]
+    return Response({"results": FollowSuggestionSerializer(results, many=True).data})
@@ -0,0 +1,49 @@
+from django.http import Http404
+from backend.async_api import JSONResponse, async_api_view
+from backend.batch import get_batch_data, parse_ids
+from backend.budgets import query_budget
+from backend.pagination import get_paginator
+from . import queries
+from .cache import arender_posts
+from .models import Post
+from .serializers import CommentSerializer
+
+
+@query_budget(4)
+@async_api_view(["GET"])
+async def post_list(request):
+    entries = queries.timeline_of(request.user)
+
+    paginator = get_paginator(request)
+    paginated_entries = await paginator.apaginate_queryset(entries, request)
+    posts = await arender_posts([entry.post_id for entry in paginated_entries], request)
+    return JSONResponse(paginator.get_paginated_data(posts))
+
+
+@async_api_view(["GET"])
+async def post_detail(request, post_id):
+    posts = await arender_posts([post_id], request)
+    if not posts:
+        raise Http404("No Post matches the given query.")
+    return JSONResponse(posts[0])
+
+
+@query_budget(3)
+@async_api_view(["GET"])
+async def post_batch(request):
+    post_ids = parse_ids(request)
+    posts = await arender_posts(post_ids, request)
+    return JSONResponse(get_batch_data(post_ids, {post["id"]: post for post in posts}))
+
+
+@query_budget(3)
+@async_api_view(["GET"])
+async def comment_list(request, post_id):
+    if not await Post.objects.filter(id=post_id).aexists():
+        raise Http404("No Post matches the given query.")
+    comments = queries.comments_on(post_id)
+
+    paginator = get_paginator(request)
+    paginated_comments = await paginator.apaginate_queryset(comments, request)
+    serializer = CommentSerializer(paginated_comments, many=True)
+    return JSONResponse(paginator.get_paginated_data(serializer.data))
@@ -0,0 +1,111 @@
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import cache
+from .models import Post
+from .serializers import (
+    PostPayloadSerializer,
+    aget_liked_post_ids,
+    get_liked_post_ids,
+)
+
+# Bump when PostPayloadSerializer or the cached entry format changes so old
+# payloads are never served.
+PAYLOAD_VERSION = 2
+
+
+def payload_key(post_id):
+    return f"posts:payload:v{PAYLOAD_VERSION}:{post_id}"
+
+
+def generation_key(post_id):
+    return f"posts:generation:{post_id}"
+
+
+# Payloads are stored as (generation, payload) and only served while the
+# post's generation is unchanged. invalidate_post writes a new generation,
+# so a payload read from the database before a write and stored after it
+# carries the old one and is never served.
+
+
+def cache_keys(post_ids):
+    return [
+        key
+        for post_id in post_ids
+        for key in (payload_key(post_id), generation_key(post_id))
+    ]
+
+
+def current_payloads(post_ids, cached):
+    generations = {post_id: cached.get(generation_key(post_id)) for post_id in post_ids}
+    payloads = {}
+    for post_id in post_ids:
+        entry = cached.get(payload_key(post_id))
+        if entry is not None and entry[0] == generations[post_id]:
+            payloads[post_id] = entry[1]
+    return payloads, generations
+
+
+def entries(fresh, generations):
+    return {
+        payload_key(post_id): (generations[post_id], payload)
+        for post_id, payload in fresh.items()
+    }
+
+
+def get_payloads(post_ids):
+    post_ids = list(dict.fromkeys(post_ids))
+    cached = cache.get_many(cache_keys(post_ids))
+    payloads, generations = current_payloads(post_ids, cached)
+
+    missing = [post_id for post_id in post_ids if post_id not in payloads]
+    if missing:
+        posts = Post.objects.filter(id__in=missing).select_related("author")
+        fresh = {post.id: dict(PostPayloadSerializer(post).data) for post in posts}
+        cache.set_many(entries(fresh, generations), timeout=settings.POST_CACHE_TIMEOUT)
+        payloads.update(fresh)
+
+    return payloads
+
+
+async def aget_payloads(post_ids):
+    post_ids = list(dict.fromkeys(post_ids))
+    cached = await cache.aget_many(cache_keys(post_ids))
+    payloads, generations = current_payloads(post_ids, cached)
+
+    missing = [post_id for post_id in post_ids if post_id not in payloads]
+    if missing:
+        posts = Post.objects.filter(id__in=missing).select_related("author")
+        fresh = {
+            post.id: dict(PostPayloadSerializer(post).data) async for post in posts
+        }
+        await cache.aset_many(
+            entries(fresh, generations), timeout=settings.POST_CACHE_TIMEOUT
+        )
+        payloads.update(fresh)
+
+    return payloads
+
+
+def merge_viewer_fields(post_ids, payloads, liked_post_ids):
+    return [
+        {**payloads[post_id], "is_liked": post_id in liked_post_ids}
+        for post_id in post_ids
+        if post_id in payloads
+    ]
+
+
+def render_posts(post_ids, request):
+    payloads = get_payloads(post_ids)
+    liked_post_ids = get_liked_post_ids(request.user, payloads.keys())
+    return merge_viewer_fields(post_ids, payloads, liked_post_ids)
+
+
+async def arender_posts(post_ids, request):
+    payloads = await aget_payloads(post_ids)
+    liked_post_ids = await aget_liked_post_ids(request.user, payloads.keys())
+    return merge_viewer_fields(post_ids, payloads, liked_post_ids)
+
+
+def invalidate_post(post_id):
+    # Outlives any payload stored under the previous generation.
+    cache.set(generation_key(post_id), uuid4().hex, settings.POST_CACHE_TIMEOUT * 2)
@@ -0,0 +1,24 @@
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Post, Like, Comment
+
+
+def _count_subquery(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def rebuild_counters(posts=None):
+    posts = Post.objects.all() if posts is None else posts
+    return posts.update(
+        likes_count=_count_subquery(Like),
+        comments_count=_count_subquery(Comment),
+    )
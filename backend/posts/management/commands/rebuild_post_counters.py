@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from posts.counters import rebuild_counters
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recalcula likes_count e comments_count dos posts a partir das tabelas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = Post.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+
+        total = 0
+        for start in range(1, last_id + 1, batch_size):
+            total += rebuild_counters(
+                Post.objects.filter(id__gte=start, id__lt=start + batch_size)
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"{total} posts recalculados"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from authentication.models import User
+from posts.timeline import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Reconstrói as timelines materializadas do feed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("user_ids", nargs="*", type=int)
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("id")
+        if options["user_ids"]:
+            users = users.filter(id__in=options["user_ids"])
+
+        total = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            rebuild_timeline(user_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{total} timelines reconstruídas"))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:51
+
+from django.conf import settings
+from django.db import migrations, models
+from backend.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("posts", "0003_post_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "-created_at", "-id"], name="posts_comment_post_recent"
+            ),
+        ),
+        AddIndexOnline(
+            model_name="like",
+            index=models.Index(
+                fields=["post", "-created_at", "-id"], name="posts_like_post_recent"
+            ),
+        ),
+        AddIndexOnline(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_at", "-id"], name="posts_post_author_recent"
+            ),
+        ),
+        AddIndexOnline(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="posts_timeline_user_recent"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="timelineentry",
+            name="posts_timeline_user_created",
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+from backend.operations import RunSQLForVendor
+
+# On SQLite, Django rebuilds a table to alter it, which drops its triggers:
+# a later migration that alters posts_post must recreate the ones below.
+SQLITE = [
+    """
+    CREATE VIRTUAL TABLE posts_post_fts USING fts5(
+        content,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_post_fts_update AFTER UPDATE OF content ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO posts_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS posts_post_fts_update",
+    "DROP TRIGGER IF EXISTS posts_post_fts_delete",
+    "DROP TRIGGER IF EXISTS posts_post_fts_insert",
+    "DROP TABLE IF EXISTS posts_post_fts",
+]
+
+# InnoDB keeps FULLTEXT indexes in sync with the table by itself.
+MYSQL = ["ALTER TABLE posts_post ADD FULLTEXT INDEX posts_post_content_fts (content)"]
+
+MYSQL_REVERSE = ["ALTER TABLE posts_post DROP INDEX posts_post_content_fts"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0004_composite_indexes"),
+    ]
+
+    operations = [
+        RunSQLForVendor(
+            sql={"sqlite": SQLITE, "mysql": MYSQL},
+            reverse_sql={"sqlite": SQLITE_REVERSE, "mysql": MYSQL_REVERSE},
+        ),
+    ]
@@ -5,9 +5,18 @@ from authentication.models import User
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
     content = models.TextField()
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["author", "-created_at", "-id"], name="posts_post_author_recent"
+            ),
+        ]
+
     def __str__(self):
         return f"Post {self.id} by {self.author.username}"
 
@@ -19,6 +28,11 @@ class Like(models.Model):
 
     class Meta:
         unique_together = ("user", "post")
+        indexes = [
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="posts_like_post_recent"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} liked Post {self.post.id}"
@@ -31,5 +45,34 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["post", "-created_at", "-id"], name="posts_comment_post_recent"
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.author.username} on Post {self.post.id}"
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="posts_timeline_user_recent"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} on {self.user_id}'s timeline"
@@ -0,0 +1,24 @@
+"""
+Base querysets of the paginated post views.
+
+Shared with tests/test_indexes.py, which checks each one against its
+index, so a view cannot change its query shape without the test seeing it.
+"""
+
+from .models import Comment, Like, Post, TimelineEntry
+
+
+def timeline_of(user):
+    return TimelineEntry.objects.filter(user=user).only("id", "post", "created_at")
+
+
+def posts_by(user):
+    return Post.objects.filter(author=user).only("id", "created_at")
+
+
+def comments_on(post_id):
+    return Comment.objects.filter(post_id=post_id).select_related("author")
+
+
+def likes_on(post_id):
+    return Like.objects.filter(post_id=post_id).select_related("user")
@@ -0,0 +1,127 @@
+"""
+Full-text search over Post.content.
+
+The index lives in the database: an FTS5 table kept in sync by triggers
+on SQLite, a FULLTEXT index on MySQL (see migration 0005_post_search).
+Both return a relevance score, and results are paged by keyset on
+(score, id) so deep pages cost the same as the first.
+"""
+
+import base64
+import json
+import math
+import re
+from collections import namedtuple
+from django.db import NotSupportedError, connection
+from rest_framework.exceptions import NotFound, ParseError
+from backend.pagination import KeysetPagination, decode_pk
+
+MAX_TERMS = 10
+
+Hit = namedtuple("Hit", ["id", "score"])
+
+
+def parse_query(request):
+    """Read `?q=` into search terms and the optional `?author=` id."""
+    terms = re.findall(r"\w+", request.query_params.get("q", "").lower())
+    if not terms:
+        raise ParseError("Parâmetro q é obrigatório")
+
+    author_id = request.query_params.get("author")
+    if author_id is not None:
+        try:
+            author_id = int(author_id)
+        except ValueError:
+            raise ParseError("author deve ser um inteiro")
+    return terms[:MAX_TERMS], author_id
+
+
+def _sqlite_match(terms):
+    # Every term must match; the last one as a prefix, for search-as-you-type.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _mysql_match(terms):
+    words = [f"+{term}" for term in terms]
+    words[-1] += "*"
+    return " ".join(words)
+
+
+SQLITE_SQL = """
+    SELECT id, score FROM (
+        SELECT fts.rowid AS id, -bm25(posts_post_fts) AS score
+        FROM posts_post_fts AS fts
+        JOIN posts_post AS post ON post.id = fts.rowid
+        WHERE posts_post_fts MATCH %s {author}
+    ) {after}
+    ORDER BY score DESC, id DESC
+    LIMIT %s
+"""
+
+MYSQL_SQL = """
+    SELECT id, score FROM (
+        SELECT id, MATCH(content) AGAINST (%s IN BOOLEAN MODE) AS score
+        FROM posts_post AS post
+        WHERE MATCH(content) AGAINST (%s IN BOOLEAN MODE) {author}
+    ) AS hits {after}
+    ORDER BY score DESC, id DESC
+    LIMIT %s
+"""
+
+
+def search_posts(terms, author_id=None, position=None, limit=20):
+    """Ranked hits for `terms`, starting after the (score, id) `position`."""
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        sql, params = SQLITE_SQL, [_sqlite_match(terms)]
+    elif vendor == "mysql":
+        match = _mysql_match(terms)
+        sql, params = MYSQL_SQL, [match, match]
+    else:
+        raise NotSupportedError(f"Busca de posts não suportada em {vendor}")
+
+    author = ""
+    if author_id is not None:
+        author = "AND post.author_id = %s"
+        params.append(author_id)
+
+    after = ""
+    if position is not None:
+        after = "WHERE score < %s OR (score = %s AND id < %s)"
+        score, pk = position
+        params += [score, score, pk]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(author=author, after=after), [*params, limit])
+        return [Hit(pk, score) for pk, score in cursor.fetchall()]
+
+
+class SearchPagination(KeysetPagination):
+    """KeysetPagination over (score, id) for ranked search hits."""
+
+    def encode_cursor(self, hit):
+        position = [hit.score, hit.id]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            score, pk = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position = float(score), decode_pk(pk)
+        except (TypeError, ValueError, OverflowError):
+            raise NotFound(self.invalid_cursor_message)
+        if not math.isfinite(position[0]):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def paginate_search(self, terms, request, author_id=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        hits = search_posts(
+            terms, author_id, self.decode_cursor(request), page_size + 1
+        )
+        return self.get_page(hits, page_size)
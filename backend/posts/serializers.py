@@ -1,13 +1,34 @@
 from rest_framework import serializers
 from .models import Post, Like, Comment
 from authentication.serializers import UserSerializer
+from backend.batch import BulkIdsSerializer, id_list
 
 
-class PostSerializer(serializers.ModelSerializer):
+def get_liked_post_ids(user, post_ids):
+    post_ids = list(post_ids)
+    if not post_ids or not user.is_authenticated:
+        return set()
+    return set(
+        Like.objects.filter(user=user, post_id__in=post_ids).values_list(
+            "post_id", flat=True
+        )
+    )
+
+
+async def aget_liked_post_ids(user, post_ids):
+    post_ids = list(post_ids)
+    if not post_ids or not user.is_authenticated:
+        return set()
+    return {
+        post_id
+        async for post_id in Like.objects.filter(
+            user=user, post_id__in=post_ids
+        ).values_list("post_id", flat=True)
+    }
+
+
+class PostPayloadSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
-    likes_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-    is_liked = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
@@ -19,15 +40,15 @@ class PostSerializer(serializers.ModelSerializer):
             "updated_at",
             "likes_count",
             "comments_count",
-            "is_liked",
         ]
-        read_only_fields = ["id", "created_at", "updated_at"]
+        read_only_fields = fields
+
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+class PostSerializer(PostPayloadSerializer):
+    is_liked = serializers.SerializerMethodField()
 
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+    class Meta(PostPayloadSerializer.Meta):
+        fields = PostPayloadSerializer.Meta.fields + ["is_liked"]
 
     def get_is_liked(self, obj):
         request = self.context.get("request")
@@ -64,3 +85,8 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["content"]
+
+
+class BulkLikeSerializer(BulkIdsSerializer):
+    like = id_list()
+    unlike = id_list()
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend.celery import enqueue
+from follows.models import Follow
+from . import tasks
+from .models import Post
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        enqueue(tasks.fan_out_post, instance.id)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        enqueue(tasks.backfill_timeline, instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    enqueue(tasks.prune_timeline, instance.follower_id, instance.following_id)
@@ -0,0 +1,53 @@
+from celery import shared_task
+from django.core.cache import cache
+from backend.celery import RETRY_POLICY, enqueue
+from follows.models import Follow
+from realtime import events
+from . import timeline
+from .cache import invalidate_post
+from .counters import rebuild_counters
+from .models import Post
+
+
+@shared_task(**RETRY_POLICY)
+def fan_out_post(post_id):
+    post = Post.objects.filter(id=post_id).first()
+    if post is None:
+        return
+    follower_ids = timeline.fan_out_post(post)
+    events.post_created(post, follower_ids)
+
+
+@shared_task(**RETRY_POLICY)
+def backfill_timeline(user_id, author_id):
+    # The follow may already be gone by the time the task runs.
+    if Follow.objects.filter(follower_id=user_id, following_id=author_id).exists():
+        timeline.backfill_timeline(user_id, author_id)
+
+
+@shared_task(**RETRY_POLICY)
+def trim_timelines():
+    return timeline.trim_timelines()
+
+
+@shared_task(**RETRY_POLICY)
+def prune_timeline(user_id, author_id):
+    if not Follow.objects.filter(follower_id=user_id, following_id=author_id).exists():
+        timeline.prune_timeline(user_id, author_id)
+
+
+def _counters_pending_key(post_id):
+    return f"posts:counters:pending:{post_id}"
+
+
+def schedule_counter_refresh(post_id):
+    # Bursts of likes on one post collapse into a single pending recount.
+    if cache.add(_counters_pending_key(post_id), True, timeout=60):
+        enqueue(refresh_post_counters, post_id)
+
+
+@shared_task(**RETRY_POLICY)
+def refresh_post_counters(post_id):
+    cache.delete(_counters_pending_key(post_id))
+    rebuild_counters(Post.objects.filter(id=post_id))
+    invalidate_post(post_id)
@@ -4,7 +4,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from authentication.models import Profile
-from .models import Post, Like, Comment
+from .models import Post, Like, Comment, TimelineEntry
 
 User = get_user_model()
 
@@ -66,6 +66,257 @@ class TestPostList:
         assert len(response.data["results"]) == 1
 
 
+@pytest.mark.django_db
+class TestTimeline:
+    def test_new_post_fans_out_to_followers(self, user1, user2):
+        from follows.models import Follow
+
+        Follow.objects.create(follower=user1, following=user2)
+        post = Post.objects.create(author=user2, content="Fan-out")
+        assert TimelineEntry.objects.filter(user=user1, post=post).exists()
+        assert TimelineEntry.objects.filter(user=user2, post=post).exists()
+
+    def test_follow_backfills_timeline(self, authenticated_client, user1, user2):
+        Post.objects.create(author=user2, content="Old post")
+        authenticated_client.post("/api/follows/follow/", {"following": user2.id})
+        response = authenticated_client.get("/api/posts/")
+        assert len(response.data["results"]) == 1
+
+    def test_unfollow_prunes_timeline(self, authenticated_client, user1, user2):
+        from follows.models import Follow
+
+        Follow.objects.create(follower=user1, following=user2)
+        Post.objects.create(author=user2, content="Post from user2")
+        authenticated_client.delete(f"/api/follows/unfollow/{user2.id}/")
+        response = authenticated_client.get("/api/posts/")
+        assert len(response.data["results"]) == 0
+
+    def test_timeline_is_trimmed(self, settings, user1):
+        from .tasks import trim_timelines
+
+        settings.TIMELINE_MAX_LENGTH = 3
+        for i in range(5):
+            Post.objects.create(author=user1, content=f"Post {i}")
+        assert TimelineEntry.objects.filter(user=user1).count() == 5
+
+        trim_timelines.apply()
+        entries = TimelineEntry.objects.filter(user=user1).order_by("-created_at")
+        assert [entry.post.content for entry in entries] == [
+            "Post 4",
+            "Post 3",
+            "Post 2",
+        ]
+
+    def test_trim_only_visits_timelines_with_new_entries(self, settings, user1, user2):
+        from django.core.cache import cache
+        from .timeline import TRIMMED_THROUGH_KEY, trim_timelines
+
+        settings.TIMELINE_MAX_LENGTH = 3
+        for i in range(5):
+            Post.objects.create(author=user1, content=f"Post {i}")
+        assert trim_timelines() == 1
+
+        posts = [
+            Post.objects.create(author=user2, content=f"Old {i}") for i in range(3)
+        ]
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user=user1, post=post, author=user2, created_at=post.created_at
+                )
+                for post in posts
+            ]
+        )
+        # As if a run had already gone past these entries.
+        cache.set(TRIMMED_THROUGH_KEY, TimelineEntry.objects.latest("id").id)
+        Post.objects.create(author=user2, content="New")
+
+        assert trim_timelines() == 1
+        assert TimelineEntry.objects.filter(user=user1).count() == 6
+        assert TimelineEntry.objects.filter(user=user2).count() == 3
+
+    def test_trim_keeps_entries_tied_with_the_cutoff(self, settings, user1):
+        from .timeline import trim_timeline
+
+        settings.TIMELINE_MAX_LENGTH = 3
+        posts = [
+            Post.objects.create(author=user1, content=f"Post {i}") for i in range(5)
+        ]
+        TimelineEntry.objects.filter(user=user1).update(created_at=posts[0].created_at)
+
+        trim_timeline(user1.id)
+        kept = TimelineEntry.objects.filter(user=user1).order_by("-id")
+        assert [entry.post.content for entry in kept] == ["Post 4", "Post 3", "Post 2"]
+
+    def test_fan_out_queries_do_not_grow_with_followers(
+        self, user1, django_assert_max_num_queries
+    ):
+        from follows.models import Follow
+        from .timeline import fan_out_post
+
+        followers = User.objects.bulk_create(
+            [User(username=f"f{i}", email=f"f{i}@example.com") for i in range(50)]
+        )
+        Follow.objects.bulk_create(
+            [Follow(follower=follower, following=user1) for follower in followers]
+        )
+        post = Post.objects.create(author=user1, content="Fan-out")
+        with django_assert_max_num_queries(2):
+            fan_out_post(post)
+        assert TimelineEntry.objects.filter(post=post).count() == 51
+
+    def test_rebuild_timelines_command(self, user1, post):
+        from django.core.management import call_command
+
+        TimelineEntry.objects.all().delete()
+        call_command("rebuild_timelines")
+        assert TimelineEntry.objects.filter(user=user1, post=post).exists()
+
+
+@pytest.mark.django_db
+class TestPostTasks:
+    def test_fan_out_is_idempotent(self, user1, user2):
+        from follows.models import Follow
+        from .tasks import fan_out_post
+
+        Follow.objects.create(follower=user1, following=user2)
+        post = Post.objects.create(author=user2, content="Fan-out")
+        fan_out_post.apply(args=[post.id])
+        assert TimelineEntry.objects.filter(post=post).count() == 2
+
+    def test_fan_out_skips_deleted_post(self, user1):
+        from .tasks import fan_out_post
+
+        fan_out_post.apply(args=[999999])
+        assert not TimelineEntry.objects.filter(user=user1).exists()
+
+    def test_backfill_skips_removed_follow(self, user1, user2):
+        from .tasks import backfill_timeline
+
+        Post.objects.create(author=user2, content="Not followed")
+        backfill_timeline.apply(args=[user1.id, user2.id])
+        assert not TimelineEntry.objects.filter(user=user1).exists()
+
+    def test_refresh_post_counters_recounts(self, post, user1, user2):
+        from .tasks import refresh_post_counters
+
+        Like.objects.create(user=user1, post=post)
+        Like.objects.create(user=user2, post=post)
+        Post.objects.filter(id=post.id).update(likes_count=7)
+        refresh_post_counters.apply(args=[post.id])
+        refresh_post_counters.apply(args=[post.id])
+        post.refresh_from_db()
+        assert post.likes_count == 2
+
+
+@pytest.mark.django_db
+class TestPostListQueries:
+    def _count_queries(self, client, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return len(context.captured_queries)
+
+    @pytest.mark.parametrize(
+        "url", ["/api/posts/", "/api/posts/my-posts/", "/api/posts/user/{user_id}/"]
+    )
+    def test_query_count_does_not_grow_with_page(
+        self, authenticated_client, user1, url
+    ):
+        from authentication.user_cache import get_user
+
+        url = url.format(user_id=user1.id)
+        get_user(user1.id)
+        Post.objects.create(author=user1, content="First")
+        single = self._count_queries(authenticated_client, url)
+
+        for i in range(10):
+            Post.objects.create(author=user1, content=f"Post {i}")
+        assert self._count_queries(authenticated_client, url) == single
+
+    def test_is_liked_resolved_per_page(self, authenticated_client, user1):
+        liked = Post.objects.create(author=user1, content="Liked")
+        Post.objects.create(author=user1, content="Not liked")
+        Like.objects.create(user=user1, post=liked)
+        response = authenticated_client.get("/api/posts/")
+        is_liked = {item["id"]: item["is_liked"] for item in response.data["results"]}
+        assert is_liked[liked.id] is True
+        assert list(is_liked.values()).count(True) == 1
+
+
+@pytest.mark.django_db
+class TestPostCache:
+    def test_detail_is_served_from_cache(self, authenticated_client, post):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        authenticated_client.get(f"/api/posts/{post.id}/")
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(f"/api/posts/{post.id}/")
+        assert response.data["content"] == "Test post content"
+        assert not any("posts_post" in q["sql"] for q in context.captured_queries)
+
+    def test_like_invalidates_payload(self, authenticated_client, post):
+        authenticated_client.get(f"/api/posts/{post.id}/")
+        authenticated_client.post(f"/api/posts/{post.id}/like/")
+        response = authenticated_client.get(f"/api/posts/{post.id}/")
+        assert response.data["likes_count"] == 1
+        assert response.data["is_liked"] is True
+
+    def test_comment_invalidates_payload(self, authenticated_client, post):
+        authenticated_client.get("/api/posts/")
+        authenticated_client.post(
+            f"/api/posts/{post.id}/comments/create/", {"content": "Comment"}
+        )
+        response = authenticated_client.get("/api/posts/")
+        assert response.data["results"][0]["comments_count"] == 1
+
+    def test_update_invalidates_payload(self, authenticated_client, post):
+        authenticated_client.get(f"/api/posts/{post.id}/")
+        authenticated_client.put(
+            f"/api/posts/{post.id}/update/", {"content": "Edited"}, format="json"
+        )
+        response = authenticated_client.get(f"/api/posts/{post.id}/")
+        assert response.data["content"] == "Edited"
+
+    def test_deleted_post_is_not_served(self, authenticated_client, post):
+        authenticated_client.get(f"/api/posts/{post.id}/")
+        authenticated_client.delete(f"/api/posts/{post.id}/delete/")
+        response = authenticated_client.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_write_during_read_is_not_cached(self, post, monkeypatch):
+        from . import cache as post_cache
+        from .serializers import PostPayloadSerializer
+
+        def serialize_then_update(obj):
+            serializer = PostPayloadSerializer(obj)
+            serializer.data
+            # Another request edits the post between the read and the set.
+            Post.objects.filter(id=obj.id).update(content="Edited")
+            post_cache.invalidate_post(obj.id)
+            return serializer
+
+        with monkeypatch.context() as patch:
+            patch.setattr(post_cache, "PostPayloadSerializer", serialize_then_update)
+            assert post_cache.get_payloads([post.id])[post.id]["content"] == (
+                "Test post content"
+            )
+
+        assert post_cache.get_payloads([post.id])[post.id]["content"] == "Edited"
+
+    def test_is_liked_is_per_viewer(self, api_client, post, user1, user2):
+        Like.objects.create(user=user1, post=post)
+        for user, expected in ((user1, True), (user2, False)):
+            token = RefreshToken.for_user(user).access_token
+            api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            response = api_client.get(f"/api/posts/{post.id}/")
+            assert response.data["is_liked"] is expected
+
+
 @pytest.mark.django_db
 class TestPostCreate:
     def test_create_post(self, authenticated_client, user1):
@@ -98,6 +349,50 @@ class TestPostDetail:
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestPostBatch:
+    def test_batch_keeps_request_order(self, authenticated_client, user1, user2):
+        first = Post.objects.create(author=user1, content="First")
+        second = Post.objects.create(author=user2, content="Second")
+        Like.objects.create(user=user1, post=second)
+
+        response = authenticated_client.get(
+            f"/api/posts/batch/?ids={second.id},999,{first.id},{second.id}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert [post["id"] for post in response.data["results"]] == [
+            second.id,
+            first.id,
+        ]
+        assert response.data["results"][0]["is_liked"] is True
+        assert response.data["missing"] == [999]
+
+    def test_batch_query_count_is_constant(self, authenticated_client, user1):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        ids = [
+            Post.objects.create(author=user1, content=f"Post {i}").id for i in range(10)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(
+                f"/api/posts/batch/?ids={','.join(map(str, ids))}"
+            )
+        assert len(response.data["results"]) == 10
+        # user lookup + posts with authors + likes of the viewer
+        assert len(context.captured_queries) == 3
+
+    def test_batch_rejects_too_many_ids(self, authenticated_client, settings):
+        settings.BATCH_MAX_IDS = 2
+        response = authenticated_client.get("/api/posts/batch/?ids=1,2,3")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize("query", ["", "?ids=", "?ids=1,abc"])
+    def test_batch_rejects_invalid_ids(self, authenticated_client, query):
+        response = authenticated_client.get(f"/api/posts/batch/{query}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestPostUpdateDelete:
     def test_update_post(self, authenticated_client, post):
@@ -146,6 +441,31 @@ class TestPostLike:
         assert response.data["liked"] == False
         assert not Like.objects.filter(user=user1, post=post).exists()
 
+    def test_like_updates_counter(self, authenticated_client, post):
+        response = authenticated_client.post(f"/api/posts/{post.id}/like/")
+        assert response.data["likes_count"] == 1
+        post.refresh_from_db()
+        assert post.likes_count == 1
+
+        response = authenticated_client.post(f"/api/posts/{post.id}/like/")
+        assert response.data["likes_count"] == 0
+        post.refresh_from_db()
+        assert post.likes_count == 0
+
+    def test_like_runs_without_auth_queries(self, authenticated_client, post, user1):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from authentication.user_cache import get_user
+
+        get_user(user1.id)
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.post(f"/api/posts/{post.id}/like/")
+        assert not [
+            query
+            for query in context.captured_queries
+            if 'FROM "authentication_user"' in query["sql"]
+        ]
+
     def test_get_likes_list(self, authenticated_client, post, user1):
         Like.objects.create(user=user1, post=post)
         response = authenticated_client.get(f"/api/posts/{post.id}/likes/")
@@ -153,6 +473,43 @@ class TestPostLike:
         assert len(response.data["results"]) == 1
 
 
+@pytest.mark.django_db
+class TestPostBulkLike:
+    def test_bulk_like_and_unlike(self, authenticated_client, user1, user2):
+        first = Post.objects.create(author=user2, content="First")
+        second = Post.objects.create(author=user2, content="Second")
+        third = Post.objects.create(author=user2, content="Third")
+        Like.objects.create(user=user1, post=second)
+        Like.objects.create(user=user1, post=third)
+
+        response = authenticated_client.post(
+            "/api/posts/like/bulk/",
+            {"like": [first.id, second.id, 999], "unlike": [third.id, 998]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["results"] == [
+            {"post_id": first.id, "status": "liked"},
+            {"post_id": second.id, "status": "already_liked"},
+            {"post_id": 999, "status": "not_found"},
+            {"post_id": third.id, "status": "unliked"},
+            {"post_id": 998, "status": "not_found"},
+        ]
+        assert set(
+            Like.objects.filter(user=user1).values_list("post_id", flat=True)
+        ) == {first.id, second.id}
+        first.refresh_from_db()
+        third.refresh_from_db()
+        assert first.likes_count == 1
+        assert third.likes_count == 0
+
+    def test_bulk_like_requires_ids(self, authenticated_client):
+        response = authenticated_client.post(
+            "/api/posts/like/bulk/", {"like": [], "unlike": []}, format="json"
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 class TestComment:
     def test_create_comment(self, authenticated_client, post, user1):
@@ -162,6 +519,29 @@ class TestComment:
         assert response.status_code == status.HTTP_201_CREATED
         assert Comment.objects.filter(author=user1, post=post).exists()
 
+    def test_comment_counter(self, authenticated_client, post):
+        authenticated_client.post(
+            f"/api/posts/{post.id}/comments/create/", {"content": "Test comment"}
+        )
+        post.refresh_from_db()
+        assert post.comments_count == 1
+
+        comment = Comment.objects.get(post=post)
+        authenticated_client.delete(f"/api/posts/comments/{comment.id}/delete/")
+        post.refresh_from_db()
+        assert post.comments_count == 0
+
+    def test_rebuild_post_counters_command(self, post, user1, user2):
+        from django.core.management import call_command
+
+        Like.objects.create(user=user1, post=post)
+        Like.objects.create(user=user2, post=post)
+        Comment.objects.create(author=user1, post=post, content="Comment")
+        call_command("rebuild_post_counters")
+        post.refresh_from_db()
+        assert post.likes_count == 2
+        assert post.comments_count == 1
+
     def test_get_comments_list(self, authenticated_client, post, user1):
         Comment.objects.create(author=user1, post=post, content="Comment 1")
         Comment.objects.create(author=user1, post=post, content="Comment 2")
@@ -212,3 +592,77 @@ class TestUserPosts:
         response = authenticated_client.get("/api/posts/my-posts/")
         assert response.status_code == status.HTTP_200_OK
         assert len(response.data["results"]) == 2
+
+
+@pytest.mark.django_db
+class TestPostSearch:
+    def search(self, client, **params):
+        response = client.get("/api/posts/search/", params)
+        assert response.status_code == status.HTTP_200_OK
+        return [post["id"] for post in response.data["results"]], response.data
+
+    def test_search_ranks_matches(self, authenticated_client, user1):
+        once = Post.objects.create(author=user1, content="Café com leite e pão")
+        twice = Post.objects.create(author=user1, content="Café, café e mais café")
+        Post.objects.create(author=user1, content="Chá gelado")
+
+        ids, _ = self.search(authenticated_client, q="cafe")
+        assert ids == [twice.id, once.id]
+
+    def test_search_requires_every_term(self, authenticated_client, user1):
+        both = Post.objects.create(author=user1, content="Praia no domingo")
+        Post.objects.create(author=user1, content="Praia no sábado")
+
+        ids, _ = self.search(authenticated_client, q="praia dom")
+        assert ids == [both.id]
+
+    def test_search_follows_updates_and_deletes(self, authenticated_client, post):
+        authenticated_client.put(
+            f"/api/posts/{post.id}/update/", {"content": "Novo conteúdo"}
+        )
+        assert self.search(authenticated_client, q="test")[0] == []
+        assert self.search(authenticated_client, q="novo")[0] == [post.id]
+
+        authenticated_client.delete(f"/api/posts/{post.id}/delete/")
+        assert self.search(authenticated_client, q="novo")[0] == []
+
+    def test_search_by_author(self, authenticated_client, user1, user2):
+        Post.objects.create(author=user1, content="Futebol hoje")
+        theirs = Post.objects.create(author=user2, content="Futebol amanhã")
+
+        ids, _ = self.search(authenticated_client, q="futebol", author=user2.id)
+        assert ids == [theirs.id]
+
+    def test_search_pages_by_cursor(self, authenticated_client, user1):
+        posts = [
+            Post.objects.create(author=user1, content=f"Filme {n}") for n in range(5)
+        ]
+
+        url = "/api/posts/search/?q=filme&page_size=2"
+        seen = []
+        while url:
+            response = authenticated_client.get(url)
+            seen += [post["id"] for post in response.data["results"]]
+            url = response.data["next"]
+        assert sorted(seen) == sorted(post.id for post in posts)
+        assert len(seen) == 5
+
+    @pytest.mark.parametrize(
+        "position", ["[1e400, 1]", "[1.0, 1e400]", "[10e400, 1]", '["x", 1]']
+    )
+    def test_search_rejects_malformed_cursor(self, authenticated_client, position):
+        import base64
+
+        cursor = base64.urlsafe_b64encode(position.encode()).decode()
+        response = authenticated_client.get(
+            "/api/posts/search/", {"q": "filme", "cursor": cursor}
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_search_requires_query(self, authenticated_client):
+        response = authenticated_client.get("/api/posts/search/", {"q": " ?! "})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_search_unauthorized(self, api_client):
+        response = api_client.get("/api/posts/search/", {"q": "oi"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from follows import graph
+from .models import Post, TimelineEntry
+
+
+def _entry(user_id, post):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post.id,
+        author_id=post.author_id,
+        created_at=post.created_at,
+    )
+
+
+def trim_timeline(user_id):
+    max_length = settings.TIMELINE_MAX_LENGTH
+    cutoff = (
+        TimelineEntry.objects.filter(user_id=user_id)
+        .order_by("-created_at", "-id")
+        .values_list("created_at", "id")[max_length : max_length + 1]
+        .first()
+    )
+    if cutoff is not None:
+        # Same (created_at, id) order as the feed, so entries tied with
+        # the cutoff inside the kept window stay.
+        created_at, entry_id = cutoff
+        TimelineEntry.objects.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lte=entry_id),
+            user_id=user_id,
+        ).delete()
+
+
+# Id of the last TimelineEntry seen by trim_timelines.
+TRIMMED_THROUGH_KEY = "posts:timeline:trimmed_through"
+TRIM_BATCH_SIZE = 500
+
+
+def trim_timelines():
+    """Trim the timelines that received entries since the last run and are
+    longer than TIMELINE_MAX_LENGTH; returns how many were trimmed.
+
+    New entries are found by primary key range, so a run reads only the
+    rows added since the previous one. Without a previous run in the cache
+    (first run, or the key was evicted) the range starts at 0.
+    """
+    last_id = TimelineEntry.objects.order_by("-id").values_list("id", flat=True).first()
+    if last_id is None:
+        return 0
+    since = cache.get(TRIMMED_THROUGH_KEY, 0)
+    recipients = list(
+        TimelineEntry.objects.filter(id__gt=since, id__lte=last_id)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    total = 0
+    for start in range(0, len(recipients), TRIM_BATCH_SIZE):
+        over = (
+            TimelineEntry.objects.filter(
+                user_id__in=recipients[start : start + TRIM_BATCH_SIZE]
+            )
+            .values("user_id")
+            .annotate(entries=Count("id"))
+            .filter(entries__gt=settings.TIMELINE_MAX_LENGTH)
+            .values_list("user_id", flat=True)
+        )
+        for user_id in over:
+            trim_timeline(user_id)
+            total += 1
+    cache.set(TRIMMED_THROUGH_KEY, last_id, None)
+    return total
+
+
+def fan_out_post(post):
+    # Timelines grow past TIMELINE_MAX_LENGTH until the periodic
+    # trim_timelines; trimming every recipient here would cost two
+    # queries per follower.
+    follower_ids = list(graph.follower_ids(post.author_id))
+    recipients = [post.author_id, *follower_ids]
+
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for user_id in recipients],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    return follower_ids
+
+
+def backfill_timeline(user_id, author_id):
+    posts = Post.objects.filter(author_id=author_id).order_by("-created_at")[
+        : settings.TIMELINE_MAX_LENGTH
+    ]
+    TimelineEntry.objects.bulk_create(
+        [_entry(user_id, post) for post in posts],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    trim_timeline(user_id)
+
+
+def prune_timeline(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild_timeline(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    author_ids = graph.following_ids(user_id)
+    for author_id in [user_id, *author_ids]:
+        backfill_timeline(user_id, author_id)
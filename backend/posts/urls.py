@@ -1,15 +1,27 @@
 from django.urls import path
-from . import views
+from backend.async_api import read_view
+from . import async_views, views
 
 urlpatterns = [
-    path("", views.post_list, name="post_list"),
+    path("", read_view("post_list", views, async_views), name="post_list"),
     path("create/", views.post_create, name="post_create"),
-    path("<int:post_id>/", views.post_detail, name="post_detail"),
+    path("batch/", read_view("post_batch", views, async_views), name="post_batch"),
+    path("search/", views.post_search, name="post_search"),
+    path(
+        "<int:post_id>/",
+        read_view("post_detail", views, async_views),
+        name="post_detail",
+    ),
     path("<int:post_id>/update/", views.post_update_delete, name="post_update"),
     path("<int:post_id>/delete/", views.post_update_delete, name="post_delete"),
     path("<int:post_id>/like/", views.post_like, name="post_like"),
+    path("like/bulk/", views.post_bulk_like, name="post_bulk_like"),
     path("<int:post_id>/likes/", views.post_likes, name="post_likes"),
-    path("<int:post_id>/comments/", views.comment_list, name="comment_list"),
+    path(
+        "<int:post_id>/comments/",
+        read_view("comment_list", views, async_views),
+        name="comment_list",
+    ),
     path("<int:post_id>/comments/create/", views.comment_create, name="comment_create"),
     path(
         "comments/<int:comment_id>/update/",
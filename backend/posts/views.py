@@ -2,38 +2,39 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from authentication.counters import adjust_posts_count
+from backend.batch import bulk_status, get_batch_data, parse_ids
+from backend.budgets import query_budget
+from backend.pagination import get_paginator
+from realtime import events
+from . import queries
+from .cache import invalidate_post, render_posts
 from .models import Post, Like, Comment
+from .search import SearchPagination, parse_query
 from .serializers import (
     PostSerializer,
     PostCreateSerializer,
     LikeSerializer,
     CommentSerializer,
     CommentCreateSerializer,
+    BulkLikeSerializer,
 )
+from .tasks import schedule_counter_refresh
 
 
+@query_budget(4)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def post_list(request):
-    following_users = request.user.following.values_list("following", flat=True)
+    entries = queries.timeline_of(request.user)
 
-    posts = (
-        Post.objects.filter(Q(author__in=following_users) | Q(author=request.user))
-        .select_related("author")
-        .prefetch_related("likes", "comments")
-        .order_by("-created_at")
-    )
-
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
-    paginated_posts = paginator.paginate_queryset(posts, request)
-    serializer = PostSerializer(
-        paginated_posts, many=True, context={"request": request}
-    )
-    return paginator.get_paginated_response(serializer.data)
+    paginator = get_paginator(request)
+    paginated_entries = paginator.paginate_queryset(entries, request)
+    posts = render_posts([entry.post_id for entry in paginated_entries], request)
+    return paginator.get_paginated_response(posts)
 
 
 @api_view(["POST"])
@@ -41,7 +42,9 @@ def post_list(request):
 def post_create(request):
     serializer = PostCreateSerializer(data=request.data)
     if serializer.is_valid():
-        post = serializer.save(author=request.user)
+        with transaction.atomic():
+            post = serializer.save(author=request.user)
+            adjust_posts_count(request.user.id, 1)
         return Response(
             {
                 "message": "Post criado com sucesso",
@@ -55,9 +58,32 @@ def post_create(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    serializer = PostSerializer(post, context={"request": request})
-    return Response(serializer.data)
+    posts = render_posts([post_id], request)
+    if not posts:
+        raise Http404("No Post matches the given query.")
+    return Response(posts[0])
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def post_batch(request):
+    post_ids = parse_ids(request)
+    posts = render_posts(post_ids, request)
+    return Response(get_batch_data(post_ids, {post["id"]: post for post in posts}))
+
+
+@query_budget(4)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def post_search(request):
+    terms, author_id = parse_query(request)
+
+    paginator = SearchPagination()
+    hits = paginator.paginate_search(terms, request, author_id)
+    return paginator.get_paginated_response(
+        render_posts([hit.id for hit in hits], request)
+    )
 
 
 @api_view(["PUT", "DELETE"])
@@ -75,6 +101,7 @@ def post_update_delete(request, post_id):
         serializer = PostCreateSerializer(post, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate_post(post.id)
             return Response(
                 {
                     "message": "Post atualizado com sucesso",
@@ -84,7 +111,10 @@ def post_update_delete(request, post_id):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     elif request.method == "DELETE":
-        post.delete()
+        with transaction.atomic():
+            post.delete()
+            adjust_posts_count(post.author_id, -1)
+        invalidate_post(post_id)
         return Response(
             {"message": "Post deletado com sucesso"}, status=status.HTTP_200_OK
         )
@@ -96,36 +126,90 @@ def post_like(request, post_id):
     post = get_object_or_404(Post, id=post_id)
 
     like, created = Like.objects.get_or_create(user=request.user, post=post)
+    if created:
+        likes_count = post.likes_count + 1
+    else:
+        deleted, _ = Like.objects.filter(id=like.id).delete()
+        likes_count = max(post.likes_count - deleted, 0)
+    schedule_counter_refresh(post.id)
 
     if created:
+        events.post_liked(post, request.user, likes_count)
         return Response(
             {
                 "message": "Post curtido com sucesso",
                 "liked": True,
-                "likes_count": post.likes.count(),
+                "likes_count": likes_count,
             },
             status=status.HTTP_201_CREATED,
         )
     else:
-        like.delete()
         return Response(
             {
                 "message": "Like removido com sucesso",
                 "liked": False,
-                "likes_count": post.likes.count(),
+                "likes_count": likes_count,
             },
             status=status.HTTP_200_OK,
         )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def post_bulk_like(request):
+    serializer = BulkLikeSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    to_like = serializer.validated_data["like"]
+    to_unlike = serializer.validated_data["unlike"]
+
+    with transaction.atomic():
+        posts = Post.objects.filter(id__in=to_like + to_unlike).only(
+            "id", "author_id", "likes_count"
+        )
+        posts = {post.id: post for post in posts}
+        liked = set(
+            Like.objects.filter(user=request.user, post_id__in=posts).values_list(
+                "post_id", flat=True
+            )
+        )
+        new_likes = [pk for pk in to_like if pk in posts and pk not in liked]
+        removed = [pk for pk in to_unlike if pk in liked]
+        Like.objects.bulk_create(
+            [Like(user=request.user, post_id=pk) for pk in new_likes],
+            ignore_conflicts=True,
+        )
+        Like.objects.filter(user=request.user, post_id__in=removed).delete()
+
+    for pk in new_likes + removed:
+        schedule_counter_refresh(pk)
+    for pk in new_likes:
+        events.post_liked(posts[pk], request.user, posts[pk].likes_count + 1)
+
+    results = [
+        {
+            "post_id": pk,
+            "status": bulk_status(pk, posts, new_likes, "liked", "already_liked"),
+        }
+        for pk in to_like
+    ] + [
+        {
+            "post_id": pk,
+            "status": bulk_status(pk, posts, removed, "unliked", "not_liked"),
+        }
+        for pk in to_unlike
+    ]
+    return Response({"results": results})
+
+
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def post_likes(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    likes = Like.objects.filter(post=post).select_related("user")
+    likes = queries.likes_on(post.id)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_likes = paginator.paginate_queryset(likes, request)
     serializer = LikeSerializer(paginated_likes, many=True)
     return paginator.get_paginated_response(serializer.data)
@@ -139,6 +223,8 @@ def comment_create(request, post_id):
 
     if serializer.is_valid():
         comment = serializer.save(author=request.user, post=post)
+        schedule_counter_refresh(post.id)
+        events.post_commented(post, comment)
         return Response(
             {
                 "message": "Comentário criado com sucesso",
@@ -149,18 +235,14 @@ def comment_create(request, post_id):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def comment_list(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    comments = (
-        Comment.objects.filter(post=post)
-        .select_related("author")
-        .order_by("-created_at")
-    )
+    comments = queries.comments_on(post.id)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_comments = paginator.paginate_queryset(comments, request)
     serializer = CommentSerializer(paginated_comments, many=True)
     return paginator.get_paginated_response(serializer.data)
@@ -181,6 +263,7 @@ def comment_update_delete(request, comment_id):
         serializer = CommentCreateSerializer(comment, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            invalidate_post(comment.post_id)
             return Response(
                 {
                     "message": "Comentário atualizado com sucesso",
@@ -191,47 +274,36 @@ def comment_update_delete(request, comment_id):
 
     elif request.method == "DELETE":
         comment.delete()
+        schedule_counter_refresh(comment.post_id)
         return Response(
             {"message": "Comentário deletado com sucesso"}, status=status.HTTP_200_OK
         )
 
 
+@query_budget(5)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def user_posts(request, user_id):
     from authentication.models import User
 
     user = get_object_or_404(User, id=user_id)
-    posts = (
-        Post.objects.filter(author=user)
-        .select_related("author")
-        .prefetch_related("likes", "comments")
-        .order_by("-created_at")
-    )
+    posts = queries.posts_by(user)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_posts = paginator.paginate_queryset(posts, request)
-    serializer = PostSerializer(
-        paginated_posts, many=True, context={"request": request}
+    return paginator.get_paginated_response(
+        render_posts([post.id for post in paginated_posts], request)
     )
-    return paginator.get_paginated_response(serializer.data)
 
 
+@query_budget(4)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_posts(request):
-    posts = (
-        Post.objects.filter(author=request.user)
-        .select_related("author")
-        .prefetch_related("likes", "comments")
-        .order_by("-created_at")
-    )
+    posts = queries.posts_by(request.user)
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
+    paginator = get_paginator(request)
     paginated_posts = paginator.paginate_queryset(posts, request)
-    serializer = PostSerializer(
-        paginated_posts, many=True, context={"request": request}
+    return paginator.get_paginated_response(
+        render_posts([post.id for post in paginated_posts], request)
     )
-    return paginator.get_paginated_response(serializer.data)
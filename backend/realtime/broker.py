@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+
+class InProcessBroker:
+    """Delivers events to sockets served by this process only (dev and tests)."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event):
+        self.publish_many([(channel, event)])
+
+    def publish_many(self, messages):
+        for channel, event in messages:
+            with self._lock:
+                subscriptions = list(self._subscribers.get(channel, ()))
+            payload = json.loads(json.dumps(event, cls=DjangoJSONEncoder))
+            for subscription in subscriptions:
+                subscription.deliver(payload)
+
+    async def subscribe(self, channels):
+        subscription = InProcessSubscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers[channel].discard(subscription)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class InProcessSubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            # The subscriber's event loop is already closed.
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class RedisBroker:
+    """Redis pub/sub, so events reach sockets held by any uvicorn worker."""
+
+    def __init__(self, url=None):
+        self.url = url or settings.REDIS_URL
+        self.client = redis.Redis.from_url(self.url)
+
+    def publish(self, channel, event):
+        self.publish_many([(channel, event)])
+
+    def publish_many(self, messages):
+        with self.client.pipeline(transaction=False) as pipeline:
+            for channel, event in messages:
+                pipeline.publish(channel, json.dumps(event, cls=DjangoJSONEncoder))
+            pipeline.execute()
+
+    async def subscribe(self, channels):
+        subscription = RedisSubscription(self.url)
+        await subscription.pubsub.subscribe(*channels)
+        return subscription
+
+
+class RedisSubscription:
+    def __init__(self, url):
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            message = await self.pubsub.get_message(timeout=None)
+            if message is not None:
+                return json.loads(message["data"])
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.REALTIME_BROKER)()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+from contextlib import suppress
+from http.cookies import SimpleCookie
+from rest_framework.exceptions import AuthenticationFailed
+from authentication.backends import AsyncJWTAuthentication
+from .broker import get_broker
+from .events import user_channel
+
+authenticator = AsyncJWTAuthentication()
+
+# Close codes in the 4000-4999 range are reserved for applications.
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+
+def get_raw_token(scope):
+    # No query-string token: servers log WebSocket paths with their query
+    # string, which would put access tokens in the access logs.
+    headers = dict(scope.get("headers", []))
+    if b"cookie" in headers:
+        cookies = SimpleCookie(headers[b"cookie"].decode())
+        if "accessToken" in cookies:
+            return cookies["accessToken"].value
+
+    if b"authorization" in headers:
+        return authenticator.get_raw_token(headers[b"authorization"])
+    return None
+
+
+async def authenticate(scope):
+    try:
+        raw_token = get_raw_token(scope)
+        if raw_token is None:
+            return None
+        validated_token = authenticator.get_validated_token(raw_token)
+        return await authenticator.aget_user(validated_token)
+    except AuthenticationFailed:
+        return None
+
+
+async def events_socket(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    user = await authenticate(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+        return
+
+    subscription = await get_broker().subscribe([user_channel(user.id)])
+    await send({"type": "websocket.accept"})
+
+    async def forward_events():
+        async for event in subscription:
+            await send({"type": "websocket.send", "text": json.dumps(event)})
+
+    forwarder = asyncio.create_task(forward_events())
+    try:
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") == "ping":
+                await send({"type": "websocket.send", "text": '{"type": "pong"}'})
+    finally:
+        forwarder.cancel()
+        with suppress(asyncio.CancelledError):
+            await forwarder
+        await subscription.close()
+
+
+routes = {
+    "/ws/events/": events_socket,
+}
+
+
+async def websocket_application(scope, receive, send):
+    handler = routes.get(scope["path"])
+    if handler is None:
+        await receive()
+        await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        return
+    await handler(scope, receive, send)
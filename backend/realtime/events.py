@@ -0,0 +1,59 @@
+import logging
+from .broker import get_broker
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f"pingme:user:{user_id}"
+
+
+def publish_to_users(user_ids, event):
+    messages = [(user_channel(user_id), event) for user_id in user_ids]
+    if not messages:
+        return
+    try:
+        get_broker().publish_many(messages)
+    except Exception:
+        # Push is best effort: clients still see the change on their next read.
+        logger.warning("Falha ao publicar evento %s", event["type"], exc_info=True)
+
+
+def post_created(post, follower_ids):
+    publish_to_users(
+        follower_ids,
+        {
+            "type": "post.created",
+            "post_id": post.id,
+            "author_id": post.author_id,
+            "created_at": post.created_at,
+        },
+    )
+
+
+def post_liked(post, user, likes_count):
+    if post.author_id == user.id:
+        return
+    publish_to_users(
+        [post.author_id],
+        {
+            "type": "post.liked",
+            "post_id": post.id,
+            "user_id": user.id,
+            "likes_count": likes_count,
+        },
+    )
+
+
+def post_commented(post, comment):
+    if post.author_id == comment.author_id:
+        return
+    publish_to_users(
+        [post.author_id],
+        {
+            "type": "post.commented",
+            "post_id": post.id,
+            "comment_id": comment.id,
+            "user_id": comment.author_id,
+        },
+    )
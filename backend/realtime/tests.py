@@ -0,0 +1,178 @@
+import json
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.models import Profile
+from follows.models import Follow
+from posts.models import Post
+from .consumers import websocket_application
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user1():
+    user = User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass123"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+@pytest.fixture
+def user2():
+    user = User.objects.create_user(
+        username="user2", email="user2@example.com", password="pass123"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+def access_token(user):
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def auth_cookie(token):
+    return (b"cookie", f"accessToken={token}".encode())
+
+
+def socket(path="/ws/events/", query_string=b"", headers=()):
+    return ApplicationCommunicator(
+        websocket_application,
+        {
+            "type": "websocket",
+            "path": path,
+            "query_string": query_string,
+            "headers": list(headers),
+        },
+    )
+
+
+async def connect(communicator):
+    await communicator.send_input({"type": "websocket.connect"})
+    return await communicator.receive_output(timeout=5)
+
+
+async def receive_event(communicator):
+    message = await communicator.receive_output(timeout=5)
+    return json.loads(message["text"])
+
+
+async def disconnect(communicator):
+    await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+    await communicator.wait(timeout=5)
+
+
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token(user)}")
+    return client
+
+
+@pytest.mark.django_db
+class TestEventsSocket:
+    def test_rejects_anonymous_connection(self):
+        async def scenario():
+            message = await connect(socket())
+            assert message == {"type": "websocket.close", "code": 4401}
+
+        async_to_sync(scenario)()
+
+    def test_rejects_query_string_token(self, user1):
+        token = access_token(user1)
+
+        async def scenario():
+            message = await connect(socket(query_string=f"token={token}".encode()))
+            assert message == {"type": "websocket.close", "code": 4401}
+
+        async_to_sync(scenario)()
+
+    def test_rejects_malformed_authorization_header(self):
+        async def scenario():
+            communicator = socket(headers=[(b"authorization", b"Bearer a b")])
+            message = await connect(communicator)
+            assert message == {"type": "websocket.close", "code": 4401}
+
+        async_to_sync(scenario)()
+
+    def test_accepts_authorization_header(self, user1):
+        header = f"Bearer {access_token(user1)}".encode()
+
+        async def scenario():
+            communicator = socket(headers=[(b"authorization", header)])
+            assert (await connect(communicator))["type"] == "websocket.accept"
+            await disconnect(communicator)
+
+        async_to_sync(scenario)()
+
+    def test_rejects_unknown_path(self, user1):
+        token = access_token(user1)
+
+        async def scenario():
+            communicator = socket("/ws/unknown/", headers=[auth_cookie(token)])
+            message = await connect(communicator)
+            assert message == {"type": "websocket.close", "code": 4404}
+
+        async_to_sync(scenario)()
+
+    def test_follower_receives_new_posts(self, user1, user2):
+        Follow.objects.create(follower=user1, following=user2)
+        token = access_token(user1)
+
+        async def scenario():
+            communicator = socket(headers=[auth_cookie(token)])
+            assert (await connect(communicator))["type"] == "websocket.accept"
+
+            post = await sync_to_async(Post.objects.create)(author=user2, content="Hi")
+            event = await receive_event(communicator)
+            assert event["type"] == "post.created"
+            assert event["post_id"] == post.id
+            assert event["author_id"] == user2.id
+            await disconnect(communicator)
+
+        async_to_sync(scenario)()
+
+    def test_author_receives_likes_and_comments(self, user1, user2):
+        post = Post.objects.create(author=user1, content="My post")
+        cookie = f"accessToken={access_token(user1)}".encode()
+        client = api_client(user2)
+
+        async def scenario():
+            communicator = socket(headers=[(b"cookie", cookie)])
+            assert (await connect(communicator))["type"] == "websocket.accept"
+
+            await sync_to_async(client.post)(f"/api/posts/{post.id}/like/")
+            event = await receive_event(communicator)
+            assert event == {
+                "type": "post.liked",
+                "post_id": post.id,
+                "user_id": user2.id,
+                "likes_count": 1,
+            }
+
+            await sync_to_async(client.post)(
+                f"/api/posts/{post.id}/comments/create/", {"content": "Nice"}
+            )
+            event = await receive_event(communicator)
+            assert event["type"] == "post.commented"
+            assert event["user_id"] == user2.id
+            await disconnect(communicator)
+
+        async_to_sync(scenario)()
+
+    def test_own_actions_are_not_pushed(self, user1):
+        post = Post.objects.create(author=user1, content="My post")
+        token = access_token(user1)
+        client = api_client(user1)
+
+        async def scenario():
+            communicator = socket(headers=[auth_cookie(token)])
+            await connect(communicator)
+            await sync_to_async(client.post)(f"/api/posts/{post.id}/like/")
+            assert await communicator.receive_nothing(timeout=0.2)
+            await disconnect(communicator)
+
+        async_to_sync(scenario)()
@@ -0,0 +1,107 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication import purge
+from authentication.models import AccountDeletion, Profile, User
+from follows.models import Follow
+from posts.models import Comment, Like, Post, TimelineEntry
+
+
+@pytest.fixture
+def accounts():
+    users = [
+        User.objects.create_user(
+            username=f"user{i}", email=f"user{i}@example.com", password="pass12345"
+        )
+        for i in range(3)
+    ]
+    for user in users:
+        Profile.objects.create(user=user)
+    doomed, friend, other = users
+
+    Follow.objects.create(follower=doomed, following=friend)
+    Follow.objects.create(follower=friend, following=doomed)
+    Follow.objects.create(follower=other, following=doomed)
+    for n in range(3):
+        Post.objects.create(author=doomed, content=f"Post {n}")
+    friend_post = Post.objects.create(author=friend, content="Friend post")
+
+    Like.objects.create(user=doomed, post=friend_post)
+    Comment.objects.create(author=doomed, post=friend_post, content="Oi")
+    for post in Post.objects.filter(author=doomed):
+        Like.objects.create(user=friend, post=post)
+        Comment.objects.create(author=other, post=post, content="Legal")
+    return doomed, friend, other, friend_post
+
+
+@pytest.mark.django_db
+def test_delete_account_purges_everything_in_batches(accounts, settings):
+    doomed, friend, other, friend_post = accounts
+    settings.ACCOUNT_PURGE_BATCH_SIZE = 2
+    client = APIClient()
+    refresh = RefreshToken.for_user(doomed)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+    response = client.delete("/api/auth/users/me/delete/")
+    assert response.status_code == 200
+
+    assert not User.objects.filter(id=doomed.id).exists()
+    assert not Post.objects.filter(author_id=doomed.id).exists()
+    assert not Follow.objects.filter(follower_id=doomed.id).exists()
+    assert not Follow.objects.filter(following_id=doomed.id).exists()
+    assert not TimelineEntry.objects.filter(author_id=doomed.id).exists()
+    assert not Profile.objects.filter(user_id=doomed.id).exists()
+    assert Comment.objects.filter(author=other).count() == 0
+
+    friend_post.refresh_from_db()
+    assert (friend_post.likes_count, friend_post.comments_count) == (0, 0)
+    assert User.objects.filter(id__in=[friend.id, other.id]).count() == 2
+
+    deletion = AccountDeletion.objects.get(user_id=doomed.id)
+    assert deletion.stage == "done"
+    assert deletion.finished_at is not None
+    assert deletion.deleted["posts"] == 3
+    assert deletion.deleted["followers"] == 2
+
+
+@pytest.mark.django_db
+def test_interrupted_purge_resumes(accounts, settings, monkeypatch):
+    doomed = accounts[0]
+    settings.ACCOUNT_PURGE_BATCH_SIZE = 1
+    User.objects.filter(id=doomed.id).update(is_active=False)
+    deletion = AccountDeletion.objects.create(user_id=doomed.id)
+
+    def crash(batch):
+        raise RuntimeError("worker lost")
+
+    monkeypatch.setattr(purge, "_delete_posts", crash)
+    with pytest.raises(RuntimeError):
+        purge.purge_account(deletion, settings.ACCOUNT_PURGE_BATCH_SIZE)
+    monkeypatch.undo()
+
+    deletion.refresh_from_db()
+    assert deletion.stage == "post_timelines"
+    assert deletion.finished_at is None
+    assert not Like.objects.filter(user_id=doomed.id).exists()
+    assert Post.objects.filter(author_id=doomed.id).count() == 3
+
+    call_command("resume_account_deletions")
+
+    deletion.refresh_from_db()
+    assert deletion.finished_at is not None
+    assert deletion.deleted["likes"] == 1
+    assert deletion.deleted["posts"] == 3
+    assert not User.objects.filter(id=doomed.id).exists()
+
+
+@pytest.mark.django_db
+def test_purge_skips_reactivated_accounts(accounts):
+    from authentication.tasks import delete_account
+
+    doomed = accounts[0]
+    AccountDeletion.objects.create(user_id=doomed.id)
+    delete_account.apply(args=[doomed.id])
+
+    assert Post.objects.filter(author=doomed).count() == 3
+    assert AccountDeletion.objects.get(user_id=doomed.id).finished_at is None
@@ -0,0 +1,115 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication import async_views as auth_async_views
+from authentication import views as auth_views
+from authentication.models import Profile
+from follows import async_views as follows_async_views
+from follows import views as follows_views
+from follows.models import Follow
+from posts import async_views as posts_async_views
+from posts import views as posts_views
+from posts.models import Post, Comment, Like
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user1():
+    user = User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass123"
+    )
+    Profile.objects.create(user=user, bio="Bio")
+    return user
+
+
+@pytest.fixture
+def user2():
+    user = User.objects.create_user(
+        username="user2", email="user2@example.com", password="pass123"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+@pytest.fixture
+def data(user1, user2):
+    Follow.objects.create(follower=user2, following=user1)
+    Follow.objects.create(follower=user1, following=user2)
+    post = Post.objects.create(author=user2, content="Post")
+    Post.objects.create(author=user1, content="Own post")
+    Like.objects.create(user=user1, post=post)
+    Comment.objects.create(author=user1, post=post, content="Comment")
+    return post
+
+
+def call(view, user, path, **kwargs):
+    request = APIRequestFactory().get(path)
+    token = RefreshToken.for_user(user).access_token
+    request.META["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    response = view(request, **kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+@pytest.mark.django_db
+class TestAsyncViewParity:
+    @pytest.mark.parametrize(
+        "sync_view, async_view, path, kwargs",
+        [
+            (posts_views.post_list, posts_async_views.post_list, "/", {}),
+            (posts_views.post_list, posts_async_views.post_list, "/?page=1", {}),
+            (posts_views.post_detail, posts_async_views.post_detail, "/", "post"),
+            (posts_views.comment_list, posts_async_views.comment_list, "/", "post"),
+            (follows_views.my_followers, follows_async_views.my_followers, "/", {}),
+            (follows_views.my_following, follows_async_views.my_following, "/", {}),
+            (auth_views.profile_detail, auth_async_views.profile_detail, "/", "user"),
+            (
+                posts_views.post_batch,
+                posts_async_views.post_batch,
+                "/?ids={post},0",
+                {},
+            ),
+            (auth_views.user_batch, auth_async_views.user_batch, "/?ids={user},0", {}),
+        ],
+    )
+    def test_same_payload(self, user1, data, sync_view, async_view, path, kwargs):
+        if kwargs == "post":
+            kwargs = {"post_id": data.id}
+        elif kwargs == "user":
+            kwargs = {"user_id": user1.id}
+        path = path.format(post=data.id, user=user1.id)
+
+        expected = call(sync_view, user1, path, **kwargs)
+        actual = call(async_to_sync(async_view), user1, path, **kwargs)
+        assert actual.status_code == expected.status_code == status.HTTP_200_OK
+        assert actual.content == expected.content
+
+    def test_not_found(self, user1):
+        response = call(
+            async_to_sync(posts_async_views.comment_list), user1, "/", post_id=999
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {"detail": "No Post matches the given query."}
+
+
+@pytest.mark.django_db
+class TestAsyncViewErrors:
+    def test_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        response = client.get("/api/posts/")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.data["code"] == "token_not_valid"
+        assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    def test_method_not_allowed(self, user1):
+        client = APIClient()
+        refresh = RefreshToken.for_user(user1)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        response = client.post("/api/posts/")
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
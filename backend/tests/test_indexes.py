@@ -0,0 +1,48 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from backend.pagination import KeysetPagination
+from follows import queries as follow_queries
+from posts import queries
+from posts.models import Post
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass123"
+    )
+
+
+def assert_uses_index(queryset, index_name):
+    paginator = KeysetPagination()
+    for position in (None, (timezone.now(), 1)):
+        plan = paginator.filter_queryset(queryset, position)[:21].explain()
+        assert index_name in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+        assert "filesort" not in plan.lower(), plan
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    def test_post_list(self, user):
+        assert_uses_index(queries.timeline_of(user), "posts_timeline_user_recent")
+
+    def test_user_posts(self, user):
+        assert_uses_index(queries.posts_by(user), "posts_post_author_recent")
+
+    def test_comment_list(self, user):
+        post = Post.objects.create(author=user, content="Post")
+        assert_uses_index(queries.comments_on(post.id), "posts_comment_post_recent")
+
+    def test_post_likes(self, user):
+        post = Post.objects.create(author=user, content="Post")
+        assert_uses_index(queries.likes_on(post.id), "posts_like_post_recent")
+
+    def test_my_followers(self, user):
+        assert_uses_index(follow_queries.followers_of(user), "follows_following_recent")
+
+    def test_my_following(self, user):
+        assert_uses_index(follow_queries.followed_by(user), "follows_follower_recent")
@@ -0,0 +1,172 @@
+import os
+import subprocess
+import sys
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.models import Profile, User
+from posts.models import Post
+
+
+@pytest.fixture
+def user():
+    user = User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass12345"
+    )
+    Profile.objects.create(user=user)
+    Post.objects.create(author=user, content="Oi")
+    return user
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    refresh = RefreshToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def scrape(settings):
+    settings.METRICS_TOKEN = "segredo"
+    response = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer segredo")
+    assert response.status_code == 200
+    return {
+        (family.name, sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.content.decode())
+        for sample in family.samples
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "path, view",
+    [
+        ("/api/posts/", "post_list"),
+        ("/api/posts/my-posts/", "my_posts"),
+        ("/api/follows/my-following/", "my_following"),
+        ("/api/auth/profile/", "profile"),
+    ],
+)
+def test_requests_are_recorded_per_url_name(client, path, view):
+    count = sample("http_requests_total", view=view, method="GET", status="200")
+    latency = sample("http_request_duration_seconds_count", view=view, method="GET")
+    queries = sample("http_request_db_queries_sum", view=view)
+
+    assert client.get(path).status_code == 200
+
+    assert (
+        sample("http_requests_total", view=view, method="GET", status="200")
+        == count + 1
+    )
+    assert (
+        sample("http_request_duration_seconds_count", view=view, method="GET")
+        == latency + 1
+    )
+    assert sample("http_request_db_queries_sum", view=view) > queries
+
+
+@pytest.mark.django_db
+def test_status_codes_and_unmatched_paths(client):
+    before = sample(
+        "http_requests_total", view="post_detail", method="GET", status="404"
+    )
+    unmatched = sample(
+        "http_requests_total", view="unmatched", method="GET", status="404"
+    )
+
+    assert client.get("/api/posts/999999/").status_code == 404
+    assert client.get("/nao-existe/").status_code == 404
+
+    assert (
+        sample("http_requests_total", view="post_detail", method="GET", status="404")
+        == before + 1
+    )
+    assert (
+        sample("http_requests_total", view="unmatched", method="GET", status="404")
+        == unmatched + 1
+    )
+
+
+def test_cache_hits_and_misses_are_counted_by_prefix():
+    hits = sample("cache_requests_total", cache="auth:user", result="hit")
+    misses = sample("cache_requests_total", cache="auth:user", result="miss")
+
+    assert cache.get("auth:user:1") is None
+    cache.set("auth:user:1", {"id": 1})
+    assert cache.get("auth:user:1") == {"id": 1}
+    assert cache.get_many(["auth:user:1", "auth:user:2"]) == {"auth:user:1": {"id": 1}}
+
+    assert sample("cache_requests_total", cache="auth:user", result="hit") == hits + 2
+    assert (
+        sample("cache_requests_total", cache="auth:user", result="miss") == misses + 2
+    )
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_exposes_the_registry(settings, client):
+    client.get("/api/posts/")
+
+    metrics = scrape(settings)
+
+    key = (
+        "http_requests",
+        "http_requests_total",
+        (("method", "GET"), ("status", "200"), ("view", "post_list")),
+    )
+    assert metrics[key] >= 1
+    assert any(name == "http_request_duration_seconds" for name, _, _ in metrics)
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_requires_the_token(settings):
+    settings.METRICS_TOKEN = ""
+    assert APIClient().get("/metrics").status_code == 404
+
+    settings.METRICS_TOKEN = "segredo"
+    response = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer errado")
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Bearer"
+    assert APIClient().get("/metrics").status_code == 401
+
+
+WORKER = """
+import django
+django.setup()
+from backend import metrics
+metrics.REQUESTS.labels("post_list", "GET", "200").inc(3)
+"""
+
+
+@pytest.mark.django_db
+def test_multiprocess_samples_are_aggregated(settings, tmp_path, monkeypatch):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "backend.settings",
+        "SECRET_KEY": django_settings.SECRET_KEY,
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+    }
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", WORKER],
+            env=env,
+            cwd=django_settings.BASE_DIR,
+            check=True,
+        )
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    metrics = scrape(settings)
+
+    key = (
+        "http_requests",
+        "http_requests_total",
+        (("method", "GET"), ("status", "200"), ("view", "post_list")),
+    )
+    assert metrics[key] == 6
@@ -0,0 +1,110 @@
+import base64
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.models import Profile
+from posts.models import Post
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    user = User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass123"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+@pytest.fixture
+def authenticated_client(user):
+    client = APIClient()
+    refresh = RefreshToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client
+
+
+@pytest.fixture
+def posts(user):
+    return [Post.objects.create(author=user, content=f"Post {i}") for i in range(5)]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def test_first_page_has_no_count(self, authenticated_client, posts):
+        response = authenticated_client.get("/api/posts/my-posts/?page_size=2")
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert [item["content"] for item in response.data["results"]] == [
+            "Post 4",
+            "Post 3",
+        ]
+        assert response.data["next"] is not None
+
+    def test_follows_cursor_until_last_page(self, authenticated_client, posts):
+        url = "/api/posts/my-posts/?page_size=2"
+        seen = []
+        while url:
+            response = authenticated_client.get(url)
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+        assert seen == [post.id for post in reversed(posts)]
+
+    def test_new_posts_do_not_shift_pages(self, authenticated_client, user, posts):
+        response = authenticated_client.get("/api/posts/?page_size=2")
+        Post.objects.create(author=user, content="Newer post")
+        response = authenticated_client.get(response.data["next"])
+        assert [item["content"] for item in response.data["results"]] == [
+            "Post 2",
+            "Post 1",
+        ]
+
+    def test_page_size_is_capped(self, authenticated_client, settings, posts):
+        settings.PAGINATION_MAX_PAGE_SIZE = 3
+        response = authenticated_client.get("/api/posts/my-posts/?page_size=50")
+        assert len(response.data["results"]) == 3
+
+    def test_invalid_cursor(self, authenticated_client, posts):
+        response = authenticated_client.get("/api/posts/my-posts/?cursor=invalid")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.parametrize(
+        "position",
+        [
+            '["2024-01-01T00:00:00+00:00", 1e400]',
+            '["2024-01-01T00:00:00+00:00", 1.5]',
+            '["2024-01-01T00:00:00+00:00", "1"]',
+            '["2024-01-01T00:00:00+00:00", 99999999999999999999]',
+            '["2024-01-01T00:00:00+00:00", -1]',
+            "[1, 1]",
+        ],
+    )
+    @pytest.mark.parametrize(
+        "path", ["/api/posts/", "/api/posts/my-posts/", "/api/follows/my-followers/"]
+    )
+    def test_malformed_cursor(self, authenticated_client, posts, path, position):
+        cursor = base64.urlsafe_b64encode(position.encode()).decode()
+        response = authenticated_client.get(f"{path}?cursor={cursor}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_mode_is_opt_in(self, authenticated_client, posts):
+        response = authenticated_client.get("/api/posts/my-posts/?page=1")
+        assert response.data["count"] == 5
+        assert response.data["results"][0]["content"] == "Post 4"
+
+    def test_follower_list_uses_cursor(self, authenticated_client, user):
+        from follows.models import Follow
+
+        for i in range(3):
+            follower = User.objects.create_user(
+                username=f"follower{i}", email=f"f{i}@example.com", password="pass123"
+            )
+            Follow.objects.create(follower=follower, following=user)
+        response = authenticated_client.get("/api/follows/my-followers/?page_size=2")
+        assert len(response.data["results"]) == 2
+        response = authenticated_client.get(response.data["next"])
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
@@ -0,0 +1,107 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.counters import adjust_follow_counts
+from authentication.models import Profile, User
+from follows.models import Follow
+from posts.models import Post
+
+
+def make_user(name):
+    user = User.objects.create_user(
+        username=name, email=f"{name}@example.com", password="pass12345"
+    )
+    Profile.objects.create(user=user)
+    return user
+
+
+def client_for(user):
+    client = APIClient()
+    refresh = RefreshToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client
+
+
+def counts(user):
+    profile = Profile.objects.get(user=user)
+    return profile.followers_count, profile.following_count, profile.posts_count
+
+
+@pytest.mark.django_db
+def test_counters_follow_writes():
+    alice, bob, carol = make_user("alice"), make_user("bob"), make_user("carol")
+    client = client_for(alice)
+
+    client.post("/api/follows/follow/", {"following": bob.id})
+    client.post(
+        "/api/follows/follow/bulk/", {"follow": [carol.id, bob.id]}, format="json"
+    )
+    assert counts(alice) == (0, 2, 0)
+    assert counts(bob) == (1, 0, 0)
+
+    client.delete(f"/api/follows/unfollow/{bob.id}/")
+    client.post("/api/follows/follow/bulk/", {"unfollow": [carol.id]}, format="json")
+    assert counts(alice) == (0, 0, 0)
+    assert counts(bob) == (0, 0, 0)
+    assert counts(carol) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_counters_follow_posts_and_are_exposed():
+    alice, bob = make_user("alice"), make_user("bob")
+    client = client_for(alice)
+
+    response = client.post("/api/posts/create/", {"content": "Oi"})
+    client.post("/api/posts/create/", {"content": "Tudo bem?"})
+    client.delete(f"/api/posts/{response.data['post']['id']}/delete/")
+    client_for(bob).post("/api/follows/follow/", {"following": alice.id})
+
+    response = client_for(bob).get(f"/api/auth/profile/{alice.id}/")
+    assert response.data["followers_count"] == 1
+    assert response.data["following_count"] == 0
+    assert response.data["posts_count"] == 1
+
+
+@pytest.mark.django_db
+def test_counters_never_go_negative():
+    alice, bob = make_user("alice"), make_user("bob")
+    adjust_follow_counts([(alice.id, bob.id)], -1)
+    assert counts(alice) == (0, 0, 0)
+    assert counts(bob) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_profile_update_keeps_counters():
+    alice, bob = make_user("alice"), make_user("bob")
+    client = client_for(alice)
+    client.get("/api/auth/profile/")
+    client_for(bob).post("/api/follows/follow/", {"following": alice.id})
+
+    client.put("/api/auth/profile/update/", {"bio": "Olá"})
+    assert counts(alice) == (1, 0, 0)
+
+
+@pytest.mark.django_db
+def test_new_profile_starts_from_real_counts():
+    alice = User.objects.create_user(
+        username="alice", email="alice@example.com", password="pass12345"
+    )
+    bob = make_user("bob")
+    Follow.objects.create(follower=bob, following=alice)
+    Post.objects.create(author=alice, content="Oi")
+
+    Profile.objects.create(user=alice)
+    assert counts(alice) == (1, 0, 1)
+
+
+@pytest.mark.django_db
+def test_rebuild_profile_counters_command():
+    alice, bob = make_user("alice"), make_user("bob")
+    Follow.objects.bulk_create([Follow(follower=alice, following=bob)])
+    Post.objects.bulk_create([Post(author=bob, content=f"Post {i}") for i in range(3)])
+    assert counts(bob) == (0, 0, 0)
+
+    call_command("rebuild_profile_counters", "--batch-size", "1")
+    assert counts(alice) == (0, 1, 0)
+    assert counts(bob) == (1, 0, 3)
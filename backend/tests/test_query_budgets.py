@@ -0,0 +1,144 @@
+from django.utils import timezone
+from authentication.models import Profile, User
+from backend.pytest_budgets import budget_case
+from follows.models import Follow, FollowSuggestion
+from posts.models import Comment, Like, Post, TimelineEntry
+
+
+def make_users(count, prefix="pessoa"):
+    users = User.objects.bulk_create(
+        [
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com")
+            for i in range(count)
+        ]
+    )
+    Profile.objects.bulk_create([Profile(user=user) for user in users])
+    return users
+
+
+def make_posts(count, author=None, content="Post"):
+    author = author or make_users(1, "autor")[0]
+    return Post.objects.bulk_create(
+        [Post(author=author, content=f"{content} {i}") for i in range(count)]
+    )
+
+
+def ids(objects):
+    return ",".join(str(obj.id) for obj in objects)
+
+
+@budget_case("post_list")
+def seed_post_list(user, count):
+    posts = make_posts(count)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user=user,
+                post=post,
+                author_id=post.author_id,
+                created_at=post.created_at,
+            )
+            for post in posts
+        ]
+    )
+    return "/api/posts/"
+
+
+@budget_case("post_batch")
+def seed_post_batch(user, count):
+    return f"/api/posts/batch/?ids={ids(make_posts(count))}"
+
+
+@budget_case("post_search")
+def seed_post_search(user, count):
+    make_posts(count, content="Orçamento")
+    return "/api/posts/search/?q=orcamento"
+
+
+@budget_case("post_likes")
+def seed_post_likes(user, count):
+    post = make_posts(1)[0]
+    Like.objects.bulk_create(
+        [Like(user=liker, post=post) for liker in make_users(count)]
+    )
+    return f"/api/posts/{post.id}/likes/"
+
+
+@budget_case("comment_list")
+def seed_comment_list(user, count):
+    post = make_posts(1)[0]
+    Comment.objects.bulk_create(
+        [
+            Comment(author=author, post=post, content="Oi")
+            for author in make_users(count)
+        ]
+    )
+    return f"/api/posts/{post.id}/comments/"
+
+
+@budget_case("user_posts")
+def seed_user_posts(user, count):
+    author = make_users(1, "autor")[0]
+    make_posts(count, author)
+    return f"/api/posts/user/{author.id}/"
+
+
+@budget_case("my_posts")
+def seed_my_posts(user, count):
+    make_posts(count, user)
+    return "/api/posts/my-posts/"
+
+
+@budget_case("my_followers")
+def seed_my_followers(user, count):
+    Follow.objects.bulk_create(
+        [Follow(follower=follower, following=user) for follower in make_users(count)]
+    )
+    return "/api/follows/my-followers/"
+
+
+@budget_case("my_following")
+def seed_my_following(user, count):
+    Follow.objects.bulk_create(
+        [Follow(follower=user, following=followed) for followed in make_users(count)]
+    )
+    return "/api/follows/my-following/"
+
+
+@budget_case("follow_suggestions")
+def seed_follow_suggestions(user, count):
+    FollowSuggestion.objects.bulk_create(
+        [
+            FollowSuggestion(
+                user=user,
+                suggested=suggested,
+                mutual_count=1,
+                rank=rank,
+                computed_at=timezone.now(),
+            )
+            for rank, suggested in enumerate(make_users(count))
+        ]
+    )
+    return "/api/follows/suggestions/"
+
+
+@budget_case("user_list")
+def seed_user_list(user, count):
+    User.objects.filter(id=user.id).update(is_superuser=True)
+    make_users(count - 1)
+    return "/api/auth/users/"
+
+
+@budget_case("user_batch")
+def seed_user_batch(user, count):
+    return f"/api/auth/users/batch/?ids={ids(make_users(count))}"
+
+
+@budget_case("user_search")
+def seed_user_search(user, count):
+    make_users(count, "busca")
+    return "/api/auth/users/search/?prefix=busca"
+
+
+def test_query_budget(budgeted_view, check_query_budget):
+    check_query_budget(budgeted_view)
@@ -0,0 +1,69 @@
+import logging
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from authentication.models import Profile, User
+from posts.models import Post
+
+
+@pytest.fixture
+def user():
+    user = User.objects.create_user(
+        username="user1", email="user1@example.com", password="pass12345"
+    )
+    Profile.objects.create(user=user)
+    Post.objects.create(author=user, content="Oi")
+    return user
+
+
+def client_for(user):
+    # A new client loads the middleware again, with the current settings.
+    client = APIClient()
+    refresh = RefreshToken.for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client
+
+
+def metrics(response):
+    return {
+        metric.split(";")[0]: metric.split(";")[1:]
+        for metric in response["Server-Timing"].split(", ")
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("path", ["/api/posts/", "/api/posts/my-posts/"])
+def test_sampled_request_reports_timings(settings, user, caplog, path):
+    settings.REQUEST_TIMING_SAMPLE_RATE = 1
+    with caplog.at_level(logging.INFO, logger="backend.timing"):
+        response = client_for(user).get(path)
+
+    timings = metrics(response)
+    assert set(timings) == {"db", "auth", "serialize", "render", "total"}
+    assert timings["db"][1] != 'desc="0 queries"'
+    # render can round to 0.0 ms for a payload this small.
+    assert all(float(timings[name][0][4:]) > 0 for name in ("db", "auth", "total"))
+
+    (record,) = caplog.records
+    assert f"path={path}" in record.getMessage()
+    assert "status=200" in record.getMessage()
+
+
+@pytest.mark.django_db
+def test_timing_disabled_by_default(settings, user, caplog):
+    settings.REQUEST_TIMING_SAMPLE_RATE = 0
+    with caplog.at_level(logging.INFO, logger="backend.timing"):
+        response = client_for(user).get("/api/posts/")
+
+    assert "Server-Timing" not in response
+    assert not caplog.records
+
+
+@pytest.mark.django_db
+def test_unsampled_requests_are_not_timed(settings, user, monkeypatch):
+    settings.REQUEST_TIMING_SAMPLE_RATE = 0.1
+    monkeypatch.setattr("backend.timing.random.random", lambda: 0.5)
+    assert "Server-Timing" not in client_for(user).get("/api/posts/")
+
+    monkeypatch.setattr("backend.timing.random.random", lambda: 0.05)
+    assert "Server-Timing" in client_for(user).get("/api/posts/")
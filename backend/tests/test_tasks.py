@@ -0,0 +1,79 @@
+import pytest
+from django.db import OperationalError
+from prometheus_client import REGISTRY
+from backend.celery import app, enqueue
+
+attempts = []
+
+
+@app.task(name="tests.flaky", autoretry_for=(OperationalError,), max_retries=2)
+def flaky():
+    attempts.append(1)
+    if len(attempts) < 2:
+        raise OperationalError("database is locked")
+    return len(attempts)
+
+
+@app.task(name="tests.add")
+def add(x, y):
+    return x + y
+
+
+@app.task(name="tests.fail")
+def fail():
+    raise ValueError("falhou")
+
+
+@pytest.fixture(autouse=True)
+def clear_attempts():
+    attempts.clear()
+
+
+def test_enqueue_runs_inline_when_eager():
+    assert enqueue(add, 2, 3).get() == 5
+
+
+@pytest.mark.django_db
+def test_enqueue_waits_for_commit_with_a_broker(
+    monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    sent = []
+    settings.CELERY_TASK_ALWAYS_EAGER = False
+    monkeypatch.setattr(add, "delay", lambda *args: sent.append(args))
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        enqueue(add, 2, 3)
+        assert sent == []
+    assert len(callbacks) == 1
+    assert sent == [(2, 3)]
+
+
+def test_transient_database_errors_are_retried():
+    assert enqueue(flaky).get() == 2
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_task_timings_are_recorded():
+    runs = sample("celery_tasks_total", task="tests.add", state="SUCCESS")
+    timed = sample("celery_task_duration_seconds_count", task="tests.add")
+
+    enqueue(add, 1, 1)
+    enqueue(add, 2, 2)
+
+    assert sample("celery_tasks_total", task="tests.add", state="SUCCESS") == runs + 2
+    assert sample("celery_task_duration_seconds_count", task="tests.add") == timed + 2
+    assert sample("celery_tasks_total", task="tests.add", state="FAILURE") == 0
+
+
+def test_task_failures_are_counted():
+    failures = sample("celery_tasks_total", task="tests.fail", state="FAILURE")
+
+    with pytest.raises(ValueError):
+        enqueue(fail)
+
+    assert (
+        sample("celery_tasks_total", task="tests.fail", state="FAILURE") == failures + 1
+    )